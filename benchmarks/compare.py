@@ -0,0 +1,88 @@
+import argparse
+import json
+import sys
+
+
+def load_results(path: str) -> dict:
+    """
+    Read the results of a benchmark run, keyed by endpoint and size.
+
+    Args:
+        path (str): JSON file written by `run.py`.
+
+    Returns:
+        dict: Map of `(endpoint, size)` to its result record.
+    """
+    with open(path) as file:
+        report = json.load(file)
+
+    return {
+        (result["endpoint"], result["size"]): result for result in report["results"]
+    }
+
+
+def regressions(baseline: dict, candidate: dict, tolerance: float) -> list:
+    """
+    Compare a candidate result with its baseline.
+
+    Throughput and p95 latency may worsen by up to `tolerance`; the statement
+    count, which does not depend on the machine, must not grow at all.
+
+    Args:
+        baseline (dict): Result record of the baseline run.
+        candidate (dict): Result record of the candidate run.
+        tolerance (float): Allowed relative change, e.g. 0.1 for 10%.
+
+    Returns:
+        List[str]: Description of each regression found.
+    """
+    found = []
+
+    if candidate["rows_per_second"] < baseline["rows_per_second"] * (1 - tolerance):
+        found.append(
+            f"throughput {baseline['rows_per_second']} -> {candidate['rows_per_second']} rows/s"
+        )
+    if candidate["latency_p95"] > baseline["latency_p95"] * (1 + tolerance):
+        found.append(
+            f"p95 latency {baseline['latency_p95']} -> {candidate['latency_p95']} s"
+        )
+    if candidate["statements"] > baseline["statements"]:
+        found.append(
+            f"statements {baseline['statements']} -> {candidate['statements']}"
+        )
+
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare two benchmark runs and fail if the candidate regressed."
+    )
+    parser.add_argument("baseline", help="results of the reference run")
+    parser.add_argument("candidate", help="results of the run being checked")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.1,
+        help="allowed relative loss of throughput or p95 latency",
+    )
+    args = parser.parse_args()
+
+    baseline = load_results(args.baseline)
+    candidate = load_results(args.candidate)
+    rejected = False
+
+    for key in sorted(baseline.keys() & candidate.keys()):
+        found = regressions(baseline[key], candidate[key], args.tolerance)
+        rejected = rejected or bool(found)
+        endpoint, size = key
+        print(f"{endpoint} ({size}): {'; '.join(found) if found else 'ok'}")
+
+    for endpoint, size in sorted(baseline.keys() ^ candidate.keys()):
+        print(f"{endpoint} ({size}): only in one of the runs, not compared")
+
+    sys.exit(1 if rejected else 0)
+
+
+if __name__ == "__main__":
+    main()
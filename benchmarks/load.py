@@ -0,0 +1,279 @@
+import argparse
+import asyncio
+import io
+import json
+import os
+import random
+import sys
+import time
+import uuid
+from collections import Counter, defaultdict
+from typing import NamedTuple, Optional
+
+import httpx
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCHMARKS_DIR, "..", "src"))
+
+from run import XLSX_MEDIA_TYPE, percentile  # noqa: E402
+from workbooks import WorkbookRates, write_enrollment_workbook  # noqa: E402
+
+DEFAULT_SCENARIO = os.path.join(BENCHMARKS_DIR, "scenarios", "enrollment_week.json")
+
+
+class Task(NamedTuple):
+    """
+    A kind of request of a scenario, sent in a loop by concurrent clients.
+
+    Attributes:
+        name (str): Name of the task in the report.
+        method (str): HTTP method.
+        path (str): Route, where `{room_id}` and `{group_id}` are replaced by
+            random existing IDs on each request.
+        concurrency (int): Clients sending this request.
+        think_time (float): Seconds each client waits between its requests.
+        upload (Optional[dict]): For bulk uploads, `rows` of the generated
+            workbook and the `duplicate_rate`, `invalid_rate` and `missing_room_rate`.
+    """
+
+    name: str
+    method: str
+    path: str
+    concurrency: int = 1
+    think_time: float = 0.0
+    upload: Optional[dict] = None
+
+
+class Sample(NamedTuple):
+    """
+    Outcome of one request of a task.
+
+    Attributes:
+        seconds (float): Time until the whole response was received.
+        status (Optional[int]): HTTP status, or None if the request failed.
+        error (Optional[str]): Error raised by the client, if any.
+    """
+
+    seconds: float
+    status: Optional[int]
+    error: Optional[str]
+
+
+def load_scenario(path: str) -> tuple:
+    """
+    Read a scenario file.
+
+    Args:
+        path (str): JSON file with the `duration` in seconds and the list of `tasks`.
+
+    Returns:
+        Tuple[float, List[Task]]: The duration and the tasks of the scenario.
+    """
+    with open(path) as file:
+        scenario = json.load(file)
+
+    return scenario["duration"], [Task(**task) for task in scenario["tasks"]]
+
+
+def enrollment_upload(task: Task, room_ids: list) -> bytes:
+    """
+    Build an enrollment workbook with new students for an upload of the task.
+
+    Args:
+        task (Task): Upload task.
+        room_ids (list): IDs of the existing rooms.
+
+    Returns:
+        bytes: The xlsx file.
+    """
+    options = task.upload
+    buffer = io.BytesIO()
+    write_enrollment_workbook(
+        buffer,
+        options["rows"],
+        room_ids,
+        WorkbookRates(
+            options.get("duplicate_rate", 0.0),
+            options.get("invalid_rate", 0.0),
+            options.get("missing_room_rate", 0.0),
+        ),
+        seed=random.randrange(2**32),
+        tag=uuid.uuid4().hex[:12],
+    )
+
+    return buffer.getvalue()
+
+
+async def run_client(
+    client: httpx.AsyncClient,
+    task: Task,
+    references: dict,
+    deadline: float,
+    samples: list,
+):
+    """
+    Send the request of a task in a loop until the deadline.
+
+    Args:
+        client (httpx.AsyncClient): Client of the application.
+        task (Task): Task to be run.
+        references (dict): Existing `room_id` and `group_id` values.
+        deadline (float): `time.monotonic()` value at which the client stops.
+        samples (list): Samples of the task, appended in place.
+    """
+    while time.monotonic() < deadline:
+        path = task.path.format(
+            room_id=random.choice(references["room_id"]),
+            group_id=random.choice(references["group_id"]),
+        )
+        files = None
+        if task.upload is not None:
+            content = await asyncio.to_thread(
+                enrollment_upload, task, references["room_id"]
+            )
+            files = {"file": ("load.xlsx", content, XLSX_MEDIA_TYPE)}
+
+        start = time.monotonic()
+        try:
+            response = await client.request(task.method, path, files=files)
+            samples.append(Sample(time.monotonic() - start, response.status_code, None))
+        except httpx.HTTPError as e:
+            samples.append(Sample(time.monotonic() - start, None, type(e).__name__))
+
+        if task.think_time:
+            await asyncio.sleep(task.think_time)
+
+
+def summarize(task: Task, samples: list, duration: float) -> dict:
+    """
+    Aggregate the samples of a task.
+
+    Requests answered with a 4xx or 5xx status, or that failed, count as errors.
+
+    Args:
+        task (Task): The task.
+        samples (list): Its samples.
+        duration (float): Seconds the scenario ran.
+
+    Returns:
+        dict: Throughput, latency percentiles and error rate of the task.
+    """
+    seconds = [sample.seconds for sample in samples]
+    errors = [
+        sample for sample in samples if sample.status is None or sample.status >= 400
+    ]
+
+    return {
+        "task": task.name,
+        "route": f"{task.method} {task.path}",
+        "concurrency": task.concurrency,
+        "requests": len(samples),
+        "requests_per_second": round(len(samples) / duration, 2),
+        "latency_p50": round(percentile(seconds, 50), 6) if samples else None,
+        "latency_p95": round(percentile(seconds, 95), 6) if samples else None,
+        "latency_p99": round(percentile(seconds, 99), 6) if samples else None,
+        "error_rate": round(len(errors) / len(samples), 4) if samples else None,
+        "statuses": dict(
+            Counter(str(sample.status or sample.error) for sample in samples)
+        ),
+    }
+
+
+async def run_scenario(client: httpx.AsyncClient, duration: float, tasks: list) -> list:
+    """
+    Run every client of the scenario at once for its duration.
+
+    Args:
+        client (httpx.AsyncClient): Client of the application.
+        duration (float): Seconds the scenario runs.
+        tasks (list): Tasks of the scenario.
+
+    Returns:
+        List[dict]: Summary of each task.
+    """
+    rooms = (await client.get("/room/list", params={"limit": 1000})).json()
+    if not rooms:
+        sys.exit("The database has no rooms to run the scenario with.")
+    references = {
+        "room_id": [room["Room"]["id"] for room in rooms],
+        "group_id": sorted({room["Room"]["group_id"] for room in rooms}),
+    }
+
+    samples = defaultdict(list)
+    deadline = time.monotonic() + duration
+    started = time.monotonic()
+    await asyncio.gather(
+        *(
+            run_client(client, task, references, deadline, samples[task.name])
+            for task in tasks
+            for _ in range(task.concurrency)
+        )
+    )
+    # Requests in flight at the deadline are waited for and counted.
+    elapsed = time.monotonic() - started
+
+    return [summarize(task, samples[task.name], elapsed) for task in tasks]
+
+
+async def main_async(args):
+    duration, tasks = load_scenario(args.scenario)
+    duration = args.duration or duration
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=None)
+    timeout = httpx.Timeout(args.timeout)
+
+    if args.base_url:
+        async with httpx.AsyncClient(
+            base_url=args.base_url, limits=limits, timeout=timeout
+        ) as client:
+            return await run_scenario(client, duration, tasks)
+
+    from main import app
+
+    await app.router.startup()
+    try:
+        async with httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app),
+            base_url="http://load-test",
+            limits=limits,
+            timeout=timeout,
+        ) as client:
+            return await run_scenario(client, duration, tasks)
+    finally:
+        await app.router.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Replay a mixed traffic scenario against the API and report each route."
+    )
+    parser.add_argument("--scenario", default=DEFAULT_SCENARIO, help="JSON scenario")
+    parser.add_argument(
+        "--base-url",
+        help="URL of a running server; the app is served in-process when omitted",
+    )
+    parser.add_argument(
+        "--duration", type=float, help="seconds to run, instead of the scenario's"
+    )
+    parser.add_argument(
+        "--timeout", type=float, default=300, help="seconds before a request fails"
+    )
+    parser.add_argument("--output", help="JSON file for the results")
+    args = parser.parse_args()
+
+    results = asyncio.run(main_async(args))
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump({"scenario": args.scenario, "results": results}, file, indent=2)
+
+    for result in results:
+        print(
+            f"{result['task']:20} {result['requests']:>7} requests "
+            f"{result['requests_per_second']:>9} req/s "
+            f"p50 {result['latency_p50']}s p95 {result['latency_p95']}s "
+            f"p99 {result['latency_p99']}s errors {result['error_rate']}"
+        )
+
+
+if __name__ == "__main__":
+    main()
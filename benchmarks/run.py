@@ -0,0 +1,392 @@
+import argparse
+import json
+import logging
+import math
+import os
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import NamedTuple, Optional
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCHMARKS_DIR, "..", "src"))
+
+from workbooks import (  # noqa: E402
+    WorkbookRates,
+    write_enrollment_workbook,
+    write_update_workbook,
+)
+
+XLSX_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+PROFILE_HEADERS = {"X-SQL-Profile": "1"}
+
+
+class Measurement(NamedTuple):
+    """
+    Outcome of one benchmarked request.
+
+    Attributes:
+        seconds (float): Time until the whole response was received.
+        statements (int): SQL statements executed, as reported by the SQL profiler.
+        peak_rss (int): Highest resident memory of the process during the request, in bytes.
+        status (int): HTTP status of the response.
+        rows (int): Rows sent or listed.
+    """
+
+    seconds: float
+    statements: int
+    peak_rss: int
+    status: int
+    rows: int
+
+
+class RssSampler:
+    """
+    Sample the resident memory of this process in a background thread.
+
+    Where /proc is not available, the peak of the whole process lifetime is
+    reported instead. Memory of the validation worker processes is not included.
+    """
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    @staticmethod
+    def current() -> int:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+    def _sample(self):
+        while not self._stop.wait(self.interval):
+            self.peak = max(self.peak, self.current())
+
+    def __enter__(self):
+        try:
+            self.peak = self.current()
+        except OSError:
+            return self
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        if self._thread is None:
+            # ru_maxrss is in kilobytes on Linux and in bytes on macOS.
+            scale = 1 if sys.platform == "darwin" else 1024
+            self.peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+            return
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, self.current())
+
+
+def percentile(values: list, q: float) -> float:
+    """
+    Return the nearest-rank percentile of the values.
+
+    Args:
+        values (list): Measured values.
+        q (float): Percentile, between 0 and 100.
+
+    Returns:
+        float: The smallest value with at least `q` percent of the values at or below it.
+    """
+    ordered = sorted(values)
+
+    return ordered[max(math.ceil(q / 100 * len(ordered)) - 1, 0)]
+
+
+def measure(send, count_rows) -> Measurement:
+    """
+    Send a request with SQL profiling and measure it.
+
+    Args:
+        send (Callable): Function sending the request and returning the response.
+        count_rows (Callable): Function returning the rows handled, given the response.
+
+    Returns:
+        Measurement: The measured request.
+    """
+    with RssSampler() as rss:
+        start = time.perf_counter()
+        response = send()
+        seconds = time.perf_counter() - start
+
+    return Measurement(
+        seconds=seconds,
+        statements=int(response.headers.get("x-sql-statements", 0)),
+        peak_rss=rss.peak,
+        status=response.status_code,
+        rows=count_rows(response),
+    )
+
+
+def summarize(endpoint: str, size: int, measurements: list) -> dict:
+    """
+    Aggregate the measurements of an endpoint into a result record.
+
+    Args:
+        endpoint (str): Method and route of the endpoint.
+        size (int): Rows of the uploaded workbooks, or page size of the listings.
+        measurements (list): The measured requests.
+
+    Returns:
+        dict: Throughput, latency percentiles, peak memory and statements of the endpoint.
+    """
+    seconds = [measurement.seconds for measurement in measurements]
+
+    return {
+        "endpoint": endpoint,
+        "size": size,
+        "requests": len(measurements),
+        "rows_per_second": round(
+            sum(measurement.rows for measurement in measurements) / sum(seconds), 2
+        ),
+        "latency_p50": round(percentile(seconds, 50), 6),
+        "latency_p95": round(percentile(seconds, 95), 6),
+        "peak_rss_mb": round(
+            max(measurement.peak_rss for measurement in measurements) / 2**20, 1
+        ),
+        "statements": statistics.median(
+            measurement.statements for measurement in measurements
+        ),
+        "statuses": sorted({measurement.status for measurement in measurements}),
+    }
+
+
+def upload(client, method: str, url: str, path: str):
+    with open(path, "rb") as file:
+        return client.request(
+            method,
+            url,
+            headers=PROFILE_HEADERS,
+            files={"file": (os.path.basename(path), file, XLSX_MEDIA_TYPE)},
+        )
+
+
+def benchmark_imports(client, session, args, room_ids: list, workdir: str) -> list:
+    """
+    Import synthetic enrollment workbooks of each size, then update their students.
+
+    Args:
+        client (TestClient): Client of the application.
+        session (Session): Database session, used to look up the created students.
+        args (Namespace): Command line arguments.
+        room_ids (list): IDs of the existing rooms.
+        workdir (str): Directory for the generated workbooks.
+
+    Returns:
+        List[dict]: Result records of both bulk endpoints, per size.
+    """
+    from crud.guardian import get_guardians_by_emails
+    from crud.student import get_students_by_emails
+
+    rates = WorkbookRates(
+        args.duplicate_rate, args.invalid_rate, args.missing_room_rate
+    )
+    results = []
+
+    for rows in args.rows:
+        enrollments, updates = [], []
+
+        for run in range(args.repeat):
+            seed = args.seed + run
+            tag = f"{args.run_id}-{rows}-{run}"
+            path = os.path.join(workdir, f"enrollment-{tag}.xlsx")
+            students = write_enrollment_workbook(path, rows, room_ids, rates, seed, tag)
+            enrollments.append(
+                measure(
+                    lambda: upload(client, "POST", "/enrollment/students", path),
+                    lambda response: rows,
+                )
+            )
+            os.remove(path)
+
+            student_ids = {
+                row.email: row.id
+                for row in get_students_by_emails(
+                    session, {student.email for student in students}
+                )
+            }
+            guardian_ids = {
+                row.email: row.id
+                for row in get_guardians_by_emails(
+                    session, {student.guardian_email for student in students}
+                )
+            }
+            session.rollback()
+            records = [
+                (
+                    student_ids[student.email],
+                    guardian_ids[student.guardian_email],
+                    student,
+                )
+                for student in students
+                if student.email in student_ids
+            ]
+            if not records:
+                continue
+
+            path = os.path.join(workdir, f"update-{tag}.xlsx")
+            updated_rows = write_update_workbook(path, records, rates, seed)
+            updates.append(
+                measure(
+                    lambda: upload(client, "PUT", "/student/update/massive", path),
+                    lambda response: updated_rows,
+                )
+            )
+            os.remove(path)
+
+        results.append(summarize("POST /enrollment/students", rows, enrollments))
+        if updates:
+            results.append(summarize("PUT /student/update/massive", rows, updates))
+
+    return results
+
+
+def benchmark_listings(client, args, room_id: int, group_id: int) -> list:
+    """
+    Request the first page of each listing endpoint repeatedly.
+
+    Args:
+        client (TestClient): Client of the application.
+        args (Namespace): Command line arguments.
+        room_id (int): Room whose students are listed.
+        group_id (int): Group whose students are listed.
+
+    Returns:
+        List[dict]: Result records of the listing endpoints.
+    """
+    endpoints = {
+        "GET /room/list": "/room/list",
+        "GET /group/list": "/group/list",
+        "GET /student/room/{room_id}": f"/student/room/{room_id}",
+        "GET /student/group/{group_id}": f"/student/group/{group_id}",
+    }
+    results = []
+
+    for endpoint, url in endpoints.items():
+        measurements = [
+            measure(
+                lambda: client.get(
+                    url, params={"limit": args.page_size}, headers=PROFILE_HEADERS
+                ),
+                lambda response: len(response.json()),
+            )
+            for _ in range(args.list_requests)
+        ]
+        results.append(summarize(endpoint, args.page_size, measurements))
+
+    return results
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=BENCHMARKS_DIR,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Benchmark the bulk import and listing endpoints against the configured database."
+    )
+    parser.add_argument(
+        "--rows",
+        type=int,
+        nargs="+",
+        default=[1000, 10000],
+        help="rows of the synthetic workbooks, one benchmark per size",
+    )
+    parser.add_argument("--repeat", type=int, default=3, help="imports per size")
+    parser.add_argument("--duplicate-rate", type=float, default=0.05)
+    parser.add_argument("--invalid-rate", type=float, default=0.02)
+    parser.add_argument("--missing-room-rate", type=float, default=0.01)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--list-requests", type=int, default=50)
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--output", help="JSON file for the results")
+    args = parser.parse_args()
+    args.run_id = uuid.uuid4().hex[:8]
+
+    return args
+
+
+def main():
+    args = parse_args()
+    # Repeated lookups are expected at these sizes; keep the profiler quiet.
+    logging.getLogger("utils.sql_profile").setLevel(logging.ERROR)
+
+    from fastapi.testclient import TestClient
+
+    from database.database import create_connection
+    from main import app
+    from settings import Settings
+
+    started_at = datetime.now(timezone.utc)
+
+    with TestClient(app) as client:
+        rooms = client.get("/room/list", params={"limit": 1000}).json()
+        if not rooms:
+            sys.exit("The database has no rooms to enroll students in.")
+        room_ids = [room["Room"]["id"] for room in rooms]
+
+        session = create_connection()
+        try:
+            with tempfile.TemporaryDirectory() as workdir:
+                results = benchmark_imports(client, session, args, room_ids, workdir)
+        finally:
+            session.close()
+
+        results += benchmark_listings(
+            client, args, room_ids[0], rooms[0]["Room"]["group_id"]
+        )
+
+    report = {
+        "started_at": started_at.isoformat(),
+        "commit": git_commit(),
+        "parameters": {
+            key: value for key, value in vars(args).items() if key != "output"
+        },
+        "settings": {
+            "IMPORT_CHUNK_SIZE": Settings.IMPORT_CHUNK_SIZE,
+            "VALIDATION_WORKERS": Settings.VALIDATION_WORKERS,
+            "DB_POOL_SIZE": Settings.DB_POOL_SIZE,
+        },
+        "results": results,
+    }
+
+    output = args.output or os.path.join(
+        BENCHMARKS_DIR, "results", f"{started_at:%Y%m%dT%H%M%S}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as file:
+        json.dump(report, file, indent=2)
+
+    for result in results:
+        print(
+            f"{result['endpoint']:32} {result['size']:>7} rows "
+            f"{result['rows_per_second']:>10} rows/s "
+            f"p50 {result['latency_p50']:.3f}s p95 {result['latency_p95']:.3f}s "
+            f"{result['peak_rss_mb']:>7} MB {result['statements']:>6} statements"
+        )
+    print(f"Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
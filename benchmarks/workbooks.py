@@ -0,0 +1,195 @@
+import argparse
+import os
+import random
+import sys
+from typing import NamedTuple
+
+import xlsxwriter
+
+sys.path.insert(
+    0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+)
+
+from enums.template import TypeTemplates  # noqa: E402
+
+
+class WorkbookRates(NamedTuple):
+    """
+    Share of the rows of a synthetic workbook that are not plain new records.
+
+    Attributes:
+        duplicate (float): Rows repeating the student of an earlier row.
+        invalid (float): Rows failing validation, with a numeric last name.
+        missing (float): Rows referencing a room (or a student, when updating) that does not exist.
+    """
+
+    duplicate: float = 0.0
+    invalid: float = 0.0
+    missing: float = 0.0
+
+
+class SyntheticStudent(NamedTuple):
+    """
+    A student of a synthetic enrollment workbook and its guardian.
+
+    Attributes:
+        email (str): Email of the student.
+        guardian_email (str): Email of the guardian, shared by two consecutive students.
+        guardian_number (int): Identification number of the guardian.
+    """
+
+    email: str
+    guardian_email: str
+    guardian_number: int
+
+
+def write_enrollment_workbook(
+    path: str, rows: int, room_ids: list, rates: WorkbookRates, seed: int, tag: str
+) -> list:
+    """
+    Write an enrollment workbook with synthetic students.
+
+    Emails contain the tag, so workbooks with different tags create new students
+    in the same database.
+
+    Args:
+        path (str): Path of the xlsx file to be written.
+        rows (int): Number of data rows.
+        room_ids (list): IDs of existing rooms the students are enrolled in.
+        rates (WorkbookRates): Share of duplicated, invalid and missing-room rows.
+        seed (int): Seed of the random choices, for reproducible workbooks.
+        tag (str): Text making the emails of this workbook unique.
+
+    Returns:
+        List[SyntheticStudent]: The distinct students of the workbook.
+    """
+    rng = random.Random(seed)
+    missing_room_id = max(room_ids) + 1000
+    students = []
+
+    workbook = xlsxwriter.Workbook(path, {"constant_memory": True})
+    sheet = workbook.add_worksheet()
+    sheet.write_row(0, 0, TypeTemplates.ENROLLMENT_STUDENT.headers)
+
+    for row in range(1, rows + 1):
+        if students and rng.random() < rates.duplicate:
+            student = rng.choice(students)
+        else:
+            guardian = len(students) // 2
+            student = SyntheticStudent(
+                email=f"student{len(students)}.{tag}@bench.example",
+                guardian_email=f"guardian{guardian}.{tag}@bench.example",
+                guardian_number=guardian,
+            )
+            students.append(student)
+
+        last_name = 12345 if rng.random() < rates.invalid else "Bench"
+        if rng.random() < rates.missing:
+            room_id = missing_room_id
+        else:
+            room_id = rng.choice(room_ids)
+
+        sheet.write_row(
+            row,
+            0,
+            [
+                "Student",
+                last_name,
+                student.email,
+                "Guardian",
+                "Bench",
+                student.guardian_email,
+                1,
+                student.guardian_number,
+                1,
+                room_id,
+            ],
+        )
+
+    workbook.close()
+
+    return students
+
+
+def write_update_workbook(
+    path: str, records: list, rates: WorkbookRates, seed: int
+) -> int:
+    """
+    Write an update workbook changing the names of existing students and guardians.
+
+    Args:
+        path (str): Path of the xlsx file to be written.
+        records (list): `(student ID, guardian ID, SyntheticStudent)` of the students to update.
+        rates (WorkbookRates): Share of duplicated, invalid and missing-student rows.
+        seed (int): Seed of the random choices, for reproducible workbooks.
+
+    Returns:
+        int: Number of data rows written.
+    """
+    rng = random.Random(seed)
+    missing_student_id = max((student_id for student_id, _, _ in records), default=0)
+    missing_student_id += 10**6
+
+    workbook = xlsxwriter.Workbook(path, {"constant_memory": True})
+    sheet = workbook.add_worksheet()
+    sheet.write_row(0, 0, TypeTemplates.UPDATE_STUDENT_GUARDIAN.headers)
+
+    for row, record in enumerate(records, 1):
+        if row > 1 and rng.random() < rates.duplicate:
+            record = records[rng.randrange(row - 1)]
+        student_id, guardian_id, student = record
+
+        last_name = 12345 if rng.random() < rates.invalid else "Updated"
+        if rng.random() < rates.missing:
+            student_id = missing_student_id
+
+        sheet.write_row(
+            row,
+            0,
+            [
+                student_id,
+                "Student",
+                last_name,
+                student.email,
+                guardian_id,
+                "Guardian",
+                "Updated",
+                student.guardian_email,
+                1,
+                student.guardian_number,
+                1,
+            ],
+        )
+
+    workbook.close()
+
+    return len(records)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Write a synthetic enrollment workbook for the benchmarks."
+    )
+    parser.add_argument("path", help="xlsx file to be written")
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--rooms", default="1,2,3,4", help="comma separated room IDs")
+    parser.add_argument("--duplicate-rate", type=float, default=0.05)
+    parser.add_argument("--invalid-rate", type=float, default=0.02)
+    parser.add_argument("--missing-room-rate", type=float, default=0.01)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--tag", default="manual")
+    args = parser.parse_args()
+
+    students = write_enrollment_workbook(
+        args.path,
+        args.rows,
+        [int(room_id) for room_id in args.rooms.split(",")],
+        WorkbookRates(args.duplicate_rate, args.invalid_rate, args.missing_room_rate),
+        args.seed,
+        args.tag,
+    )
+    print(f"{args.rows} rows, {len(students)} distinct students written to {args.path}")
+
+
+if __name__ == "__main__":
+    main()
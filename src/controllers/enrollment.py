@@ -1,30 +1,150 @@
-from fastapi import APIRouter, File, UploadFile, status
+from fastapi import APIRouter, File, Request, UploadFile, status
 
-from services.enrollment import create_enrollment_students, remove_enrollment
+from enums.import_job import ImportKinds
+from enums.import_report import ImportReportModes
+from enums.template import TypeTemplates
+from services.enrollment import (
+    create_enrollment_batch,
+    create_enrollment_students,
+    remove_enrollment,
+)
+from services.import_job import get_import_job_status
+from services.import_report import get_stored_report
 
 enrollment_router = APIRouter(
     prefix="/enrollment",
     tags=["Enrollment"],
 )
 
+enrollment_record_schema = {
+    "type": "object",
+    "properties": {header: {} for header in TypeTemplates.ENROLLMENT_STUDENT.headers},
+}
+
 
 @enrollment_router.post(
     path="/students",
     status_code=status.HTTP_201_CREATED,
     summary="Enrollment of a group of students",
 )
-def post_enrollment_students(file: UploadFile = File(...)):
+def post_enrollment_students(
+    file: UploadFile = File(...),
+    background: bool = False,
+    dry_run: bool = False,
+    resume: bool = False,
+    report: ImportReportModes = ImportReportModes.JSON,
+    compact: bool = False,
+):
+    """
+    # Endpoint for enrolling a group of students by processing an Excel, CSV or Parquet file containing enrollment data.
+
+    ### Args:
+        file (UploadFile): Excel, CSV or Parquet file containing enrollment data (required).
+        background (bool): Process the file as a background job and return its ID at once.
+        dry_run (bool): Check the file against the database without writing anything.
+        resume (bool): Make the upload resumable, continuing a previous resumable upload of the same file
+            and skipping the rows it already processed.
+        report (ImportReportModes): `json` for the whole report at the end, `ndjson` to stream it while
+            the rows are processed, or `stored` to save it for download at `GET /enrollment/reports/{report_id}`.
+        compact (bool): Reference the rows of the report by number instead of echoing their data.
+
+    ### Returns:
+        JSONResponse: Response with details of successful and failed enrollments,
+        or 202 with the job ID when `background` is set. With `dry_run`, the
+        report of what the import would do, with a summary of the records to
+        create or reuse.
+
+    """
+    return create_enrollment_students(
+        file=file,
+        background=background,
+        dry_run=dry_run,
+        resume=resume,
+        report=report,
+        compact=compact,
+    )
+
+
+@enrollment_router.post(
+    path="/batch",
+    status_code=status.HTTP_201_CREATED,
+    summary="Enrollment of a batch of students sent as JSON",
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/json": {
+                    "schema": {"type": "array", "items": enrollment_record_schema}
+                },
+                "application/x-ndjson": {"schema": enrollment_record_schema},
+            },
+        }
+    },
+)
+def post_enrollment_batch(
+    request: Request,
+    dry_run: bool = False,
+    report: ImportReportModes = ImportReportModes.JSON,
+    compact: bool = False,
+):
     """
-    # Endpoint for enrolling a group of students by processing an Excel file containing enrollment data.
+    # Endpoint for enrolling a group of students sent as a JSON array or as NDJSON, one record per line.
 
     ### Args:
-        file (UploadFile): Excel file containing enrollment data (required).
+        request (Request): Body with the enrollment records, keyed by the columns of the enrollment template (required).
+        dry_run (bool): Check the records against the database without writing anything.
+        report (ImportReportModes): `json` for the whole report at the end, `ndjson` to stream it while
+            the rows are processed, or `stored` to save it for download at `GET /enrollment/reports/{report_id}`.
+        compact (bool): Reference the rows of the report by number instead of echoing their data.
 
     ### Returns:
         JSONResponse: Response with details of successful and failed enrollments.
+        With `dry_run`, the report of what the import would do, with a summary
+        of the records to create or reuse.
+
+    """
+    return create_enrollment_batch(
+        request=request, dry_run=dry_run, report=report, compact=compact
+    )
+
+
+@enrollment_router.get(
+    path="/reports/{report_id}",
+    status_code=status.HTTP_200_OK,
+    summary="Download a stored import report",
+)
+def get_import_report(report_id: str):
+    """
+    # Endpoint for downloading the report of an upload sent with `report=stored`.
+
+    ### Args:
+        report_id (str): Report ID returned by the upload.
+
+    ### Returns:
+        FileResponse: NDJSON report, one line per entry with its row number and status.
+
+    """
+    return get_stored_report(report_id=report_id)
+
+
+@enrollment_router.get(
+    path="/jobs/{job_id}",
+    status_code=status.HTTP_200_OK,
+    summary="Get the progress of an import job",
+)
+def get_import_job(job_id: str):
+    """
+    # Endpoint for polling a background enrollment import job.
+
+    ### Args:
+        job_id (str): Job ID returned when the file was accepted.
+
+    ### Returns:
+        JSONResponse: Rows processed and failed, processing rate and, once completed,
+        the row counts and URL of its report.
 
     """
-    return create_enrollment_students(file=file)
+    return get_import_job_status(job_id=job_id, kind=ImportKinds.ENROLLMENT)
 
 
 @enrollment_router.delete(
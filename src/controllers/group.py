@@ -1,9 +1,14 @@
-from fastapi import APIRouter, status
+from datetime import datetime
+from typing import Optional
+
+from fastapi import APIRouter, Query, status
 
 from services.group import list_groups_info, create_group, remove_group
 
 from schemas.group import CreateGroupSchema
 
+from settings import Settings
+
 group_router = APIRouter(
     prefix="/group",
     tags=["Group"],
@@ -15,15 +20,39 @@ group_router = APIRouter(
     status_code=status.HTTP_200_OK,
     summary="List groups",
 )
-def get_list_groups():
+async def get_list_groups(
+    cursor: Optional[int] = None,
+    limit: int = Query(
+        default=Settings.LIST_PAGE_SIZE, ge=1, le=Settings.LIST_MAX_PAGE_SIZE
+    ),
+    course_id: Optional[int] = None,
+    starts_after: Optional[datetime] = None,
+    ends_before: Optional[datetime] = None,
+):
     """
-    # Endpoint for listing all groups.
+    # Endpoint for listing groups, one page at a time.
+
+    Groups are ordered by ID. When there are more groups, the `X-Next-Cursor`
+    response header holds the value to be sent as `cursor` for the next page.
+
+    ### Args:
+        cursor (int): ID of the last group of the previous page.
+        limit (int): Maximum number of groups of the page.
+        course_id (int): Only groups of this course.
+        starts_after (datetime): Only groups starting at or after this moment.
+        ends_before (datetime): Only groups ending at or before this moment.
 
     ### Returns:
         JSONResponse: Response with list of groups.
 
     """
-    return list_groups_info()
+    return await list_groups_info(
+        cursor=cursor,
+        limit=limit,
+        course_id=course_id,
+        starts_after=starts_after,
+        ends_before=ends_before,
+    )
 
 
 @group_router.post(
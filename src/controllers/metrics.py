@@ -0,0 +1,24 @@
+from fastapi import APIRouter, Response, status
+
+from utils.metrics import metrics_response
+
+metrics_router = APIRouter(
+    tags=["Metrics"],
+)
+
+
+@metrics_router.get(
+    path="/metrics",
+    status_code=status.HTTP_200_OK,
+    summary="Prometheus Metrics",
+    include_in_schema=False,
+)
+def get_metrics() -> Response:
+    """
+    # Endpoint exposing the metrics of this process to Prometheus.
+
+    ### Returns:
+        Response: Request latency, SQL statements, pool waits and bulk import
+        throughput, in the Prometheus text format.
+    """
+    return metrics_response()
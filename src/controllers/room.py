@@ -1,9 +1,14 @@
-from fastapi import APIRouter, status
+from datetime import datetime
+from typing import Optional
+
+from fastapi import APIRouter, Query, status
 
 from schemas.room import CreateRoomSchema
 
 from services.room import list_rooms_info, create_room, remove_room
 
+from settings import Settings
+
 room_router = APIRouter(
     prefix="/room",
     tags=["Room"],
@@ -15,15 +20,45 @@ room_router = APIRouter(
     status_code=status.HTTP_200_OK,
     summary="List rooms",
 )
-def get_list_rooms():
+async def get_list_rooms(
+    cursor: Optional[int] = None,
+    limit: int = Query(
+        default=Settings.LIST_PAGE_SIZE, ge=1, le=Settings.LIST_MAX_PAGE_SIZE
+    ),
+    group_id: Optional[int] = None,
+    course_id: Optional[int] = None,
+    teacher_id: Optional[int] = None,
+    starts_after: Optional[datetime] = None,
+    ends_before: Optional[datetime] = None,
+):
     """
-    # Endpoint for listing all rooms.
+    # Endpoint for listing rooms, one page at a time.
+
+    Rooms are ordered by ID. When there are more rooms, the `X-Next-Cursor`
+    response header holds the value to be sent as `cursor` for the next page.
+
+    ### Args:
+        cursor (int): ID of the last room of the previous page.
+        limit (int): Maximum number of rooms of the page.
+        group_id (int): Only rooms of this group.
+        course_id (int): Only rooms whose group belongs to this course.
+        teacher_id (int): Only rooms of this teacher.
+        starts_after (datetime): Only rooms whose group starts at or after this moment.
+        ends_before (datetime): Only rooms whose group ends at or before this moment.
 
     ### Returns:
         JSONResponse: Response with list of rooms.
 
     """
-    return list_rooms_info()
+    return await list_rooms_info(
+        cursor=cursor,
+        limit=limit,
+        group_id=group_id,
+        course_id=course_id,
+        teacher_id=teacher_id,
+        starts_after=starts_after,
+        ends_before=ends_before,
+    )
 
 
 @room_router.post(
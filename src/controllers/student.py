@@ -1,10 +1,19 @@
-from fastapi import APIRouter, UploadFile, status, File
+from typing import Optional
+
+from fastapi import APIRouter, UploadFile, status, File, Query
 
 from services.student import (
     obtain_students_by_group,
     obtain_students_by_room,
     update_data_students,
+    export_students,
 )
+from enums.file_format import ExportFormats
+from enums.import_job import ImportKinds
+from enums.import_report import ImportReportModes
+from services.import_job import get_import_job_status
+from services.import_report import get_stored_report
+from settings import Settings
 
 student_router = APIRouter(
     prefix="/student",
@@ -17,18 +26,34 @@ student_router = APIRouter(
     status_code=status.HTTP_200_OK,
     summary="Get students by group",
 )
-def get_students_by_group_id(group_id: int):
+async def get_students_by_group_id(
+    group_id: int,
+    fields: Optional[str] = None,
+    cursor: Optional[int] = None,
+    limit: int = Query(
+        default=Settings.LIST_PAGE_SIZE, ge=1, le=Settings.LIST_MAX_PAGE_SIZE
+    ),
+):
     """
     # Endpoint for retrieving a list of students based on the provided group ID.
 
+    Students are ordered by ID and listed once each. When there are more students,
+    the `X-Next-Cursor` response header holds the value to be sent as `cursor`
+    for the next page.
+
     ### Args:
         group_id (int): Group ID.
+        fields (str): Comma separated student columns to be returned, e.g. `first_name,email`. The ID is always included.
+        cursor (int): ID of the last student of the previous page.
+        limit (int): Maximum number of students of the page.
 
     ### Returns:
         JSONResponse: Response with list of students.
 
     """
-    return obtain_students_by_group(group_id=group_id)
+    return await obtain_students_by_group(
+        group_id=group_id, fields=fields, cursor=cursor, limit=limit
+    )
 
 
 @student_router.get(
@@ -36,18 +61,62 @@ def get_students_by_group_id(group_id: int):
     status_code=status.HTTP_200_OK,
     summary="Get students by room",
 )
-def get_students_by_room_id(room_id: int):
+async def get_students_by_room_id(
+    room_id: int,
+    fields: Optional[str] = None,
+    cursor: Optional[int] = None,
+    limit: int = Query(
+        default=Settings.LIST_PAGE_SIZE, ge=1, le=Settings.LIST_MAX_PAGE_SIZE
+    ),
+):
     """
     # Endpoint for retrieving a list of students based on the provided Room ID.
 
+    Students are ordered by ID and listed once each. When there are more students,
+    the `X-Next-Cursor` response header holds the value to be sent as `cursor`
+    for the next page.
+
     ### Args:
         room_id (int): Room ID.
+        fields (str): Comma separated student columns to be returned, e.g. `first_name,email`. The ID is always included.
+        cursor (int): ID of the last student of the previous page.
+        limit (int): Maximum number of students of the page.
 
     ### Returns:
         JSONResponse: Response with list of students.
 
     """
-    return obtain_students_by_room(room_id=room_id)
+    return await obtain_students_by_room(
+        room_id=room_id, fields=fields, cursor=cursor, limit=limit
+    )
+
+
+@student_router.get(
+    path="/export",
+    status_code=status.HTTP_200_OK,
+    summary="Export students",
+)
+def get_students_export(
+    file_format: ExportFormats = Query(default=ExportFormats.CSV, alias="format"),
+    group_id: Optional[int] = None,
+    room_id: Optional[int] = None,
+):
+    """
+    # Endpoint for exporting the enrolled students with their guardians.
+
+    The file has one row per enrollment, with the room, student and guardian
+    data, and is streamed while it is generated.
+
+    ### Args:
+        format (ExportFormats): `csv`, `ndjson` or `parquet`.
+        group_id (int): Only enrollments in rooms of this group.
+        room_id (int): Only enrollments in this room.
+
+    ### Returns:
+        StreamingResponse: The export file.
+
+    """
+    return export_students(file_format=file_format, group_id=group_id, room_id=room_id)
 
 
 @student_router.put(
@@ -55,15 +124,74 @@ def get_students_by_room_id(room_id: int):
     status_code=status.HTTP_200_OK,
     summary="Update students massive",
 )
-def update_students_guardian_data(file: UploadFile = File(...)):
+def update_students_guardian_data(
+    file: UploadFile = File(...),
+    background: bool = False,
+    resume: bool = False,
+    report: ImportReportModes = ImportReportModes.JSON,
+    compact: bool = False,
+):
+    """
+    # Endpoint to update the information of a group of students and guardian by processing an Excel, CSV or Parquet file containing enrollment data.
+
+    ### Args:
+        file (UploadFile): Excel, CSV or Parquet file containing student/guardian data (required).
+        background (bool): Process the file as a background job and return its ID at once.
+            Its progress is available at `GET /student/jobs/{job_id}`.
+        resume (bool): Make the upload resumable, continuing a previous resumable upload of the same file
+            and skipping the rows it already processed.
+        report (ImportReportModes): `json` for the whole report at the end, `ndjson` to stream it while
+            the rows are processed, or `stored` to save it for download at `GET /student/reports/{report_id}`.
+        compact (bool): Reference the rows of the report by number instead of echoing their data.
+
+    ### Returns:
+        JSONResponse:cResponse with details of updates made and not processed,
+        or 202 with the job ID when `background` is set.
+
+    """
+    return update_data_students(
+        file=file,
+        background=background,
+        resume=resume,
+        report=report,
+        compact=compact,
+    )
+
+
+@student_router.get(
+    path="/reports/{report_id}",
+    status_code=status.HTTP_200_OK,
+    summary="Download a stored update report",
+)
+def get_update_report(report_id: str):
+    """
+    # Endpoint for downloading the report of an update sent with `report=stored`.
+
+    ### Args:
+        report_id (str): Report ID returned by the update.
+
+    ### Returns:
+        FileResponse: NDJSON report, one line per entry with its row number and status.
+
+    """
+    return get_stored_report(report_id=report_id)
+
+
+@student_router.get(
+    path="/jobs/{job_id}",
+    status_code=status.HTTP_200_OK,
+    summary="Get the progress of an update job",
+)
+def get_update_job(job_id: str):
     """
-    # Endpoint to update the information of a group of students and guardian by processing an Excel file containing enrollment data.
+    # Endpoint for polling a background update job.
 
     ### Args:
-        file (UploadFile): Excel file containing student/guardian data (required).
+        job_id (str): Job ID returned when the file was accepted.
 
     ### Returns:
-        JSONResponse:cResponse with details of updates made and not processed.
+        JSONResponse: Rows processed and failed, processing rate and, once completed,
+        the row counts and URL of its report.
 
     """
-    return update_data_students(file=file)
+    return get_import_job_status(job_id=job_id, kind=ImportKinds.STUDENT_UPDATE)
@@ -1,9 +1,12 @@
-from fastapi import APIRouter, status
+from typing import Optional
+
+from fastapi import APIRouter, Header, Response, status
 from fastapi.responses import FileResponse
 
 from services.template import (
     list_available_templates,
     generate_template,
+    export_update_template,
 )
 
 template_router = APIRouter(
@@ -33,14 +36,45 @@ def get_list_templates():
     status_code=status.HTTP_200_OK,
     summary="Get template to be completed by id",
 )
-def get_template(template_id: int) -> FileResponse:
+def get_template(
+    template_id: int, if_none_match: Optional[str] = Header(default=None)
+) -> Response:
     """
     # This function is a GET endpoint that returns a specific template based on the provided template_id.
 
+    The file is served with an `ETag` and a `Cache-Control` header. Sending the
+    ETag back in `If-None-Match` returns 304 when the template did not change.
+
     ### Args:
         template_id (int): The ID of the template to be retrieved.
+        if_none_match (str): ETag of the copy held by the client.
+
+    ### Returns:
+        Response: An xlsx file with the required structure.
+    """
+    return generate_template(template_id=template_id, if_none_match=if_none_match)
+
+
+@template_router.get(
+    path="/update/prefilled",
+    status_code=status.HTTP_200_OK,
+    summary="Get update template filled with the students of a group or room",
+)
+def get_prefilled_update_template(
+    group_id: Optional[int] = None, room_id: Optional[int] = None
+) -> FileResponse:
+    """
+    # This function is a GET endpoint that returns the update template filled with the current data.
+
+    Each row holds a student enrolled in the group or room and their guardian,
+    ready to be edited and sent to `PUT /student/update/massive`. Exactly one of
+    `group_id` and `room_id` must be given.
+
+    ### Args:
+        group_id (int): Export the students enrolled in any room of this group.
+        room_id (int): Export the students enrolled in this room.
 
     ### Returns:
-        FileResponse: An xlsx file with the required structure.
+        FileResponse: An xlsx file with the update template structure and data.
     """
-    return generate_template(template_id=template_id)
+    return export_update_template(group_id=group_id, room_id=room_id)
@@ -23,6 +23,24 @@ def validate_exist_course(db_session: Session, course_id: int):
     return db_session.query(CourseModel).filter(CourseModel.id == course_id).first()
 
 
+def get_courses_by_ids(db_session: Session, course_ids: set[int]) -> list[CourseModel]:
+    """
+    Retrieve every course whose ID is in the given set.
+
+    Args:
+        db_session (Session): SQLAlchemy database session.
+        course_ids (set[int]): IDs of the courses being searched.
+
+    Returns:
+        List[CourseModel]: The courses that exist.
+    """
+
+    if not course_ids:
+        return []
+
+    return db_session.query(CourseModel).filter(CourseModel.id.in_(course_ids)).all()
+
+
 # POST
 
 
@@ -1,24 +1,46 @@
 """
 Okay
 """
-from fastapi.encoders import jsonable_encoder
-from sqlalchemy import or_
-from sqlalchemy.orm import Session
+from typing import Iterator, Optional
+
+from sqlalchemy import Integer, column, insert, or_, select, values
+from sqlalchemy.orm import Session, aliased
 
 from models.enrollment import EnrollmentModel
-from models.group import GroupModel
 from models.room import RoomModel
-from schemas.enrollment import CreateMassiveEnrollmentSchema
+from models.guardian import GuardianModel
+from models.student import StudentModel
+
+# Columns of the roster export, by output name.
+enrollment_export_columns = {
+    "enrollment_id": EnrollmentModel.id,
+    "room_id": EnrollmentModel.room_id,
+    "room_name": RoomModel.name,
+    "group_id": RoomModel.group_id,
+    "student_id": StudentModel.id,
+    "student_first_name": StudentModel.first_name,
+    "student_last_name": StudentModel.last_name,
+    "student_email": StudentModel.email,
+    "guardian_id": GuardianModel.id,
+    "guardian_first_name": GuardianModel.first_name,
+    "guardian_last_name": GuardianModel.last_name,
+    "guardian_email": GuardianModel.email,
+    "guardian_document_type_id": GuardianModel.document_type_id,
+    "guardian_document_number": GuardianModel.document_number,
+    "guardian_country_id": GuardianModel.country_id,
+}
 
 # GET
 
 
-def get_enrollment_by_ids(
-    db_session: Session, student_id: int, room_id: int
-) -> EnrollmentModel:
+def get_enrollment_by_ids(db_session: Session, student_id: int, room_id: int) -> bool:
     """
-    This function retrieves an enrollment record from the database based
-    on the student's ID and room ID.
+    This function checks whether a student is already enrolled in a room or in
+    any other room of the same group.
+
+    The check runs as a single EXISTS query, resolved through the
+    `(student_id, room_id)` unique index. Bulk uploads check many pairs at once with
+    `get_conflicting_enrollments`.
 
     Args:
         db_session (Session): SQLAlchemy database session.
@@ -26,35 +48,78 @@ def get_enrollment_by_ids(
         room_id (int): ID of the room being searched.
 
     Returns:
-        EnrollmentModel: Instance of the Enrollment model corresponding to the provided student ID
-        and room ID or None if no enrollment is found with those IDs.
+        bool: True if the student is enrolled in the room or in its group.
     """
 
+    target_room = aliased(RoomModel)
+    room_group_id = (
+        select(target_room.group_id)
+        .where(target_room.id == room_id)
+        .correlate(None)
+        .scalar_subquery()
+    )
     query = (
-        db_session.query(EnrollmentModel, RoomModel, GroupModel)
+        select(EnrollmentModel.id)
         .join(RoomModel, EnrollmentModel.room_id == RoomModel.id)
-        .join(GroupModel, RoomModel.group_id == GroupModel.id)
-        .filter(
+        .where(
             EnrollmentModel.student_id == student_id,
             or_(
-                (EnrollmentModel.room_id == room_id),
-                (
-                    GroupModel.id.in_(
-                        db_session.query(RoomModel.group_id)
-                        .join(EnrollmentModel, EnrollmentModel.room_id == RoomModel.id)
-                        .join(GroupModel, RoomModel.group_id == GroupModel.id)
-                        .filter(
-                            EnrollmentModel.student_id == student_id,
-                            EnrollmentModel.room_id == room_id,
-                        )
-                    )
-                ),
+                EnrollmentModel.room_id == room_id,
+                RoomModel.group_id == room_group_id,
             ),
         )
-        .first()
     )
 
-    return query
+    return db_session.scalar(select(query.exists()))
+
+
+def get_conflicting_enrollments(
+    db_session: Session, enrollments: set[tuple[int, int]]
+) -> set[tuple[int, int]]:
+    """
+    This function checks many `(student_id, room_id)` pairs at once and returns
+    those whose student is already enrolled in the room or in any other room of
+    the same group.
+
+    The pairs are sent as a VALUES list and checked with a single query.
+
+    Args:
+        db_session (Session): SQLAlchemy database session.
+        enrollments (set[tuple[int, int]]): Pairs of student ID and room ID to be checked.
+
+    Returns:
+        set[tuple[int, int]]: The pairs that conflict with an existing enrollment.
+    """
+
+    if not enrollments:
+        return set()
+
+    requested = values(
+        column("student_id", Integer),
+        column("room_id", Integer),
+        name="requested_enrollments",
+    ).data(list(enrollments))
+    requested_room = aliased(RoomModel)
+    enrolled_room = aliased(RoomModel)
+
+    enrolled = (
+        select(EnrollmentModel.id)
+        .join(enrolled_room, EnrollmentModel.room_id == enrolled_room.id)
+        .where(
+            EnrollmentModel.student_id == requested.c.student_id,
+            or_(
+                EnrollmentModel.room_id == requested.c.room_id,
+                enrolled_room.group_id == requested_room.group_id,
+            ),
+        )
+    )
+    query = (
+        select(requested.c.student_id, requested.c.room_id)
+        .join(requested_room, requested_room.id == requested.c.room_id)
+        .where(enrolled.exists())
+    )
+
+    return {(row.student_id, row.room_id) for row in db_session.execute(query)}
 
 
 def get_enrollment_by_room_id(room_id: int, db_session: Session) -> EnrollmentModel:
@@ -80,32 +145,68 @@ def get_enrollment_by_room_id(room_id: int, db_session: Session) -> EnrollmentMo
     return query
 
 
+def iter_enrollment_export_rows(
+    db_session: Session,
+    group_id: Optional[int] = None,
+    room_id: Optional[int] = None,
+    batch_size: int = 1000,
+) -> Iterator:
+    """
+    This function streams every enrollment with its room, student and guardian,
+    optionally limited to a group or room.
+
+    Rows are fetched from a server-side cursor in batches, so memory use does not
+    depend on the number of enrollments. The session must stay open while the
+    rows are consumed.
+
+    Args:
+        db_session (Session): SQLAlchemy database session.
+        group_id (int): Only enrollments in rooms of this group.
+        room_id (int): Only enrollments in this room.
+        batch_size (int): Rows fetched from the database at a time.
+
+    Returns:
+        Iterator[RowMapping]: One row per enrollment, keyed by the names of
+        `enrollment_export_columns`, ordered by enrollment ID.
+    """
+
+    query = (
+        select(
+            *(
+                model_column.label(name)
+                for name, model_column in enrollment_export_columns.items()
+            )
+        )
+        .join(RoomModel, RoomModel.id == EnrollmentModel.room_id)
+        .join(StudentModel, StudentModel.id == EnrollmentModel.student_id)
+        .join(GuardianModel, GuardianModel.id == StudentModel.guardian_id)
+        .order_by(EnrollmentModel.id)
+        .execution_options(yield_per=batch_size)
+    )
+    if group_id is not None:
+        query = query.where(RoomModel.group_id == group_id)
+    if room_id is not None:
+        query = query.where(EnrollmentModel.room_id == room_id)
+
+    yield from db_session.execute(query).mappings()
+
+
 # POST
 
 
-def create_enrollment(
-    session: Session,
-    validated_enrollment_data: CreateMassiveEnrollmentSchema,
-    student_id: int,
-) -> bool:
+def create_massive_enrollments(session: Session, enrollments: list[dict]) -> bool:
     """
-    Creates an enrollment record.
+    Creates several enrollment records with a single multi-row INSERT.
 
     Args:
         session (Session): SQLAlchemy session.
-        validated_enrollment_data (CreateMassiveEnrollmentSchema): Validated enrollment data.
-        student_id (int): Student ID.
+        enrollments (list[dict]): Dictionaries with the `student_id` and `room_id` of each enrollment.
 
     Returns:
         bool: True if enrollment creation is successful.
     """
-    validated_enrollment_data.student_id = student_id
-    enrollment_data_to_create = jsonable_encoder(
-        validated_enrollment_data, by_alias=False
-    )
-    create_enrollment = EnrollmentModel(**enrollment_data_to_create)
-    session.add(create_enrollment)
-    session.commit()
+    if enrollments:
+        session.execute(insert(EnrollmentModel), enrollments)
     return True
 
 
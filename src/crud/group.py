@@ -1,4 +1,9 @@
+from datetime import datetime
+from typing import Optional
+
 from fastapi.encoders import jsonable_encoder
+from sqlalchemy import Select, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from models.course import CourseModel
@@ -11,23 +16,73 @@ print("Hello, World!")
 print("Hello, World!")
 
 
-def list_groups_with_courses(db_session: Session):
-    """Retrieve a list of groups with respectives courses from the database.
+def _groups_with_courses_query(
+    cursor: Optional[int],
+    limit: Optional[int],
+    course_id: Optional[int],
+    starts_after: Optional[datetime],
+    ends_before: Optional[datetime],
+) -> Select:
+    """Build the query of a page of groups with respectives courses.
+
+    Groups are ordered by ID and paginated by keyset: only groups whose ID is
+    greater than the cursor are returned. The filters are applied in the query.
+    The statement is shared by the sync and async versions.
 
     Args:
-        db_session (Session): SQLAlchemy database session.
+        cursor (int): ID of the last group already listed.
+        limit (int): Maximum number of groups to be retrieved.
+        course_id (int): Only groups of this course.
+        starts_after (datetime): Only groups starting at or after this moment.
+        ends_before (datetime): Only groups ending at or before this moment.
+
+    Returns:
+        Select: Query of `(GroupModel, CourseModel)` rows.
+    """
+
+    query = select(GroupModel, CourseModel).join(
+        CourseModel, GroupModel.course_id == CourseModel.id
+    )
+
+    if cursor is not None:
+        query = query.where(GroupModel.id > cursor)
+    if course_id is not None:
+        query = query.where(GroupModel.course_id == course_id)
+    if starts_after is not None:
+        query = query.where(GroupModel.start_time >= starts_after)
+    if ends_before is not None:
+        query = query.where(GroupModel.end_time <= ends_before)
+
+    return query.order_by(GroupModel.id).limit(limit)
+
+
+async def list_groups_with_courses_async(
+    db_session: AsyncSession,
+    cursor: Optional[int] = None,
+    limit: Optional[int] = None,
+    course_id: Optional[int] = None,
+    starts_after: Optional[datetime] = None,
+    ends_before: Optional[datetime] = None,
+):
+    """Retrieve a list of groups with respectives courses without blocking the event loop.
+
+    Args:
+        db_session (AsyncSession): SQLAlchemy async database session.
+        cursor (int): ID of the last group already listed.
+        limit (int): Maximum number of groups to be retrieved.
+        course_id (int): Only groups of this course.
+        starts_after (datetime): Only groups starting at or after this moment.
+        ends_before (datetime): Only groups ending at or before this moment.
 
     Returns:
-        List[GroupModel]: List of groups with respectives courses.
+        List[Row]: List of groups with respectives courses.
     """
 
-    query = (
-        db_session.query(GroupModel, CourseModel)
-        .join(GroupModel, GroupModel.course_id == CourseModel.id)
-        .all()
+    query = _groups_with_courses_query(
+        cursor, limit, course_id, starts_after, ends_before
     )
 
-    return query
+    return (await db_session.execute(query)).all()
 
 
 def get_group_by_id(db_session: Session, group_id: int) -> GroupModel:
@@ -44,6 +99,23 @@ def get_group_by_id(db_session: Session, group_id: int) -> GroupModel:
     return db_session.query(GroupModel).filter(GroupModel.id == group_id).first()
 
 
+def get_groups_by_ids(db_session: Session, group_ids: set[int]) -> list[GroupModel]:
+    """Retrieve every group whose ID is in the given set.
+
+    Args:
+        db_session (Session): SQLAlchemy database session.
+        group_ids (set[int]): IDs of the groups being searched.
+
+    Returns:
+        List[GroupModel]: The groups that exist.
+    """
+
+    if not group_ids:
+        return []
+
+    return db_session.query(GroupModel).filter(GroupModel.id.in_(group_ids)).all()
+
+
 def get_group_by_course_id(db_session: Session, course_id: int) -> GroupModel:
     """Retrieve a group from the database based on its course ID.
 
@@ -1,96 +1,117 @@
-from fastapi.encoders import jsonable_encoder
+from sqlalchemy import cast, column, update, values
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.orm import Session
 
 from models.guardian import GuardianModel
-from schemas.guardian import CreateGuardianSchema, UpdateGuardianSchema
+from schemas.guardian import UpdateGuardianSchema
 
 # GET
 
 
-def get_guardian_by_email(db_session: Session, email: str) -> GuardianModel:
+def get_guardians_by_emails(db_session: Session, emails: set[str]) -> list:
     """
-    Retrieve a guardian from the database based on their email address.
+    Retrieve the IDs of the guardians matching any of the given email addresses.
 
     Args:
         db_session (Session): SQLAlchemy database session.
-        email (str): Email address of the guardian being searched.
+        emails (set[str]): Email addresses of the guardians being searched.
 
     Returns:
-        GuardianModel: Instance of the Guardian model corresponding to the provided email,
-                      or None if no guardian is found with that email.
+        List[Row]: Rows with the `id` and `email` of every guardian found.
     """
 
-    query = db_session.query(GuardianModel).filter(GuardianModel.email == email).first()
+    if not emails:
+        return []
 
-    return query
+    return (
+        db_session.query(GuardianModel.id, GuardianModel.email)
+        .filter(GuardianModel.email.in_(emails))
+        .all()
+    )
 
 
-def get_guardian_by_id(db_session: Session, id: int) -> GuardianModel:
+def get_guardians_by_ids(db_session: Session, ids: set[int]) -> list:
     """
-    Retrieve a guardian from the database based on their id.
+    Retrieve which of the given guardian IDs exist in the database.
 
     Args:
         db_session (Session): SQLAlchemy database session.
-        id (int): Id of the guardian being searched.
+        ids (set[int]): IDs of the guardians being searched.
 
     Returns:
-        GuardianModel: Instance of the Guardian model corresponding to the provided email,
-                      or None if no guardian is found with that email.
+        List[Row]: Rows with the `id` of every guardian found.
     """
 
-    query = db_session.query(GuardianModel).filter(GuardianModel.id == id).first()
+    if not ids:
+        return []
 
-    return query
+    return db_session.query(GuardianModel.id).filter(GuardianModel.id.in_(ids)).all()
 
 
 # POST
 
 
-def create_massive_guardian(
-    db_session: Session, guardian: CreateGuardianSchema
-) -> GuardianModel:
+def create_massive_guardians(db_session: Session, guardians: list[dict]) -> list:
     """
-    Create a new guardian in the database.
+    Create several guardians with a single multi-row INSERT.
+
+    Guardians whose email already exists are skipped, so they are not part of
+    the returned rows.
 
     Args:
         db_session (Session): SQLAlchemy database session.
-        guardian (CreateGuardianSchema): Guadian to be created.
+        guardians (list[dict]): Validated guardian payloads, keyed by field name.
 
     Returns:
-        GuardianModel: Instance of the guandiam model corresponding to the newly created guardian.
+        List[Row]: Rows with the `id` and `email` of every guardian inserted.
     """
 
-    guardian_data_to_create = jsonable_encoder(guardian, by_alias=False)
-    create_guardian = GuardianModel(**guardian_data_to_create)
-    db_session.add(create_guardian)
-    db_session.flush()
+    if not guardians:
+        return []
+
+    statement = (
+        insert(GuardianModel)
+        .on_conflict_do_nothing(index_elements=[GuardianModel.email])
+        .returning(GuardianModel.id, GuardianModel.email)
+    )
 
-    return create_guardian
+    return db_session.execute(statement, guardians).all()
 
 
 # PUT
 
 
-def update_massive_guardian(
-    db_session: Session,
-    updated_data: UpdateGuardianSchema,
-    current_guardian: GuardianModel,
-) -> GuardianModel:
+def update_massive_guardians(db_session: Session, guardians: list[dict]) -> int:
     """
-    Update the fields of an existing guardian in the database.
+    Update several guardians with a single `UPDATE ... FROM (VALUES ...)` statement.
 
     Args:
         db_session (Session): SQLAlchemy database session.
-        guardian_id (int): ID of the guardian to be updated.
-        updated_data (dict): Dictionary containing the updated guardian data.
+        guardians (list[dict]): Validated guardian payloads keyed by field name, at most one per ID.
 
     Returns:
-        GuardianModel: Instance of the updated guardian model.
+        int: Number of guardians updated.
     """
 
-    for field, value in jsonable_encoder(updated_data, by_alias=False).items():
-        setattr(current_guardian, field, value)
-
-    db_session.flush()
-
-    return current_guardian
+    if not guardians:
+        return 0
+
+    table = GuardianModel.__table__
+    fields = list(UpdateGuardianSchema.model_fields)
+    updated_data = values(
+        *[column(field, table.c[field].type) for field in fields],
+        name="updated_guardians",
+    ).data([tuple(guardian[field] for field in fields) for guardian in guardians])
+    statement = (
+        update(table)
+        .where(table.c.id == updated_data.c.id)
+        .values(
+            {
+                field: cast(updated_data.c[field], table.c[field].type)
+                for field in fields
+                if field != "id"
+            }
+        )
+    )
+
+    return db_session.execute(statement).rowcount
@@ -0,0 +1,160 @@
+import uuid
+from datetime import datetime
+
+from sqlalchemy.orm import Session
+
+from enums.import_job import ImportJobStatus
+from models.import_job import ImportJobModel
+
+# GET
+
+
+def get_import_job_by_id(db_session: Session, job_id: str) -> ImportJobModel:
+    """
+    Retrieve an import job from the local database based on its ID.
+
+    Args:
+        db_session (Session): SQLAlchemy local database session.
+        job_id (str): The ID of the job to be retrieved.
+
+    Returns:
+        ImportJobModel: The job with the specified ID, or None if it does not exist.
+    """
+
+    return db_session.query(ImportJobModel).filter(ImportJobModel.id == job_id).first()
+
+
+def get_unfinished_import_jobs(db_session: Session) -> list:
+    """
+    Retrieve the import jobs that are queued or running.
+
+    Args:
+        db_session (Session): SQLAlchemy local database session.
+
+    Returns:
+        List[ImportJobModel]: The unfinished jobs.
+    """
+
+    return (
+        db_session.query(ImportJobModel)
+        .filter(
+            ImportJobModel.status.in_(
+                [ImportJobStatus.QUEUED.value, ImportJobStatus.RUNNING.value]
+            )
+        )
+        .all()
+    )
+
+
+# POST
+
+
+def create_import_job(
+    db_session: Session, kind: str, file_name: str, owner: str
+) -> ImportJobModel:
+    """
+    Register a new queued import job.
+
+    Args:
+        db_session (Session): SQLAlchemy local database session.
+        kind (str): Pipeline that will process the file.
+        file_name (str): Name of the uploaded file.
+        owner (str): Process that will run the job.
+
+    Returns:
+        ImportJobModel: The newly created job.
+    """
+
+    job = ImportJobModel(
+        id=str(uuid.uuid4()),
+        kind=kind,
+        file_name=file_name,
+        status=ImportJobStatus.QUEUED.value,
+        owner=owner,
+        rows_processed=0,
+        rows_failed=0,
+        created_at=datetime.utcnow(),
+    )
+    db_session.add(job)
+    db_session.commit()
+    db_session.refresh(job)
+
+    return job
+
+
+# PUT
+
+
+def start_import_job(db_session: Session, job_id: str) -> ImportJobModel:
+    """
+    Mark an import job as running.
+
+    Args:
+        db_session (Session): SQLAlchemy local database session.
+        job_id (str): The ID of the job.
+
+    Returns:
+        ImportJobModel: The updated job.
+    """
+
+    job = get_import_job_by_id(db_session, job_id)
+    job.status = ImportJobStatus.RUNNING.value
+    job.started_at = datetime.utcnow()
+    db_session.commit()
+
+    return job
+
+
+def update_import_job_progress(
+    db_session: Session, job_id: str, rows_processed: int, rows_failed: int
+) -> ImportJobModel:
+    """
+    Store the number of rows processed so far by an import job.
+
+    Args:
+        db_session (Session): SQLAlchemy local database session.
+        job_id (str): The ID of the job.
+        rows_processed (int): Rows processed so far.
+        rows_failed (int): Rows with at least one failed entry so far.
+
+    Returns:
+        ImportJobModel: The updated job.
+    """
+
+    job = get_import_job_by_id(db_session, job_id)
+    job.rows_processed = rows_processed
+    job.rows_failed = rows_failed
+    db_session.commit()
+
+    return job
+
+
+def finish_import_job(
+    db_session: Session,
+    job_id: str,
+    status: ImportJobStatus,
+    report: str = None,
+    error: str = None,
+) -> ImportJobModel:
+    """
+    Mark an import job as finished, storing its report or error.
+
+    Args:
+        db_session (Session): SQLAlchemy local database session.
+        job_id (str): The ID of the job.
+        status (ImportJobStatus): Final status of the job.
+        report (str): JSON encoded 207 report, if the job completed.
+        error (str): Error description, if the job failed.
+
+    Returns:
+        ImportJobModel: The updated job.
+    """
+
+    job = get_import_job_by_id(db_session, job_id)
+    job.status = status.value
+    job.finished_at = datetime.utcnow()
+    job.report = report
+    job.error = error
+    db_session.commit()
+
+    return job
@@ -0,0 +1,207 @@
+from datetime import datetime
+
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import Session
+
+from models.import_ledger import ImportLedgerModel, ImportLedgerRunModel
+
+# GET
+
+
+def get_ledger_entries(db_session: Session, fingerprint: str, template_id: int) -> list:
+    """
+    Retrieve the recorded row outcomes of an upload, in row order.
+
+    Args:
+        db_session (Session): SQLAlchemy local database session.
+        fingerprint (str): SHA-256 of the uploaded file.
+        template_id (int): ID of the template the file was uploaded as.
+
+    Returns:
+        List[Row]: Rows with the `row_index` and JSON encoded `outcomes` of each recorded row.
+    """
+
+    return db_session.execute(
+        select(ImportLedgerModel.row_index, ImportLedgerModel.outcomes)
+        .where(
+            ImportLedgerModel.fingerprint == fingerprint,
+            ImportLedgerModel.template_id == template_id,
+        )
+        .order_by(ImportLedgerModel.row_index)
+    ).all()
+
+
+def get_ledger_run(
+    db_session: Session, fingerprint: str, template_id: int
+) -> ImportLedgerRunModel:
+    """
+    Retrieve the active run of an upload.
+
+    Args:
+        db_session (Session): SQLAlchemy local database session.
+        fingerprint (str): SHA-256 of the uploaded file.
+        template_id (int): ID of the template the file was uploaded as.
+
+    Returns:
+        ImportLedgerRunModel: The run, or None if the upload is not being imported.
+    """
+
+    return (
+        db_session.query(ImportLedgerRunModel)
+        .filter(
+            ImportLedgerRunModel.fingerprint == fingerprint,
+            ImportLedgerRunModel.template_id == template_id,
+        )
+        .first()
+    )
+
+
+def get_ledger_runs(db_session: Session) -> list:
+    """
+    Retrieve the active runs of every upload.
+
+    Args:
+        db_session (Session): SQLAlchemy local database session.
+
+    Returns:
+        List[ImportLedgerRunModel]: The active runs.
+    """
+
+    return db_session.query(ImportLedgerRunModel).all()
+
+
+# POST
+
+
+def create_ledger_entries(
+    db_session: Session, fingerprint: str, template_id: int, outcomes: dict
+):
+    """
+    Record the outcomes of several rows of an upload with a single INSERT.
+
+    Rows that already have outcomes keep them.
+
+    Args:
+        db_session (Session): SQLAlchemy local database session.
+        fingerprint (str): SHA-256 of the uploaded file.
+        template_id (int): ID of the template the file was uploaded as.
+        outcomes (dict): Map of row index to the JSON encoded outcomes of the row.
+    """
+
+    if not outcomes:
+        return
+
+    created_at = datetime.utcnow()
+    db_session.execute(
+        insert(ImportLedgerModel).on_conflict_do_nothing(),
+        [
+            {
+                "fingerprint": fingerprint,
+                "template_id": template_id,
+                "row_index": row_index,
+                "outcomes": row_outcomes,
+                "created_at": created_at,
+            }
+            for row_index, row_outcomes in outcomes.items()
+        ],
+    )
+    db_session.commit()
+
+
+def create_ledger_run(
+    db_session: Session, fingerprint: str, template_id: int, run_id: str, owner: str
+) -> bool:
+    """
+    Register the active run of an upload, unless another run is active.
+
+    Args:
+        db_session (Session): SQLAlchemy local database session.
+        fingerprint (str): SHA-256 of the uploaded file.
+        template_id (int): ID of the template the file was uploaded as.
+        run_id (str): ID of the run.
+        owner (str): Process running the import.
+
+    Returns:
+        bool: True if the run was registered.
+    """
+
+    created = db_session.execute(
+        insert(ImportLedgerRunModel)
+        .values(
+            fingerprint=fingerprint,
+            template_id=template_id,
+            run_id=run_id,
+            owner=owner,
+            started_at=datetime.utcnow(),
+        )
+        .on_conflict_do_nothing()
+    ).rowcount
+    db_session.commit()
+
+    return created == 1
+
+
+# DELETE
+
+
+def delete_ledger_entries(db_session: Session, fingerprint: str, template_id: int):
+    """
+    Remove the recorded row outcomes of an upload.
+
+    Args:
+        db_session (Session): SQLAlchemy local database session.
+        fingerprint (str): SHA-256 of the uploaded file.
+        template_id (int): ID of the template the file was uploaded as.
+    """
+
+    db_session.execute(
+        delete(ImportLedgerModel).where(
+            ImportLedgerModel.fingerprint == fingerprint,
+            ImportLedgerModel.template_id == template_id,
+        )
+    )
+    db_session.commit()
+
+
+def delete_ledger_entries_before(db_session: Session, created_before: datetime) -> int:
+    """
+    Remove the ledger entries recorded before the given time.
+
+    Args:
+        db_session (Session): SQLAlchemy local database session.
+        created_before (datetime): Entries older than this are deleted.
+
+    Returns:
+        int: Number of entries deleted.
+    """
+
+    deleted = db_session.execute(
+        delete(ImportLedgerModel).where(ImportLedgerModel.created_at < created_before)
+    ).rowcount
+    db_session.commit()
+
+    return deleted
+
+
+def delete_ledger_run(
+    db_session: Session, fingerprint: str, template_id: int, run_id: str
+):
+    """
+    Remove the active run of an upload, if it is still the given run.
+
+    Args:
+        db_session (Session): SQLAlchemy local database session.
+        fingerprint (str): SHA-256 of the uploaded file.
+        template_id (int): ID of the template the file was uploaded as.
+        run_id (str): ID of the run.
+    """
+
+    db_session.execute(
+        delete(ImportLedgerRunModel).where(
+            ImportLedgerRunModel.fingerprint == fingerprint,
+            ImportLedgerRunModel.template_id == template_id,
+            ImportLedgerRunModel.run_id == run_id,
+        )
+    )
+    db_session.commit()
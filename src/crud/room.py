@@ -1,3 +1,8 @@
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import Select, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from fastapi.encoders import jsonable_encoder
 
@@ -9,24 +14,88 @@ from schemas.room import CreateRoomSchema
 # GET
 
 
-def list_rooms_with_groups(db_session: Session):
+def _rooms_with_groups_query(
+    cursor: Optional[int],
+    limit: Optional[int],
+    group_id: Optional[int],
+    course_id: Optional[int],
+    teacher_id: Optional[int],
+    starts_after: Optional[datetime],
+    ends_before: Optional[datetime],
+) -> Select:
     """
-    Retrieve a list of rooms with respectives groups from the database.
+    Build the query of a page of rooms with respectives groups.
+
+    Rooms are ordered by ID and paginated by keyset: only rooms whose ID is
+    greater than the cursor are returned. The filters are applied in the query;
+    the time window refers to the schedule of the room's group. The statement
+    is shared by the sync and async versions.
 
     Args:
-        db_session (Session): SQLAlchemy database session.
+        cursor (int): ID of the last room already listed.
+        limit (int): Maximum number of rooms to be retrieved.
+        group_id (int): Only rooms of this group.
+        course_id (int): Only rooms whose group belongs to this course.
+        teacher_id (int): Only rooms of this teacher.
+        starts_after (datetime): Only rooms whose group starts at or after this moment.
+        ends_before (datetime): Only rooms whose group ends at or before this moment.
+
+    Returns:
+        Select: Query of `(RoomModel, GroupModel)` rows.
+    """
+
+    query = select(RoomModel, GroupModel).join(
+        GroupModel, RoomModel.group_id == GroupModel.id
+    )
+
+    if cursor is not None:
+        query = query.where(RoomModel.id > cursor)
+    if group_id is not None:
+        query = query.where(RoomModel.group_id == group_id)
+    if course_id is not None:
+        query = query.where(GroupModel.course_id == course_id)
+    if teacher_id is not None:
+        query = query.where(RoomModel.teacher_id == teacher_id)
+    if starts_after is not None:
+        query = query.where(GroupModel.start_time >= starts_after)
+    if ends_before is not None:
+        query = query.where(GroupModel.end_time <= ends_before)
+
+    return query.order_by(RoomModel.id).limit(limit)
+
+
+async def list_rooms_with_groups_async(
+    db_session: AsyncSession,
+    cursor: Optional[int] = None,
+    limit: Optional[int] = None,
+    group_id: Optional[int] = None,
+    course_id: Optional[int] = None,
+    teacher_id: Optional[int] = None,
+    starts_after: Optional[datetime] = None,
+    ends_before: Optional[datetime] = None,
+):
+    """
+    Retrieve a list of rooms with respectives groups without blocking the event loop.
+
+    Args:
+        db_session (AsyncSession): SQLAlchemy async database session.
+        cursor (int): ID of the last room already listed.
+        limit (int): Maximum number of rooms to be retrieved.
+        group_id (int): Only rooms of this group.
+        course_id (int): Only rooms whose group belongs to this course.
+        teacher_id (int): Only rooms of this teacher.
+        starts_after (datetime): Only rooms whose group starts at or after this moment.
+        ends_before (datetime): Only rooms whose group ends at or before this moment.
 
     Returns:
         List: List of rooms with respectives groups.
     """
 
-    query = (
-        db_session.query(RoomModel, GroupModel)
-        .join(RoomModel, RoomModel.group_id == GroupModel.id)
-        .all()
+    query = _rooms_with_groups_query(
+        cursor, limit, group_id, course_id, teacher_id, starts_after, ends_before
     )
 
-    return query
+    return (await db_session.execute(query)).all()
 
 
 def verify_room_exists(db_session: Session, room_id: int) -> RoomModel:
@@ -46,6 +115,24 @@ def verify_room_exists(db_session: Session, room_id: int) -> RoomModel:
     return query
 
 
+def get_rooms_by_ids(db_session: Session, room_ids: set[int]) -> list[RoomModel]:
+    """
+    Retrieve every room whose ID is in the given set.
+
+    Args:
+        db_session (Session): SQLAlchemy database session.
+        room_ids (set[int]): IDs of the rooms being searched.
+
+    Returns:
+        List[RoomModel]: The rooms that exist.
+    """
+
+    if not room_ids:
+        return []
+
+    return db_session.query(RoomModel).filter(RoomModel.id.in_(room_ids)).all()
+
+
 def get_room_by_group_id(db_session: Session, group_id: int) -> RoomModel:
     """
     Retrieve a room from the database based on its group ID.
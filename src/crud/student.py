@@ -1,146 +1,304 @@
+from typing import Iterator, Optional
+
+from sqlalchemy import Exists, Select, cast, column, exists, select, update, values
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from fastapi.encoders import jsonable_encoder
 
 from models.enrollment import EnrollmentModel
-from models.group import GroupModel
+from models.guardian import GuardianModel
 from models.room import RoomModel
 
 from models.student import StudentModel
-from schemas.student import CreateMassiveStudentSchema, UpdateMassiveStudentSchema
+from schemas.guardian import UpdateGuardianSchema
+from schemas.student import UpdateMassiveStudentSchema
+
+# Student and guardian columns, keyed by the headers of the update template.
+update_template_columns = {
+    **{
+        info.alias: getattr(StudentModel, field)
+        for field, info in UpdateMassiveStudentSchema.model_fields.items()
+    },
+    **{
+        info.alias: getattr(GuardianModel, field)
+        for field, info in UpdateGuardianSchema.model_fields.items()
+    },
+}
 
 # GET
 
 
-def get_student_by_email(db_session: Session, email: str) -> StudentModel:
+def get_students_by_emails(db_session: Session, emails: set[str]) -> list:
     """
-    Retrieve a student from the database based on their email address.
+    Retrieve the IDs of the students matching any of the given email addresses.
 
     Args:
         db_session (Session): SQLAlchemy database session.
-        email (str): Email address of the student being searched.
+        emails (set[str]): Email addresses of the students being searched.
 
     Returns:
-        StudentModel: Instance of the Student model corresponding to the provided email,
-                      or None if no student is found with that email.
+        List[Row]: Rows with the `id` and `email` of every student found.
     """
 
-    query = db_session.query(StudentModel).filter(StudentModel.email == email).first()
+    if not emails:
+        return []
 
-    return query
+    return (
+        db_session.query(StudentModel.id, StudentModel.email)
+        .filter(StudentModel.email.in_(emails))
+        .all()
+    )
 
 
-def get_student_by_id(db_session: Session, student_id: int) -> StudentModel:
+def get_students_by_ids(db_session: Session, student_ids: set[int]) -> list:
     """
-    Retrieve a student from the database based on their id.
+    Retrieve which of the given student IDs exist in the database.
 
     Args:
         db_session (Session): SQLAlchemy database session.
-        student_id (int): Id of the student being searched.
+        student_ids (set[int]): IDs of the students being searched.
 
     Returns:
-        StudentModel: Instance of the Student model corresponding to the provided id,
-                      or None if no student is found with that id.
+        List[Row]: Rows with the `id` of every student found.
     """
 
-    query = db_session.query(StudentModel).filter(StudentModel.id == student_id).first()
+    if not student_ids:
+        return []
 
-    return query
+    return (
+        db_session.query(StudentModel.id).filter(StudentModel.id.in_(student_ids)).all()
+    )
 
 
-def get_students_by_group_id(db_session: Session, group_id: int) -> list[StudentModel]:
+def _enrolled_in(*enrollment_filters) -> Exists:
     """
-    Retrieve a student from the database based on their group ID assigned.
+    Build the EXISTS condition matching students with at least one enrollment
+    that satisfies the filters, so each student is returned once.
 
     Args:
-        db_session (Session): SQLAlchemy database session.
-        group_id (int): Group ID of the student being searched.
+        enrollment_filters: Conditions on the enrollment and its room.
 
     Returns:
-        List[StudentModel]: List of instances of the Student model corresponding to the provided group ID
+        Exists: Condition to be applied on the students query.
     """
 
+    return (
+        exists()
+        .where(EnrollmentModel.student_id == StudentModel.id)
+        .where(RoomModel.id == EnrollmentModel.room_id)
+        .where(*enrollment_filters)
+    )
+
+
+def _enrolled_students_query(
+    enrollment_filter,
+    fields: Optional[list[str]],
+    cursor: Optional[int],
+    limit: Optional[int],
+) -> Select:
+    """
+    Build the query of the students having at least one enrollment that matches the filter.
+
+    Enrollments are checked with an EXISTS subquery, so each student appears once
+    however many matching enrollments they have. Only the requested columns are
+    selected, so rows can be returned as mappings without loading ORM objects.
+    The statement is shared by the sync and async versions.
+
+    Args:
+        enrollment_filter: Condition on the enrollment and its room.
+        fields (list[str]): Student columns to be selected; all of them if None. The ID is always included.
+        cursor (int): ID of the last student already listed.
+        limit (int): Maximum number of students to be retrieved.
+
+    Returns:
+        Select: Query of the selected columns of each student, ordered by ID.
+    """
+
+    student_columns = StudentModel.__table__.columns
+    selected = [
+        student_columns[field]
+        for field in fields or student_columns.keys()
+        if field != "id"
+    ]
+
     query = (
-        db_session.query(StudentModel)
-        .join(EnrollmentModel, EnrollmentModel.student_id == StudentModel.id)
-        .join(RoomModel, RoomModel.id == EnrollmentModel.room_id)
-        .join(GroupModel, GroupModel.id == RoomModel.group_id)
-        .filter(GroupModel.id == group_id)
-        .all()
+        select(StudentModel.id, *selected)
+        .where(_enrolled_in(enrollment_filter))
+        .order_by(StudentModel.id)
+        .limit(limit)
     )
+    if cursor is not None:
+        query = query.where(StudentModel.id > cursor)
 
     return query
 
 
-def get_students_by_room_id(db_session: Session, room_id: int) -> list[StudentModel]:
+async def get_students_by_group_id_async(
+    db_session: AsyncSession,
+    group_id: int,
+    fields: Optional[list[str]] = None,
+    cursor: Optional[int] = None,
+    limit: Optional[int] = None,
+) -> list:
     """
-    Retrieve a student from the database based on their room ID assigned.
+    Retrieve the students enrolled in any room of a group without blocking the event loop.
 
     Args:
-        db_session (Session): SQLAlchemy database session.
+        db_session (AsyncSession): SQLAlchemy async database session.
+        group_id (int): Group ID of the student being searched.
+        fields (list[str]): Student columns to be selected; all of them if None.
+        cursor (int): ID of the last student already listed.
+        limit (int): Maximum number of students to be retrieved.
+
+    Returns:
+        List[RowMapping]: The selected columns of each student of the group, ordered by ID.
+    """
+
+    query = _enrolled_students_query(
+        RoomModel.group_id == group_id, fields, cursor, limit
+    )
+
+    return (await db_session.execute(query)).mappings().all()
+
+
+async def get_students_by_room_id_async(
+    db_session: AsyncSession,
+    room_id: int,
+    fields: Optional[list[str]] = None,
+    cursor: Optional[int] = None,
+    limit: Optional[int] = None,
+) -> list:
+    """
+    Retrieve the students enrolled in a room without blocking the event loop.
+
+    Args:
+        db_session (AsyncSession): SQLAlchemy async database session.
         room_id (int): Room ID of the student being searched.
+        fields (list[str]): Student columns to be selected; all of them if None.
+        cursor (int): ID of the last student already listed.
+        limit (int): Maximum number of students to be retrieved.
+
+    Returns:
+        List[RowMapping]: The selected columns of each student of the room, ordered by ID.
+    """
+
+    query = _enrolled_students_query(
+        EnrollmentModel.room_id == room_id, fields, cursor, limit
+    )
+
+    return (await db_session.execute(query)).mappings().all()
+
+
+def iter_students_with_guardians(
+    db_session: Session,
+    group_id: Optional[int] = None,
+    room_id: Optional[int] = None,
+    batch_size: int = 1000,
+) -> Iterator:
+    """
+    Stream the students enrolled in a group or room, joined with their guardians.
+
+    Columns are labelled with the headers of the update template, so each row
+    can be written as is. Rows are fetched from a server-side cursor in batches,
+    so memory use does not depend on the number of students. The session must
+    stay open while the rows are consumed.
+
+    Args:
+        db_session (Session): SQLAlchemy database session.
+        group_id (int): Only students enrolled in any room of this group.
+        room_id (int): Only students enrolled in this room.
+        batch_size (int): Rows fetched from the database at a time.
 
     Returns:
-        List[StudentModel]: List of instances of the Student model corresponding to the provided Room ID
+        Iterator[RowMapping]: One row per student, keyed by template header, ordered by student ID.
     """
 
+    enrollment_filters = []
+    if group_id is not None:
+        enrollment_filters.append(RoomModel.group_id == group_id)
+    if room_id is not None:
+        enrollment_filters.append(EnrollmentModel.room_id == room_id)
+
     query = (
-        db_session.query(StudentModel)
-        .join(EnrollmentModel, EnrollmentModel.student_id == StudentModel.id)
-        .join(RoomModel, RoomModel.id == EnrollmentModel.room_id)
-        .filter(RoomModel.id == room_id)
-        .all()
+        select(
+            *(
+                model_column.label(header)
+                for header, model_column in update_template_columns.items()
+            )
+        )
+        .join(GuardianModel, GuardianModel.id == StudentModel.guardian_id)
+        .where(_enrolled_in(*enrollment_filters))
+        .order_by(StudentModel.id)
+        .execution_options(yield_per=batch_size)
     )
 
-    return query
+    yield from db_session.execute(query).mappings()
 
 
 # POST
 
 
-def create_massive_student(
-    db_session: Session, student: CreateMassiveStudentSchema
-) -> StudentModel:
+def create_massive_students(db_session: Session, students: list[dict]) -> list:
     """
-    Create a new student in the database.
+    Create several students with a single multi-row INSERT.
+
+    Students whose email already exists are skipped, so they are not part of
+    the returned rows.
 
     Args:
         db_session (Session): SQLAlchemy database session.
-        student (CreateMassiveStudentSchema): Student to be created.
+        students (list[dict]): Validated student payloads, keyed by field name.
 
     Returns:
-        StudentModel: Instance of the Student model corresponding to the newly created student.
+        List[Row]: Rows with the `id` and `email` of every student inserted.
     """
 
-    student_data_to_create = jsonable_encoder(student, by_alias=False)
-    create_student = StudentModel(**student_data_to_create)
-    db_session.add(create_student)
-    db_session.flush()
+    if not students:
+        return []
+
+    statement = (
+        insert(StudentModel)
+        .on_conflict_do_nothing(index_elements=[StudentModel.email])
+        .returning(StudentModel.id, StudentModel.email)
+    )
 
-    return create_student
+    return db_session.execute(statement, students).all()
 
 
 # PUT
 
 
-def update_massive_student(
-    db_session: Session,
-    updated_data: UpdateMassiveStudentSchema,
-    current_student: StudentModel,
-) -> StudentModel:
+def update_massive_students(db_session: Session, students: list[dict]) -> int:
     """
-    Update student in the database.
+    Update several students with a single `UPDATE ... FROM (VALUES ...)` statement.
 
     Args:
         db_session (Session): SQLAlchemy database session.
-        student (UpdateMassiveStudentSchema): Student to be updated.
+        students (list[dict]): Validated student payloads keyed by field name, at most one per ID.
 
     Returns:
-        StudentModel: Instance of the Student model corresponding to the newly created student.
+        int: Number of students updated.
     """
 
-    for field, value in jsonable_encoder(updated_data, by_alias=False).items():
-        setattr(current_student, field, value)
-
-    db_session.flush()
+    if not students:
+        return 0
+
+    table = StudentModel.__table__
+    fields = list(UpdateMassiveStudentSchema.model_fields)
+    updated_data = values(
+        *[column(field, table.c[field].type) for field in fields],
+        name="updated_students",
+    ).data([tuple(student[field] for field in fields) for student in students])
+    statement = (
+        update(table)
+        .where(table.c.id == updated_data.c.id)
+        .values(
+            {
+                field: cast(updated_data.c[field], table.c[field].type)
+                for field in fields
+                if field != "id"
+            }
+        )
+    )
 
-    return current_student
+    return db_session.execute(statement).rowcount
@@ -26,19 +26,24 @@ def get_teacher_by_email(db_session: Session, email: str) -> TeacherModel:
     return query
 
 
-def get_teacher_by_id(db_session: Session, teacher_id: int) -> TeacherModel:
+def get_teachers_by_ids(
+    db_session: Session, teacher_ids: set[int]
+) -> list[TeacherModel]:
     """
-    Retrieve a teacher from the database based on its ID.
+    Retrieve every teacher whose ID is in the given set.
 
     Args:
         db_session (Session): SQLAlchemy database session.
-        teacher_id (int): The ID of the teacher to be retrieved.
+        teacher_ids (set[int]): IDs of the teachers being searched.
 
     Returns:
-        TeacherModel: The teacher with the specified ID.
+        List[TeacherModel]: The teachers that exist.
     """
 
-    return db_session.query(TeacherModel).filter(TeacherModel.id == teacher_id).first()
+    if not teacher_ids:
+        return []
+
+    return db_session.query(TeacherModel).filter(TeacherModel.id.in_(teacher_ids)).all()
 
 
 # POST
@@ -0,0 +1,111 @@
+import asyncio
+import threading
+import time
+import weakref
+
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from database.database import get_database_url
+from settings import Settings
+from utils.metrics import DB_POOL_CHECKOUT_SECONDS, instrument_engine
+from utils.sql_profile import profile_engine
+
+# Session factory of the async read paths, bound to the engine of the running loop.
+# Objects stay readable after the session is closed, so they can be serialized.
+AsyncSessionLocal = async_sessionmaker(expire_on_commit=False)
+
+# Engine of each event loop, dropped when the loop is garbage collected.
+_async_engines = weakref.WeakKeyDictionary()
+_async_engines_lock = threading.Lock()
+
+
+class MeteredAsyncQueuePool(AsyncAdaptedQueuePool):
+    """
+    Async queue pool that records how long each checkout waits for a connection.
+    """
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            DB_POOL_CHECKOUT_SECONDS.labels("async").observe(
+                time.perf_counter() - start
+            )
+
+
+def get_async_engine() -> AsyncEngine:
+    """
+    Return the asyncpg engine of the running event loop, creating it on first use.
+
+    The engine owns a connection pool configured from the same settings as the
+    sync engine. Pooled connections belong to the event loop that opened them,
+    so each loop serving the application gets its own engine.
+
+    Returns:
+        AsyncEngine: The async SQLAlchemy engine of the running loop.
+    """
+    loop = asyncio.get_running_loop()
+    engine = _async_engines.get(loop)
+
+    if engine is None:
+        with _async_engines_lock:
+            engine = _async_engines.get(loop)
+            if engine is None:
+                _drop_closed_loop_engines()
+                engine = create_async_engine(
+                    get_database_url("postgresql+asyncpg"),
+                    poolclass=MeteredAsyncQueuePool,
+                    pool_size=Settings.DB_POOL_SIZE,
+                    max_overflow=Settings.DB_MAX_OVERFLOW,
+                    pool_pre_ping=Settings.DB_POOL_PRE_PING,
+                    pool_recycle=Settings.DB_POOL_RECYCLE,
+                    pool_timeout=Settings.DB_POOL_TIMEOUT,
+                )
+                instrument_engine(engine.sync_engine)
+                profile_engine(engine.sync_engine)
+                _async_engines[loop] = engine
+
+    return engine
+
+
+def _drop_closed_loop_engines():
+    """
+    Drop the engines of the event loops that were closed without disposing them.
+
+    Their connections cannot be closed once their loop is gone, so the pools are
+    only dereferenced. Must be called holding the engines lock.
+    """
+    for loop in [loop for loop in _async_engines if loop.is_closed()]:
+        _async_engines.pop(loop).sync_engine.dispose(close=False)
+
+
+async def dispose_async_engine():
+    """
+    Close every pooled async connection of the running event loop and drop its engine.
+    """
+    with _async_engines_lock:
+        engine = _async_engines.pop(asyncio.get_running_loop(), None)
+        _drop_closed_loop_engines()
+
+    if engine is not None:
+        await engine.dispose()
+
+
+def create_async_connection() -> AsyncSession:
+    """
+    Returns a new async session bound to the asyncpg engine of the running loop.
+
+    Must be called from a running event loop.
+
+    Returns:
+        session (AsyncSession): A SQLAlchemy async database session.
+    """
+
+    return AsyncSessionLocal(bind=get_async_engine())
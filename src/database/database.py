@@ -1,35 +1,132 @@
+import threading
+import time
+from contextlib import contextmanager
+
 import sqlalchemy
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import Engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import QueuePool
 
 from settings import Settings
+from utils.metrics import DB_POOL_CHECKOUT_SECONDS, instrument_engine
+from utils.sql_profile import profile_engine
 
 Base = declarative_base()
 
+# Session factory shared by services and tests, bound to the engine on first use.
+SessionLocal = sessionmaker()
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+class MeteredQueuePool(QueuePool):
+    """
+    QueuePool that records how long each checkout waits for a connection.
+    """
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            DB_POOL_CHECKOUT_SECONDS.labels("sync").observe(time.perf_counter() - start)
+
+
+def get_database_url(drivername: str = "postgresql") -> sqlalchemy.engine.URL:
+    """
+    Build the PostgreSQL connection URL from the application settings.
+
+    Args:
+        drivername (str): SQLAlchemy dialect and driver, e.g. "postgresql+asyncpg".
+
+    Returns:
+        URL: SQLAlchemy connection URL.
+    """
+
+    return sqlalchemy.engine.url.URL.create(
+        drivername=drivername,
+        username=Settings.USERNAME_DB,
+        password=Settings.USERPASSWORD_DB,
+        host=Settings.HOST_DB,
+        port=int(Settings.PORT_DB),
+        database=Settings.DB_NAME,
+    )
+
+
+def get_engine() -> Engine:
+    """
+    Return the process-wide SQLAlchemy engine, creating it on first use.
+
+    The engine owns a QueuePool configured from the settings, so connections
+    are reused across requests instead of being opened for every call. Its
+    statements and pool checkouts are recorded in the metrics, and by the SQL
+    profiles active when they run.
+
+    Returns:
+        Engine: The shared SQLAlchemy engine.
+    """
+    global _engine
+
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = create_engine(
+                    get_database_url(),
+                    poolclass=MeteredQueuePool,
+                    pool_size=Settings.DB_POOL_SIZE,
+                    max_overflow=Settings.DB_MAX_OVERFLOW,
+                    pool_pre_ping=Settings.DB_POOL_PRE_PING,
+                    pool_recycle=Settings.DB_POOL_RECYCLE,
+                    pool_timeout=Settings.DB_POOL_TIMEOUT,
+                )
+                instrument_engine(_engine)
+                profile_engine(_engine)
+                SessionLocal.configure(bind=_engine)
+
+    return _engine
+
+
+def dispose_engine():
+    """
+    Close every pooled connection and drop the shared engine.
+
+    The next call to get_engine() builds a fresh engine.
+    """
+    global _engine
+
+    with _engine_lock:
+        if _engine is not None:
+            _engine.dispose()
+            _engine = None
+
 
 def create_connection():
     """
-    Establishes a connection to the PostgreSQL database and returns a session object.
+    Returns a new session bound to the shared, pooled PostgreSQL engine.
 
     Returns:
         session (Session): A SQLAlchemy database session.
     """
 
-    # Create an SQLAlchemy engine using the provided database connection settings.
-    engine = create_engine(
-        sqlalchemy.engine.url.URL(
-            drivername="postgresql",
-            username=Settings.USERNAME_DB,
-            password=Settings.USERPASSWORD_DB,
-            host=Settings.HOST_DB,
-            port=int(Settings.PORT_DB),
-            database=Settings.DB_NAME,
-            query={},
-        ),
-    )
+    get_engine()
+    return SessionLocal()
+
+
+@contextmanager
+def begin_read_only(session: Session):
+    """
+    Begin a transaction on the session in which PostgreSQL rejects any write.
+
+    Args:
+        session (Session): SQLAlchemy session without a transaction in progress.
+
+    Returns:
+        Iterator[Session]: The session, inside the read-only transaction.
+    """
 
-    # Create a session
-    session_maker = sessionmaker(bind=engine)
-    session = session_maker()
-    return session
+    with session.begin():
+        session.execute(text("SET TRANSACTION READ ONLY"))
+        yield session
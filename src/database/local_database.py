@@ -0,0 +1,134 @@
+import os
+import socket
+import threading
+
+from sqlalchemy import create_engine, event, inspect, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.orm import sessionmaker
+
+from settings import Settings
+
+# Base for the process-local state (import jobs and ledger) kept outside PostgreSQL.
+LocalBase = declarative_base()
+
+LocalSessionLocal = sessionmaker()
+
+_local_engine = None
+_local_engine_lock = threading.Lock()
+
+
+def _configure_sqlite(dbapi_connection, connection_record):
+    """
+    Let readers and the import workers use the SQLite file concurrently.
+    """
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA busy_timeout=5000")
+    cursor.close()
+
+
+def _add_missing_columns(engine: Engine):
+    """
+    Add the nullable columns declared after a local table was created.
+
+    `create_all` only creates missing tables, so files written by an older
+    version would otherwise lack the newer columns.
+    """
+    inspector = inspect(engine)
+
+    with engine.begin() as connection:
+        for table in LocalBase.metadata.sorted_tables:
+            existing = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name not in existing and column.nullable:
+                    connection.execute(
+                        text(
+                            f"ALTER TABLE {table.name} ADD COLUMN {column.name} "
+                            f"{column.type.compile(engine.dialect)}"
+                        )
+                    )
+
+
+def get_local_engine() -> Engine:
+    """
+    Return the engine of the local SQLite state database, creating it on first use.
+
+    The tables and columns declared on LocalBase are created if they do not exist.
+
+    Returns:
+        Engine: The shared SQLite engine.
+    """
+    global _local_engine
+
+    if _local_engine is None:
+        with _local_engine_lock:
+            if _local_engine is None:
+                # Register the local models before creating their tables.
+                import models.import_job  # noqa: F401
+                import models.import_ledger  # noqa: F401
+
+                engine = create_engine(
+                    f"sqlite:///{Settings.LOCAL_DB_PATH}",
+                    connect_args={"check_same_thread": False},
+                )
+                event.listen(engine, "connect", _configure_sqlite)
+                LocalBase.metadata.create_all(engine)
+                _add_missing_columns(engine)
+                LocalSessionLocal.configure(bind=engine)
+                _local_engine = engine
+
+    return _local_engine
+
+
+def create_local_connection():
+    """
+    Returns a new session bound to the local SQLite state database.
+
+    Returns:
+        session (Session): A SQLAlchemy database session.
+    """
+
+    get_local_engine()
+    return LocalSessionLocal()
+
+
+def current_owner() -> str:
+    """
+    Identify this process in the local state, e.g. as the owner of a job.
+
+    Returns:
+        str: Host name and process ID.
+    """
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def is_owner_alive(owner: str) -> bool:
+    """
+    Tell whether the process identified by `current_owner` may still be running.
+
+    Processes of other hosts sharing the file cannot be checked and are assumed
+    to be running.
+
+    Args:
+        owner (str): Owner recorded by a process, or None for rows written before
+            owners were recorded.
+
+    Returns:
+        bool: False if the process is known to have stopped.
+    """
+    if owner is None:
+        return False
+
+    host, _, pid = owner.rpartition(":")
+    if host != socket.gethostname():
+        return True
+
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+
+    return True
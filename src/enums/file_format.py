@@ -0,0 +1,21 @@
+from enum import Enum
+
+
+class FileFormats(Enum):
+    """
+    File formats accepted by the bulk upload endpoints
+    """
+
+    XLSX = "xlsx"
+    CSV = "csv"
+    PARQUET = "parquet"
+
+
+class ExportFormats(str, Enum):
+    """
+    File formats produced by the roster export endpoint
+    """
+
+    CSV = "csv"
+    NDJSON = "ndjson"
+    PARQUET = "parquet"
@@ -0,0 +1,26 @@
+from enum import Enum
+
+
+class ImportKinds(Enum):
+    """
+    Bulk import pipelines, with the prefix of the routes serving their jobs and reports
+    """
+
+    ENROLLMENT = ("enrollment", "/enrollment")
+    STUDENT_UPDATE = ("update", "/student")
+
+    def __init__(self, kind, url_prefix):
+        self.kind = kind
+        self.url_prefix = url_prefix
+
+
+class ImportJobStatus(Enum):
+    """
+    Lifecycle states of a background import job
+    """
+
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+    INTERRUPTED = "interrupted"
@@ -0,0 +1,11 @@
+from enum import Enum
+
+
+class ImportReportModes(str, Enum):
+    """
+    Ways the bulk upload endpoints deliver their 207 report
+    """
+
+    JSON = "json"
+    NDJSON = "ndjson"
+    STORED = "stored"
@@ -0,0 +1,13 @@
+from enum import Enum
+
+
+class StudentFields(Enum):
+    """
+    Student columns that can be requested from the roster endpoints
+    """
+
+    ID = "id"
+    FIRST_NAME = "first_name"
+    LAST_NAME = "last_name"
+    EMAIL = "email"
+    GUARDIAN_ID = "guardian_id"
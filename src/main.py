@@ -2,6 +2,17 @@ import uvicorn
 from fastapi import FastAPI, status, HTTPException
 from fastapi.responses import JSONResponse
 
+from database.async_database import dispose_async_engine
+from database.database import dispose_engine
+from services.import_job import reconcile_import_jobs, shutdown_import_executor
+from services.import_ledger import release_stale_ledger_runs
+from services.import_validation import shutdown_validation_executor
+from services.reference import get_reference_cache_backend
+from services.template import warm_template_cache
+from settings import Settings
+from utils.metrics import MetricsMiddleware
+from utils.sql_profile import SqlProfileMiddleware
+
 # Controllers
 from controllers.template import template_router
 from controllers.enrollment import enrollment_router
@@ -10,6 +21,7 @@ from controllers.group import group_router
 from controllers.room import room_router
 from controllers.course import course_router
 from controllers.teacher import teacher_router
+from controllers.metrics import metrics_router
 
 app = FastAPI(
     title="Student Management API",
@@ -38,6 +50,37 @@ app.include_router(course_router)
 # Teacher Router
 app.include_router(teacher_router)
 
+# Metrics Router
+app.include_router(metrics_router)
+
+app.add_middleware(MetricsMiddleware)
+app.add_middleware(
+    SqlProfileMiddleware,
+    always=Settings.SQL_PROFILE,
+    repeat_threshold=Settings.SQL_PROFILE_REPEAT_THRESHOLD,
+)
+
+
+@app.on_event("startup")
+def warm_caches():
+    # Fails at startup if the configured reference cache cannot be reached.
+    get_reference_cache_backend()
+    warm_template_cache()
+
+
+@app.on_event("startup")
+def reconcile_local_state():
+    reconcile_import_jobs()
+    release_stale_ledger_runs()
+
+
+@app.on_event("shutdown")
+async def release_resources():
+    shutdown_import_executor()
+    shutdown_validation_executor()
+    dispose_engine()
+    await dispose_async_engine()
+
 
 # Exception Handlers
 @app.exception_handler(Exception)
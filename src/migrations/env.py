@@ -0,0 +1,73 @@
+from logging.config import fileConfig
+
+from alembic import context
+from sqlalchemy import create_engine, pool
+
+from database.database import Base, get_database_url
+
+# Models register their tables in Base.metadata when imported.
+import models.course  # noqa: F401
+import models.enrollment  # noqa: F401
+import models.group  # noqa: F401
+import models.guardian  # noqa: F401
+import models.room  # noqa: F401
+import models.student  # noqa: F401
+import models.teacher  # noqa: F401
+
+SCHEMA = "students_mngt"
+
+if context.config.config_file_name is not None:
+    fileConfig(context.config.config_file_name)
+
+target_metadata = Base.metadata
+
+
+def include_name(name, type_, parent_names):
+    """
+    Limit the comparison with the live database to the application schema.
+    """
+    if type_ == "schema":
+        return name == SCHEMA
+    return True
+
+
+def configure(**kwargs):
+    context.configure(
+        target_metadata=target_metadata,
+        include_schemas=True,
+        include_name=include_name,
+        version_table_schema=SCHEMA,
+        compare_type=True,
+        **kwargs,
+    )
+
+
+def run_migrations_offline():
+    """
+    Emit the migration SQL without connecting to the database.
+    """
+    configure(url=get_database_url(), literal_binds=True)
+
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online():
+    """
+    Run the migrations against the database configured in the settings.
+    """
+    engine = create_engine(get_database_url(), poolclass=pool.NullPool)
+
+    with engine.connect() as connection:
+        connection.exec_driver_sql(f"CREATE SCHEMA IF NOT EXISTS {SCHEMA}")
+        connection.commit()
+        configure(connection=connection)
+
+        with context.begin_transaction():
+            context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
@@ -0,0 +1,111 @@
+"""Baseline schema
+
+Tables of the students_mngt schema as they existed before migrations were
+introduced. Databases created before then should be marked with
+`alembic stamp 0001` instead of running this revision.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18 00:00:00
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+SCHEMA = "students_mngt"
+
+
+def upgrade():
+    op.create_table(
+        "courses",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("name", sa.String(length=255), nullable=False),
+        sa.Column("description", sa.Text(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+        schema=SCHEMA,
+    )
+    op.create_table(
+        "guardians",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("first_name", sa.String(length=100), nullable=False),
+        sa.Column("last_name", sa.String(length=100), nullable=False),
+        sa.Column("email", sa.String(length=100), nullable=False),
+        sa.Column("document_type_id", sa.Integer(), nullable=True),
+        sa.Column("document_number", sa.Integer(), nullable=True),
+        sa.Column("country_id", sa.Integer(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("email"),
+        schema=SCHEMA,
+    )
+    op.create_table(
+        "teachers",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("first_name", sa.String(length=100), nullable=False),
+        sa.Column("last_name", sa.String(length=100), nullable=False),
+        sa.Column("email", sa.String(length=100), nullable=False),
+        sa.Column("document_type_id", sa.Integer(), nullable=True),
+        sa.Column("document_number", sa.Integer(), nullable=True),
+        sa.Column("country_id", sa.Integer(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("email"),
+        schema=SCHEMA,
+    )
+    op.create_table(
+        "groups",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("name", sa.String(length=255), nullable=False),
+        sa.Column("description", sa.Text(), nullable=True),
+        sa.Column("start_time", sa.TIMESTAMP(timezone=False), nullable=True),
+        sa.Column("end_time", sa.TIMESTAMP(timezone=False), nullable=True),
+        sa.Column("course_id", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["course_id"], [f"{SCHEMA}.courses.id"]),
+        sa.PrimaryKeyConstraint("id"),
+        schema=SCHEMA,
+    )
+    op.create_table(
+        "students",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("first_name", sa.String(length=100), nullable=False),
+        sa.Column("last_name", sa.String(length=100), nullable=False),
+        sa.Column("email", sa.String(length=100), nullable=False),
+        sa.Column("guardian_id", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["guardian_id"], [f"{SCHEMA}.guardians.id"]),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("email"),
+        schema=SCHEMA,
+    )
+    op.create_table(
+        "rooms",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("name", sa.String(length=255), nullable=False),
+        sa.Column("group_id", sa.Integer(), nullable=False),
+        sa.Column("teacher_id", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["group_id"], [f"{SCHEMA}.groups.id"]),
+        sa.ForeignKeyConstraint(["teacher_id"], [f"{SCHEMA}.teachers.id"]),
+        sa.PrimaryKeyConstraint("id"),
+        schema=SCHEMA,
+    )
+    op.create_table(
+        "enrollments",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("student_id", sa.Integer(), nullable=True),
+        sa.Column("room_id", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["room_id"], [f"{SCHEMA}.rooms.id"]),
+        sa.PrimaryKeyConstraint("id"),
+        schema=SCHEMA,
+    )
+
+
+def downgrade():
+    op.drop_table("enrollments", schema=SCHEMA)
+    op.drop_table("rooms", schema=SCHEMA)
+    op.drop_table("students", schema=SCHEMA)
+    op.drop_table("groups", schema=SCHEMA)
+    op.drop_table("teachers", schema=SCHEMA)
+    op.drop_table("guardians", schema=SCHEMA)
+    op.drop_table("courses", schema=SCHEMA)
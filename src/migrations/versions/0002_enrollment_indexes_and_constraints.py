@@ -0,0 +1,105 @@
+"""Enrollment indexes and constraints
+
+Index the foreign keys used by the enrollment, room and group lookups, link
+enrollments to their student and allow a single enrollment per student and
+room. Duplicated enrollments are removed first, keeping the oldest one, and so
+are enrollments of students that no longer exist.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 00:00:00
+"""
+
+from alembic import op
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+SCHEMA = "students_mngt"
+
+
+def upgrade():
+    op.execute(
+        f"""
+        DELETE FROM {SCHEMA}.enrollments duplicate
+        USING {SCHEMA}.enrollments kept
+        WHERE duplicate.student_id = kept.student_id
+          AND duplicate.room_id = kept.room_id
+          AND duplicate.id > kept.id
+        """
+    )
+    op.execute(
+        f"""
+        DELETE FROM {SCHEMA}.enrollments enrollment
+        WHERE enrollment.student_id IS NOT NULL
+          AND NOT EXISTS (
+              SELECT 1 FROM {SCHEMA}.students student
+              WHERE student.id = enrollment.student_id
+          )
+        """
+    )
+
+    op.create_unique_constraint(
+        "uq_enrollments_student_id_room_id",
+        "enrollments",
+        ["student_id", "room_id"],
+        schema=SCHEMA,
+    )
+    op.create_foreign_key(
+        "enrollments_student_id_fkey",
+        "enrollments",
+        "students",
+        ["student_id"],
+        ["id"],
+        source_schema=SCHEMA,
+        referent_schema=SCHEMA,
+    )
+    op.create_index(
+        op.f("ix_students_mngt_enrollments_room_id"),
+        "enrollments",
+        ["room_id"],
+        schema=SCHEMA,
+    )
+    op.create_index(
+        op.f("ix_students_mngt_rooms_group_id"), "rooms", ["group_id"], schema=SCHEMA
+    )
+    op.create_index(
+        op.f("ix_students_mngt_rooms_teacher_id"),
+        "rooms",
+        ["teacher_id"],
+        schema=SCHEMA,
+    )
+    op.create_index(
+        op.f("ix_students_mngt_groups_course_id"),
+        "groups",
+        ["course_id"],
+        schema=SCHEMA,
+    )
+
+
+def downgrade():
+    op.drop_index(
+        op.f("ix_students_mngt_groups_course_id"), table_name="groups", schema=SCHEMA
+    )
+    op.drop_index(
+        op.f("ix_students_mngt_rooms_teacher_id"), table_name="rooms", schema=SCHEMA
+    )
+    op.drop_index(
+        op.f("ix_students_mngt_rooms_group_id"), table_name="rooms", schema=SCHEMA
+    )
+    op.drop_index(
+        op.f("ix_students_mngt_enrollments_room_id"),
+        table_name="enrollments",
+        schema=SCHEMA,
+    )
+    op.drop_constraint(
+        "enrollments_student_id_fkey", "enrollments", schema=SCHEMA, type_="foreignkey"
+    )
+    op.drop_constraint(
+        "uq_enrollments_student_id_room_id",
+        "enrollments",
+        schema=SCHEMA,
+        type_="unique",
+    )
@@ -1,5 +1,5 @@
 from database.database import Base
-from sqlalchemy import Column, Integer, ForeignKey
+from sqlalchemy import Column, Integer, ForeignKey, UniqueConstraint
 
 
 class EnrollmentModel(Base):
@@ -9,8 +9,16 @@ class EnrollmentModel(Base):
 
     __tablename__ = "enrollments"
 
-    __table_args__ = {"schema": "students_mngt"}
+    # The unique constraint also serves as the index of student_id lookups.
+    __table_args__ = (
+        UniqueConstraint(
+            "student_id", "room_id", name="uq_enrollments_student_id_room_id"
+        ),
+        {"schema": "students_mngt"},
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
-    student_id = Column(Integer)
-    room_id = Column(Integer, ForeignKey("students_mngt.rooms.id"), nullable=False)
+    student_id = Column(Integer, ForeignKey("students_mngt.students.id"))
+    room_id = Column(
+        Integer, ForeignKey("students_mngt.rooms.id"), nullable=False, index=True
+    )
@@ -16,4 +16,6 @@ class GroupModel(Base):
     description = Column(Text)
     start_time = Column(TIMESTAMP(timezone=False))
     end_time = Column(TIMESTAMP(timezone=False))
-    course_id = Column(Integer, ForeignKey("students_mngt.courses.id"), nullable=False)
+    course_id = Column(
+        Integer, ForeignKey("students_mngt.courses.id"), nullable=False, index=True
+    )
@@ -0,0 +1,23 @@
+from database.local_database import LocalBase
+from sqlalchemy import Column, DateTime, Integer, String, Text
+
+
+class ImportJobModel(LocalBase):
+    """
+    Import Job Model
+    """
+
+    __tablename__ = "import_jobs"
+
+    id = Column(String(36), primary_key=True)
+    kind = Column(String(50), nullable=False)
+    file_name = Column(String(255))
+    status = Column(String(20), nullable=False)
+    owner = Column(String(255))
+    rows_processed = Column(Integer, nullable=False, default=0)
+    rows_failed = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime, nullable=False)
+    started_at = Column(DateTime)
+    finished_at = Column(DateTime)
+    report = Column(Text)
+    error = Column(Text)
@@ -0,0 +1,30 @@
+from database.local_database import LocalBase
+from sqlalchemy import Column, DateTime, Integer, String, Text
+
+
+class ImportLedgerModel(LocalBase):
+    """
+    Import Ledger Model
+    """
+
+    __tablename__ = "import_ledger"
+
+    fingerprint = Column(String(64), primary_key=True)
+    template_id = Column(Integer, primary_key=True)
+    row_index = Column(Integer, primary_key=True)
+    outcomes = Column(Text, nullable=False)
+    created_at = Column(DateTime, nullable=False, index=True)
+
+
+class ImportLedgerRunModel(LocalBase):
+    """
+    Import Ledger Run Model
+    """
+
+    __tablename__ = "import_ledger_runs"
+
+    fingerprint = Column(String(64), primary_key=True)
+    template_id = Column(Integer, primary_key=True)
+    run_id = Column(String(32), nullable=False)
+    owner = Column(String(255), nullable=False)
+    started_at = Column(DateTime, nullable=False)
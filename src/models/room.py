@@ -13,7 +13,9 @@ class RoomModel(Base):
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     name = Column(String(255), nullable=False)
-    group_id = Column(Integer, ForeignKey("students_mngt.groups.id"), nullable=False)
+    group_id = Column(
+        Integer, ForeignKey("students_mngt.groups.id"), nullable=False, index=True
+    )
     teacher_id = Column(
-        Integer, ForeignKey("students_mngt.teachers.id"), nullable=False
+        Integer, ForeignKey("students_mngt.teachers.id"), nullable=False, index=True
     )
@@ -6,6 +6,7 @@ from crud.course import delete_course, post_course, validate_exist_course
 from crud.group import get_group_by_course_id
 
 from database.database import create_connection
+from services.reference import course_cache
 
 from schemas.course import CreateCourseSchema
 
@@ -23,13 +24,14 @@ def create_course(course: CreateCourseSchema):
     """
     try:
         session = create_connection()
+        new_course = post_course(db_session=session, course=course)
+        course_cache.invalidate(new_course.id)
+
         return JSONResponse(
             status_code=status.HTTP_201_CREATED,
             content={
                 "message": "Data created successfully",
-                "data": jsonable_encoder(
-                    post_course(db_session=session, course=course)
-                ),
+                "data": jsonable_encoder(new_course),
             },
         )
 
@@ -70,6 +72,7 @@ def remove_course(course_id: int):
             )
 
         delete_course(db_session=session, course_id=course_id)
+        course_cache.invalidate(course_id)
 
         return JSONResponse(
             status_code=status.HTTP_200_OK,
@@ -1,29 +1,45 @@
-from fastapi import UploadFile, status, HTTPException
+from collections import Counter
+from functools import partial
+from typing import NamedTuple
+
+from fastapi import Request, UploadFile, status, HTTPException
 from fastapi.encoders import jsonable_encoder
 from fastapi.responses import JSONResponse
-from pydantic import ValidationError
 from sqlalchemy.orm import Session
 
 
-from database.database import create_connection
+from database.database import begin_read_only, create_connection
+from enums.import_job import ImportKinds
+from enums.import_report import ImportReportModes
+from enums.template import TypeTemplates
 
 from schemas.guardian import CreateGuardianSchema
 from schemas.student import CreateMassiveStudentSchema
 from schemas.enrollment import CreateMassiveEnrollmentSchema
 
 from crud.enrollment import (
-    create_enrollment,
-    get_enrollment_by_ids,
+    create_massive_enrollments,
+    get_conflicting_enrollments,
     delete_enrollment,
 )
-from crud.room import verify_room_exists
-from services.guardian import create_guardian
-from services.student import create_student, extract_data_from_file
-
-student_id_resonse_key = "Student ID"
-room_id_resonse_key = "Room ID"
-message_error = "Error message"
-status_response_key = "Status"
+from crud.guardian import create_massive_guardians, get_guardians_by_emails
+from crud.student import create_massive_students, get_students_by_emails
+from services.import_report import (
+    UnexpectedFailure,
+    build_import_report,
+    import_report_response,
+    iter_import_results,
+    message_error,
+    room_id_resonse_key,
+    status_response_key,
+    student_data_response_key,
+    student_id_resonse_key,
+    validation_failures,
+)
+from services.file_upload import extract_data_from_body, extract_data_from_file
+from services.import_job import submit_import_job
+from services.import_ledger import LedgerKey, fingerprint_file
+from services.reference import find_rooms
 
 
 def validate_data(enrollment):
@@ -47,134 +63,577 @@ def validate_data(enrollment):
     )
 
 
-def validate_enrollment(
+def _resolve_ids(known_ids: dict, pending: dict, create, fetch):
+    """
+    Insert the pending records and add their IDs to the known email/ID map.
+
+    Records inserted concurrently by another request are skipped by the INSERT,
+    so their IDs are fetched afterwards.
+
+    Args:
+        known_ids (dict): Map of email to ID, updated in place.
+        pending (dict): Map of email to the payload of the record to be created.
+        create (Callable): Bulk creation function returning `(id, email)` rows.
+        fetch (Callable): Lookup function by emails returning `(id, email)` rows.
+    """
+    if not pending:
+        return
+
+    known_ids.update({row.email: row.id for row in create(list(pending.values()))})
+
+    missing = pending.keys() - known_ids.keys()
+    if missing:
+        known_ids.update({row.email: row.id for row in fetch(missing)})
+
+
+class EnrollmentPlan(NamedTuple):
+    """
+    Enrollments accepted so far, by student email, so rows are checked against each other.
+
+    Attributes:
+        rooms (set): `(student email, room ID)` pairs planned.
+        groups (set): `(student email, group ID)` pairs planned.
+        emails (set): Emails of the students with a planned enrollment.
+    """
+
+    rooms: set
+    groups: set
+    emails: set
+
+
+def _plan_enrollments(
     session: Session,
-    validated_enrollment_data: CreateMassiveEnrollmentSchema,
-    student_id: int,
-):
+    validated_rows: list,
+    guardian_ids: dict,
+    student_ids: dict,
+    plan: EnrollmentPlan = None,
+) -> tuple:
     """
-    Validates enrollment data and checks for room and enrollment availability.
+    Prefetch the data referenced by the validated rows and decide which rows can be enrolled.
+
+    Guardians, students and rooms are loaded with one `IN (...)` query each, and
+    conflicts with existing enrollments are found with a single batched query.
+    Rows referencing a missing room or a room/group the student is already
+    enrolled in are rejected.
 
     Args:
         session (Session): SQLAlchemy session.
-        validated_enrollment_data (CreateMassiveEnrollmentSchema): Validated enrollment data.
-        student_id (int): Student ID.
+        validated_rows (list): Tuples of row index and validated guardian, student and enrollment payloads.
+        guardian_ids (dict): Map of guardian email to ID, filled in place.
+        student_ids (dict): Map of student email to ID, filled in place.
+        plan (EnrollmentPlan): Enrollments planned by previous chunks that were not
+            written, updated in place. A new plan is used when omitted.
 
     Returns:
-        bool: True if validation passes.
+        Tuple[list, list]: The validated rows that can be enrolled, and the
+        `(index, student email, error message)` of the rejected ones. The email
+        is None when the student does not exist yet.
+    """
+    guardian_ids.update(
+        {
+            row.email: row.id
+            for row in get_guardians_by_emails(
+                session, {guardian["email"] for _, guardian, _, _ in validated_rows}
+            )
+        }
+    )
+    student_ids.update(
+        {
+            row.email: row.id
+            for row in get_students_by_emails(
+                session, {student["email"] for _, _, student, _ in validated_rows}
+            )
+        }
+    )
+    room_groups = {
+        room_id: room["group_id"]
+        for room_id, room in find_rooms(
+            session, {enrollment["room_id"] for _, _, _, enrollment in validated_rows}
+        ).items()
+        if room is not None
+    }
+
+    # Existing enrollments are checked in the database with one batched query;
+    # rows of the chunk are checked against each other by student email, so that
+    # students that are not created yet are covered as well.
+    conflicts = get_conflicting_enrollments(
+        session,
+        {
+            (student_ids[student["email"]], enrollment["room_id"])
+            for _, _, student, enrollment in validated_rows
+            if student["email"] in student_ids and enrollment["room_id"] in room_groups
+        },
+    )
+    if plan is None:
+        plan = EnrollmentPlan(rooms=set(), groups=set(), emails=set())
+    already_enrolled = "Student already enrolled in room or group: {room_id}"
+
+    planned_rows, rejected_rows = [], []
+
+    for row in validated_rows:
+        index, _, validated_student_data, validated_enrollment_data = row
+        email = validated_student_data["email"]
+        room_id = validated_enrollment_data["room_id"]
+        group_id = room_groups.get(room_id)
+
+        if group_id is None:
+            detail = f"Room ID: {room_id} does not exist"
+        elif (student_ids.get(email), room_id) in conflicts:
+            detail = already_enrolled.format(room_id=room_id)
+        elif (email, room_id) in plan.rooms or (email, group_id) in plan.groups:
+            detail = already_enrolled.format(room_id=room_id)
+        else:
+            plan.rooms.add((email, room_id))
+            plan.groups.add((email, group_id))
+            plan.emails.add(email)
+            planned_rows.append(row)
+            continue
 
+        # Only students that exist by the time the row is processed are reported.
+        known_student = email in student_ids or email in plan.emails
+        rejected_rows.append((index, email if known_student else None, detail))
+
+    return planned_rows, rejected_rows
+
+
+def _write_enrollments(
+    session: Session, planned_rows: list, guardian_ids: dict, student_ids: dict
+):
+    """
+    Create the missing guardians and students and the enrollments of the planned rows.
+
+    Each table is written with a single multi-row INSERT. When several rows share
+    an email, the first one provides the data of the guardian or student created.
+
+    Args:
+        session (Session): SQLAlchemy session.
+        planned_rows (list): Rows accepted by `_plan_enrollments`.
+        guardian_ids (dict): Map of guardian email to ID, completed in place.
+        student_ids (dict): Map of student email to ID, completed in place.
     """
-    verify_room = verify_room_exists(
-        db_session=session, room_id=validated_enrollment_data.room_id
+    new_guardians = {}
+    for _, validated_guardian_data, _, _ in planned_rows:
+        if validated_guardian_data["email"] not in guardian_ids:
+            new_guardians.setdefault(
+                validated_guardian_data["email"], validated_guardian_data
+            )
+    _resolve_ids(
+        guardian_ids,
+        new_guardians,
+        lambda guardians: create_massive_guardians(session, guardians),
+        lambda emails: get_guardians_by_emails(session, emails),
+    )
+
+    new_students = {}
+    for _, validated_guardian_data, validated_student_data, _ in planned_rows:
+        if validated_student_data["email"] not in student_ids:
+            validated_student_data["guardian_id"] = guardian_ids[
+                validated_guardian_data["email"]
+            ]
+            new_students.setdefault(
+                validated_student_data["email"], validated_student_data
+            )
+    _resolve_ids(
+        student_ids,
+        new_students,
+        lambda students: create_massive_students(session, students),
+        lambda emails: get_students_by_emails(session, emails),
     )
-    if not verify_room:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Room ID: {validated_enrollment_data.room_id} does not exist",
-        )
 
-    verify_available_enrollment = get_enrollment_by_ids(
-        db_session=session,
-        student_id=student_id,
-        room_id=validated_enrollment_data.room_id,
+    create_massive_enrollments(
+        session,
+        [
+            {
+                "student_id": student_ids[validated_student_data["email"]],
+                "room_id": validated_enrollment_data["room_id"],
+            }
+            for _, _, validated_student_data, validated_enrollment_data in planned_rows
+        ],
     )
 
-    if verify_available_enrollment:
-        raise HTTPException(
-            status_code=status.HTTP_409_CONFLICT,
-            detail=f"Student already enrolled in room or group: {validated_enrollment_data.room_id}",
+
+def _write_in_savepoint(
+    session: Session, planned_rows: list, guardian_ids: dict, student_ids: dict
+):
+    """
+    Write the planned rows inside a savepoint of the current transaction.
+
+    The email/ID maps are only completed once the savepoint is released, so the
+    IDs of records rolled back with it are never reused by later rows.
+
+    Args:
+        session (Session): SQLAlchemy session.
+        planned_rows (list): Rows accepted by `_plan_enrollments`.
+        guardian_ids (dict): Map of guardian email to ID, completed in place.
+        student_ids (dict): Map of student email to ID, completed in place.
+    """
+    resolved_guardian_ids, resolved_student_ids = dict(guardian_ids), dict(student_ids)
+
+    with session.begin_nested():
+        _write_enrollments(
+            session, planned_rows, resolved_guardian_ids, resolved_student_ids
         )
 
-    return True
+    guardian_ids.update(resolved_guardian_ids)
+    student_ids.update(resolved_student_ids)
 
 
-def create_enrollment_students(file: UploadFile):
+def process_enrollment_chunk(session: Session, records: list) -> list:
     """
-    Process a file containing enrollment data and create guardian, student, and enrollment records.
+    Enroll a chunk of validated records with a fixed number of queries.
+
+    The valid rows are planned and written in
+    a single transaction, committed once per chunk. If the bulk write fails, the
+    rows are replayed one by one inside savepoints, so that a bad row only rolls
+    back its own records and the rest of the chunk is still committed.
 
     Args:
-        file (UploadFile): Excel file containing enrollment data.
+        session (Session): SQLAlchemy session.
+        records (list): Records of the uploaded file, as `ValidatedRecord`.
 
     Returns:
-        JSONResponse: Response with details of successful and failed enrollments.
+        List[List[Tuple[bool, dict]]]: Report entries of each record, in order.
     """
-    if not file.filename.endswith(".xlsx"):
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="File extension not supported",
-        )
+    results = [[] for _ in records]
+    validated_rows = []
 
-    failed_students = []
-    successful_students = []
+    for index, enrollment in enumerate(records):
+        if enrollment.errors:
+            results[index] = validation_failures(enrollment.record, enrollment.errors)
+        else:
+            validated_rows.append((index, *enrollment.payload))
 
-    file_enrollment = extract_data_from_file(file)
+    guardian_ids, student_ids = {}, {}
+    rejected_rows = []
+    row_errors = {}
 
-    for enrollment in file_enrollment:
-        guardian_id, student_id = None, None
-        try:
-            (
-                validated_guardian_data,
-                validated_student_data,
-                validated_enrollment_data,
-            ) = validate_data(enrollment)
-        except ValidationError as e:
-            for error in e.errors():
-                failed_students.append(
-                    {
-                        "Record": enrollment,
-                        "Column Error": error.get("loc"),
-                        "Error message": error.get("msg"),
-                        "Value entered": error.get("input"),
-                        "Status": "Failed",
-                    }
-                )
-            continue
-
-        try:
-            session = create_connection()
-
-            with session.begin():
-                guardian_id = create_guardian(session, validated_guardian_data)
-                student_id = create_student(
-                    session, validated_student_data, guardian_id
-                )
-
-                if validate_enrollment(
-                    session=session,
-                    validated_enrollment_data=validated_enrollment_data,
-                    student_id=student_id,
-                ):
-                    create_enrollment(session, validated_enrollment_data, student_id)
-                    successful_students.append(
+    try:
+        with session.begin():
+            planned_rows, rejected_rows = _plan_enrollments(
+                session, validated_rows, guardian_ids, student_ids
+            )
+            try:
+                _write_in_savepoint(session, planned_rows, guardian_ids, student_ids)
+            except Exception:
+                for row in planned_rows:
+                    try:
+                        _write_in_savepoint(session, [row], guardian_ids, student_ids)
+                    except Exception as e:
+                        row_errors[row[0]] = e
+    except Exception as e:
+        rejected_indexes = {index for index, _, _ in rejected_rows}
+        row_errors = {
+            index: e
+            for index, _, _, _ in validated_rows
+            if index not in rejected_indexes
+        }
+        planned_rows = []
+
+    for index, _, validated_student_data, _ in validated_rows:
+        if index in row_errors:
+            results[index] = UnexpectedFailure(
+                [
+                    (
+                        False,
                         {
-                            student_id_resonse_key: student_id,
-                            room_id_resonse_key: validated_enrollment_data.room_id,
-                            "Status": "Successful",
-                        }
+                            student_data_response_key: jsonable_encoder(
+                                CreateMassiveStudentSchema.model_construct(
+                                    **validated_student_data
+                                )
+                            ),
+                            message_error: row_errors[index].args,
+                            status_response_key: "Failed",
+                        },
                     )
-        except HTTPException as e:
-            failed_students.append(
+                ]
+            )
+
+    for index, _, validated_student_data, validated_enrollment_data in planned_rows:
+        if index in row_errors:
+            continue
+        results[index] = [
+            (
+                True,
+                {
+                    student_id_resonse_key: student_ids[
+                        validated_student_data["email"]
+                    ],
+                    room_id_resonse_key: validated_enrollment_data["room_id"],
+                    status_response_key: "Successful",
+                },
+            )
+        ]
+
+    # Rejected rows are reported last so students created by earlier rows of
+    # the chunk are reported with their ID.
+    for index, email, detail in rejected_rows:
+        results[index] = [
+            (
+                False,
                 {
-                    student_id_resonse_key: student_id,
-                    message_error: e.detail,
+                    student_id_resonse_key: student_ids.get(email),
+                    message_error: detail,
                     status_response_key: "Failed",
-                }
+                },
+            )
+        ]
+
+    return results
+
+
+class EnrollmentPreview(NamedTuple):
+    """
+    State of a dry run carried from one chunk to the next.
+
+    Attributes:
+        plan (EnrollmentPlan): Enrollments the import would create so far.
+        guardians (dict): Whether each guardian email already exists.
+        students (dict): Whether each student email already exists.
+        rows (Counter): Rows that would be enrolled and rows that would fail.
+    """
+
+    plan: EnrollmentPlan
+    guardians: dict
+    students: dict
+    rows: Counter
+
+
+def preview_enrollment_chunk(
+    session: Session, records: list, preview: EnrollmentPreview
+) -> list:
+    """
+    Report what the import of a chunk would do, without writing anything.
+
+    The same batched existence checks as the import are run in a read-only
+    transaction. Students planned by earlier chunks are tracked by email in the
+    preview, since they are not in the database.
+
+    Args:
+        session (Session): SQLAlchemy session.
+        records (list): Records of the uploaded file, as `ValidatedRecord`.
+        preview (EnrollmentPreview): State of the dry run, updated in place.
+
+    Returns:
+        List[List[Tuple[bool, dict]]]: Report entries of each record, in order.
+    """
+    results = [[] for _ in records]
+    validated_rows = []
+
+    for index, enrollment in enumerate(records):
+        if enrollment.errors:
+            results[index] = validation_failures(enrollment.record, enrollment.errors)
+        else:
+            validated_rows.append((index, *enrollment.payload))
+
+    guardian_ids, student_ids = {}, {}
+
+    with begin_read_only(session):
+        planned_rows, rejected_rows = _plan_enrollments(
+            session, validated_rows, guardian_ids, student_ids, preview.plan
+        )
+
+    for row in planned_rows:
+        (
+            index,
+            validated_guardian_data,
+            validated_student_data,
+            validated_enrollment_data,
+        ) = row
+        preview.guardians.setdefault(
+            validated_guardian_data["email"],
+            validated_guardian_data["email"] in guardian_ids,
+        )
+        preview.students.setdefault(
+            validated_student_data["email"],
+            validated_student_data["email"] in student_ids,
+        )
+        results[index] = [
+            (
+                True,
+                {
+                    student_id_resonse_key: student_ids.get(
+                        validated_student_data["email"]
+                    ),
+                    room_id_resonse_key: validated_enrollment_data["room_id"],
+                    status_response_key: "Successful",
+                },
             )
-        except Exception as e:
-            failed_students.append(
+        ]
+
+    for index, email, detail in rejected_rows:
+        results[index] = [
+            (
+                False,
                 {
-                    "Student Data": jsonable_encoder(validated_student_data),
-                    message_error: e.args,
+                    student_id_resonse_key: student_ids.get(email),
+                    message_error: detail,
                     status_response_key: "Failed",
-                }
+                },
             )
+        ]
 
-    return JSONResponse(
-        status_code=status.HTTP_207_MULTI_STATUS,
-        content={
-            "Successful users": successful_students,
-            "Failed users": failed_students,
-        },
+    preview.rows["enrolled"] += len(planned_rows)
+    preview.rows["failed"] += len(records) - len(planned_rows)
+
+    return results
+
+
+def _preview_summary(preview: EnrollmentPreview) -> dict:
+    """
+    Count the rows and records a dry run found would be created or reused.
+
+    Args:
+        preview (EnrollmentPreview): State of the finished dry run.
+
+    Returns:
+        dict: Summary section of the dry run report.
+    """
+    guardians = Counter(preview.guardians.values())
+    students = Counter(preview.students.values())
+
+    return {
+        "Rows": preview.rows["enrolled"] + preview.rows["failed"],
+        "Enrollments to create": preview.rows["enrolled"],
+        "Failed rows": preview.rows["failed"],
+        "Guardians to create": guardians[False],
+        "Guardians to reuse": guardians[True],
+        "Students to create": students[False],
+        "Students to reuse": students[True],
+    }
+
+
+def _preview_enrollments(records, compact: bool = False) -> JSONResponse:
+    """
+    Report what the import of the records would do, without writing anything.
+
+    Args:
+        records (Iterable[dict]): Enrollment records, as read from the upload.
+        compact (bool): Reference the rows of the report by number instead of echoing them.
+
+    Returns:
+        JSONResponse: The 207 report with a summary of the records to create or reuse.
+    """
+    preview = EnrollmentPreview(
+        plan=EnrollmentPlan(rooms=set(), groups=set(), emails=set()),
+        guardians={},
+        students={},
+        rows=Counter(),
+    )
+    report = build_import_report(
+        iter_import_results(
+            partial(preview_enrollment_chunk, preview=preview),
+            validate_data,
+            records,
+        ),
+        compact,
+    )
+    report["Summary"] = _preview_summary(preview)
+
+    return JSONResponse(status_code=status.HTTP_207_MULTI_STATUS, content=report)
+
+
+def create_enrollment_students(
+    file: UploadFile,
+    background: bool = False,
+    dry_run: bool = False,
+    resume: bool = False,
+    report: ImportReportModes = ImportReportModes.JSON,
+    compact: bool = False,
+):
+    """
+    Process a file containing enrollment data and create guardian, student, and enrollment records.
+
+    The records are processed in chunks of `Settings.IMPORT_CHUNK_SIZE` rows, each
+    one validated by the process pool and resolved with a handful of set-based
+    queries.
+
+    Args:
+        file (UploadFile): Excel, CSV or Parquet file containing enrollment data.
+        background (bool): Queue the file as an import job instead of processing it in the request.
+        dry_run (bool): Only report what the import would do, without writing anything.
+            A dry run always runs in the request.
+        resume (bool): Record the outcome of each row and skip the rows recorded by
+            a previous run of the same file. Background jobs always record them.
+        report (ImportReportModes): Return the report as JSON, stream it as NDJSON
+            or store it for download. A dry run always returns JSON.
+        compact (bool): Reference the rows of the report by number instead of echoing them.
+
+    Returns:
+        Response: Response with details of successful and failed enrollments,
+        or with the ID of the queued job. A dry run adds a summary of the records
+        that would be created or reused.
+    """
+    if dry_run:
+        return _preview_enrollments(extract_data_from_file(file), compact)
+
+    if background:
+        return submit_import_job(
+            file=file,
+            kind=ImportKinds.ENROLLMENT,
+            process_chunk=process_enrollment_chunk,
+            validate=validate_data,
+            template_id=TypeTemplates.ENROLLMENT_STUDENT.template_id,
+            resume=resume,
+        )
+
+    # Only resumable uploads pay for hashing the file and recording its rows.
+    ledger_key = None
+    if resume:
+        ledger_key = LedgerKey(
+            fingerprint_file(file.file), TypeTemplates.ENROLLMENT_STUDENT.template_id
+        )
+    file_enrollment = extract_data_from_file(
+        file, detach=report == ImportReportModes.NDJSON
+    )
+
+    return import_report_response(
+        iter_import_results(
+            process_enrollment_chunk,
+            validate_data,
+            file_enrollment,
+            ledger_key,
+            resume,
+        ),
+        report,
+        compact,
+    )
+
+
+def create_enrollment_batch(
+    request: Request,
+    dry_run: bool = False,
+    report: ImportReportModes = ImportReportModes.JSON,
+    compact: bool = False,
+):
+    """
+    Enroll the records of a JSON array or NDJSON request body.
+
+    The records are keyed by the columns of the enrollment template and go
+    through the same chunked validation and writes as the file uploads. They
+    are parsed while the body is received, so neither the body nor a
+    spreadsheet is ever held in memory. The rows of the chunks processed before
+    a malformed record is reached stay enrolled.
+
+    Args:
+        request (Request): Request with a JSON array of records, or one record per line.
+        dry_run (bool): Only report what the import would do, without writing anything.
+        report (ImportReportModes): Return the report as JSON, stream it as NDJSON
+            or store it for download. A dry run always returns JSON.
+        compact (bool): Reference the rows of the report by number instead of echoing them.
+
+    Returns:
+        Response: Response with details of successful and failed enrollments.
+        A dry run adds a summary of the records that would be created or reused.
+    """
+    records = extract_data_from_body(request)
+
+    if dry_run:
+        return _preview_enrollments(records, compact)
+
+    return import_report_response(
+        iter_import_results(process_enrollment_chunk, validate_data, records),
+        report,
+        compact,
     )
 
 
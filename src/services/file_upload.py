@@ -0,0 +1,123 @@
+import shutil
+import tempfile
+from typing import BinaryIO, Iterator
+
+import anyio.from_thread
+from fastapi import HTTPException, Request, UploadFile, status
+
+from utils.file_reader import detect_file_format, iter_json_records, readers_by_format
+
+
+def read_records(file: BinaryIO):
+    """
+    Detect the format of a binary file and return a lazy reader over its records.
+
+    Args:
+        file (BinaryIO): Seekable binary file with an Excel, CSV or Parquet content.
+
+    Returns:
+        Iterator[Dict[str, Any]]: Dictionaries representing records from the file.
+
+    Raises:
+        HTTPException: If the file format is not supported.
+    """
+    file_format = detect_file_format(file)
+
+    if file_format is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="File format not supported",
+        )
+
+    return readers_by_format[file_format](file)
+
+
+def _iter_owned_records(records, file: BinaryIO):
+    with file:
+        yield from records
+
+
+def extract_data_from_file(file: UploadFile, detach: bool = False):
+    """
+    Extracts data from a file uploaded through FastAPI's UploadFile.
+
+    The format (Excel, CSV or Parquet) is detected from the file content and the
+    rows are read lazily, so the pipelines consume the file as it is parsed.
+
+    Args:
+        file (UploadFile): Excel, CSV or Parquet file containing the records.
+        detach (bool): Read the records from a temporary copy of the upload, closed
+            once they are exhausted, so they can still be read by a streamed
+            response after FastAPI closes the upload.
+
+    Returns:
+        Iterator[Dict[str, Any]]: Dictionaries representing records from the file.
+
+    Raises:
+        HTTPException: If the file format is not supported.
+    """
+    if not detach:
+        return read_records(file.file)
+
+    copy = tempfile.TemporaryFile()
+
+    try:
+        file.file.seek(0)
+        shutil.copyfileobj(file.file, copy)
+        copy.seek(0)
+        records = read_records(copy)
+    except Exception:
+        copy.close()
+        raise
+
+    return _iter_owned_records(records, copy)
+
+
+def iter_request_body(request: Request) -> Iterator[bytes]:
+    """
+    Read the body of a request from the worker thread of a sync endpoint.
+
+    Each chunk is awaited on the event loop as it is consumed, so the body is
+    received only as fast as it is processed.
+
+    Args:
+        request (Request): Request whose body has not been read yet.
+
+    Returns:
+        Iterator[bytes]: The body, in the chunks it was received in.
+    """
+    stream = request.stream()
+
+    try:
+        while True:
+            try:
+                yield anyio.from_thread.run(stream.__anext__)
+            except StopAsyncIteration:
+                return
+    finally:
+        anyio.from_thread.run(stream.aclose)
+
+
+def extract_data_from_body(request: Request):
+    """
+    Extracts records from a request body holding a JSON array or NDJSON.
+
+    The body is parsed while it is received, so the pipelines consume the
+    records as they arrive.
+
+    Args:
+        request (Request): Request with a JSON array of records, or one record per line.
+
+    Returns:
+        Iterator[Dict[str, Any]]: Dictionaries representing records from the body.
+
+    Raises:
+        HTTPException: When a record is reached that is not valid JSON or not an object.
+    """
+    try:
+        yield from iter_json_records(iter_request_body(request))
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid JSON body: {e}",
+        )
@@ -1,40 +1,74 @@
+from datetime import datetime
+from typing import Optional
+
 from fastapi.encoders import jsonable_encoder
 from fastapi.responses import JSONResponse
 from fastapi import status
 
 from crud.group import (
-    list_groups_with_courses,
+    list_groups_with_courses_async,
     post_group,
     get_group_by_id,
     delete_group,
 )
 from crud.room import get_room_by_group_id
 
+from database.async_database import create_async_connection
 from database.database import create_connection
 
 from schemas.group import CreateGroupSchema
 
-from crud.course import validate_exist_course
+from services.reference import find_course, group_cache
+
+from settings import Settings
+from utils.pagination import page_headers, split_page
 
 
-def list_groups_info():
+async def list_groups_info(
+    cursor: Optional[int] = None,
+    limit: int = Settings.LIST_PAGE_SIZE,
+    course_id: Optional[int] = None,
+    starts_after: Optional[datetime] = None,
+    ends_before: Optional[datetime] = None,
+):
     """
-    List groups with respectives courses.
+    List a page of groups with respectives courses, without blocking the event loop.
+
+    Args:
+        cursor (int): ID of the last group of the previous page.
+        limit (int): Maximum number of groups of the page.
+        course_id (int): Only groups of this course.
+        starts_after (datetime): Only groups starting at or after this moment.
+        ends_before (datetime): Only groups ending at or before this moment.
 
     Returns:
-        List[GuardianModel]: List of groups with respectives courses.
+        JSONResponse: List of groups with respectives courses, with the cursor of
+        the next page in the `X-Next-Cursor` header.
     """
+    session = create_async_connection()
+
     try:
-        session = create_connection()
-        groups = list_groups_with_courses(db_session=session)
+        groups = await list_groups_with_courses_async(
+            db_session=session,
+            cursor=cursor,
+            limit=limit + 1,
+            course_id=course_id,
+            starts_after=starts_after,
+            ends_before=ends_before,
+        )
+        groups, next_cursor = split_page(groups, limit, lambda group: group[0].id)
         list_groups = []
         for group in groups:
             list_groups.append({"Group": group[0], "Course": group[1]})
 
-        return list_groups
+        return JSONResponse(
+            status_code=status.HTTP_200_OK,
+            content=jsonable_encoder(list_groups),
+            headers=page_headers(next_cursor),
+        )
 
     finally:
-        session.close()
+        await session.close()
 
 
 def create_group(group: CreateGroupSchema):
@@ -50,19 +84,20 @@ def create_group(group: CreateGroupSchema):
     """
     try:
         session = create_connection()
-        exist_course = validate_exist_course(
-            db_session=session, course_id=group.course_id
-        )
+        exist_course = find_course(db_session=session, course_id=group.course_id)
         if not exist_course:
             return JSONResponse(
                 content={"message": f"Course with ID: {group.course_id} not found"},
                 status_code=status.HTTP_404_NOT_FOUND,
             )
+        new_group = post_group(db_session=session, group=group)
+        group_cache.invalidate(new_group.id)
+
         return JSONResponse(
             status_code=status.HTTP_201_CREATED,
             content={
                 "message": "Data created successfully",
-                "data": jsonable_encoder(post_group(db_session=session, group=group)),
+                "data": jsonable_encoder(new_group),
             },
         )
 
@@ -101,6 +136,7 @@ def remove_group(group_id: int):
             )
 
         delete_group(db_session=session, group_id=group_id)
+        group_cache.invalidate(group_id)
 
         return JSONResponse(
             content={
@@ -0,0 +1,345 @@
+import json
+import os
+import shutil
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from fastapi import UploadFile, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from crud.import_job import (
+    create_import_job,
+    finish_import_job,
+    get_import_job_by_id,
+    get_unfinished_import_jobs,
+    start_import_job,
+    update_import_job_progress,
+)
+from database.local_database import (
+    create_local_connection,
+    current_owner,
+    is_owner_alive,
+)
+from enums.import_job import ImportJobStatus, ImportKinds
+from services.file_upload import read_records
+from services.import_ledger import LedgerKey, fingerprint_file
+from services.import_report import iter_import_results, store_import_report
+from settings import Settings
+
+_executor = None
+_executor_lock = threading.Lock()
+# Future and spooled upload of each submitted job, until it runs. Cancelled
+# futures are kept so their jobs can be interrupted on shutdown.
+_queued_jobs = {}
+_queued_jobs_lock = threading.Lock()
+
+INTERRUPTED_ERROR = "The server stopped before the job finished"
+
+
+def get_import_executor() -> ThreadPoolExecutor:
+    """
+    Return the worker pool that runs the background import jobs, creating it on first use.
+
+    Returns:
+        ThreadPoolExecutor: The shared worker pool.
+    """
+    global _executor
+
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=Settings.IMPORT_JOB_WORKERS,
+                    thread_name_prefix="import-job",
+                )
+
+    return _executor
+
+
+def shutdown_import_executor():
+    """
+    Stop the background import workers without waiting for queued jobs.
+
+    The jobs that had not started are marked as interrupted and their spooled
+    uploads removed.
+    """
+    global _executor
+
+    with _executor_lock:
+        if _executor is None:
+            return
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+    with _queued_jobs_lock:
+        cancelled = {
+            job_id: path
+            for job_id, (future, path) in _queued_jobs.items()
+            if future.cancelled()
+        }
+        for job_id in cancelled:
+            del _queued_jobs[job_id]
+
+    if not cancelled:
+        return
+
+    session = create_local_connection()
+
+    try:
+        for job_id, path in cancelled.items():
+            finish_import_job(
+                session, job_id, ImportJobStatus.INTERRUPTED, error=INTERRUPTED_ERROR
+            )
+            os.remove(path)
+    finally:
+        session.close()
+
+
+def reconcile_import_jobs():
+    """
+    Mark as interrupted the queued or running jobs whose process has stopped.
+
+    Called at startup, so the jobs recorded with this process' own identity are
+    also stale: they belong to a previous process that reused its PID.
+    """
+    owner = current_owner()
+    session = create_local_connection()
+
+    try:
+        for job in get_unfinished_import_jobs(session):
+            if job.owner == owner or not is_owner_alive(job.owner):
+                finish_import_job(
+                    session,
+                    job.id,
+                    ImportJobStatus.INTERRUPTED,
+                    error=INTERRUPTED_ERROR,
+                )
+    finally:
+        session.close()
+
+
+def _track_queued_job(job_id: str, future, path: str):
+    """
+    Keep the future of a submitted job until it runs or is cancelled.
+
+    Args:
+        job_id (str): The ID of the job.
+        future (Future): Future of its worker.
+        path (str): Path of its spooled upload.
+    """
+
+    def forget(done):
+        if not done.cancelled():
+            with _queued_jobs_lock:
+                _queued_jobs.pop(job_id, None)
+
+    with _queued_jobs_lock:
+        _queued_jobs[job_id] = (future, path)
+    future.add_done_callback(forget)
+
+
+def run_import_job(
+    job_id: str,
+    path: str,
+    process_chunk,
+    validate,
+    ledger_key: LedgerKey,
+    resume: bool,
+    kind: ImportKinds,
+):
+    """
+    Process a spooled upload and store the progress and final report of its job.
+
+    The report is written to a stored report file while the rows are processed,
+    so memory use does not grow with the upload; the job only keeps its summary
+    and the URL to download it.
+
+    Args:
+        job_id (str): The ID of the job.
+        path (str): Path of the spooled upload, removed once processed.
+        process_chunk (Callable): Chunk processor of the import pipeline.
+        validate (Callable): Record validator of the import pipeline.
+        ledger_key (LedgerKey): Identity of the upload in the import ledger.
+        resume (bool): Skip the rows recorded by previous runs of the upload.
+        kind (ImportKinds): Import pipeline, whose routes serve the report.
+    """
+    session = create_local_connection()
+
+    try:
+        start_import_job(session, job_id)
+        rows_processed, rows_failed = 0, 0
+
+        def tracked(results):
+            nonlocal rows_processed, rows_failed
+            for row_outcomes in results:
+                rows_processed += 1
+                if any(not successful for successful, _ in row_outcomes):
+                    rows_failed += 1
+                if rows_processed % Settings.IMPORT_CHUNK_SIZE == 0:
+                    update_import_job_progress(
+                        session, job_id, rows_processed, rows_failed
+                    )
+                yield row_outcomes
+
+        with open(path, "rb") as file:
+            summary = store_import_report(
+                tracked(
+                    iter_import_results(
+                        process_chunk, validate, read_records(file), ledger_key, resume
+                    )
+                ),
+                kind=kind,
+            )
+
+        update_import_job_progress(session, job_id, rows_processed, rows_failed)
+        finish_import_job(
+            session,
+            job_id,
+            ImportJobStatus.COMPLETED,
+            report=json.dumps(summary),
+        )
+    except Exception as e:
+        session.rollback()
+        finish_import_job(session, job_id, ImportJobStatus.FAILED, error=repr(e.args))
+    finally:
+        session.close()
+        os.remove(path)
+
+
+def submit_import_job(
+    file: UploadFile,
+    kind: ImportKinds,
+    process_chunk,
+    validate,
+    template_id: int,
+    resume: bool = False,
+):
+    """
+    Accept an upload for background processing and return its job ID at once.
+
+    The upload is copied to a temporary file, since the request's file is closed
+    when the response is sent. Its format is checked before the job is queued.
+
+    Args:
+        file (UploadFile): Excel, CSV or Parquet file with the records.
+        kind (ImportKinds): Import pipeline, whose routes serve the job and its report.
+        process_chunk (Callable): Chunk processor of the import pipeline.
+        validate (Callable): Record validator of the import pipeline.
+        template_id (int): ID of the template the file is uploaded as, part of its ledger key.
+        resume (bool): Skip the rows recorded by previous runs of the same upload.
+
+    Returns:
+        JSONResponse: 202 response with the ID and status URL of the queued job.
+
+    Raises:
+        HTTPException: If the file format is not supported.
+    """
+    with tempfile.NamedTemporaryFile(delete=False, suffix=".upload") as spooled:
+        shutil.copyfileobj(file.file, spooled)
+
+    try:
+        with open(spooled.name, "rb") as spooled_file:
+            read_records(spooled_file)
+            ledger_key = LedgerKey(fingerprint_file(spooled_file), template_id)
+    except Exception:
+        os.remove(spooled.name)
+        raise
+
+    session = create_local_connection()
+
+    try:
+        job = create_import_job(
+            session, kind=kind.kind, file_name=file.filename, owner=current_owner()
+        )
+        try:
+            future = get_import_executor().submit(
+                run_import_job,
+                job.id,
+                spooled.name,
+                process_chunk,
+                validate,
+                ledger_key,
+                resume,
+                kind,
+            )
+        except RuntimeError as e:
+            # The workers are shutting down.
+            finish_import_job(
+                session, job.id, ImportJobStatus.INTERRUPTED, error=repr(e.args)
+            )
+            os.remove(spooled.name)
+            raise
+        _track_queued_job(job.id, future, spooled.name)
+
+        return JSONResponse(
+            status_code=status.HTTP_202_ACCEPTED,
+            content={
+                "message": "Import job accepted",
+                "data": {
+                    "job_id": job.id,
+                    "status": job.status,
+                    "status_url": f"{kind.url_prefix}/jobs/{job.id}",
+                },
+            },
+        )
+
+    finally:
+        session.close()
+
+
+def get_import_job_status(job_id: str, kind: ImportKinds):
+    """
+    Report the progress of an import job, and where to download its report once completed.
+
+    Args:
+        job_id (str): The ID of the job.
+        kind (ImportKinds): Import pipeline of the route polling the job.
+
+    Returns:
+        JSONResponse: Progress of the job, or 404 if it does not exist or belongs to
+        another pipeline.
+    """
+    session = create_local_connection()
+
+    try:
+        job = get_import_job_by_id(session, job_id)
+        if not job or job.kind != kind.kind:
+            return JSONResponse(
+                content={"message": f"Import job with ID: {job_id} not found"},
+                status_code=status.HTTP_404_NOT_FOUND,
+            )
+
+        rows_per_second = None
+        if job.started_at is not None:
+            elapsed = (
+                (job.finished_at or datetime.utcnow()) - job.started_at
+            ).total_seconds()
+            rows_per_second = (
+                round(job.rows_processed / elapsed, 2) if elapsed else None
+            )
+
+        return JSONResponse(
+            status_code=status.HTTP_200_OK,
+            content=jsonable_encoder(
+                {
+                    "id": job.id,
+                    "kind": job.kind,
+                    "file_name": job.file_name,
+                    "status": job.status,
+                    "rows_processed": job.rows_processed,
+                    "rows_failed": job.rows_failed,
+                    "rows_per_second": rows_per_second,
+                    "created_at": job.created_at,
+                    "started_at": job.started_at,
+                    "finished_at": job.finished_at,
+                    "report": json.loads(job.report) if job.report else None,
+                    "error": job.error,
+                }
+            ),
+        )
+
+    finally:
+        session.close()
@@ -0,0 +1,201 @@
+import hashlib
+import json
+import uuid
+from datetime import datetime, timedelta
+from typing import BinaryIO, NamedTuple
+
+from fastapi import HTTPException, status
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy.orm import Session
+
+from crud.import_ledger import (
+    create_ledger_entries,
+    create_ledger_run,
+    delete_ledger_entries,
+    delete_ledger_entries_before,
+    delete_ledger_run,
+    get_ledger_entries,
+    get_ledger_run,
+    get_ledger_runs,
+)
+from database.local_database import (
+    create_local_connection,
+    current_owner,
+    is_owner_alive,
+)
+from settings import Settings
+
+
+class LedgerKey(NamedTuple):
+    """
+    Identity of an upload in the import ledger.
+
+    Attributes:
+        fingerprint (str): SHA-256 of the uploaded file.
+        template_id (int): ID of the template the file was uploaded as.
+    """
+
+    fingerprint: str
+    template_id: int
+
+
+def fingerprint_file(file: BinaryIO) -> str:
+    """
+    Hash the content of a seekable binary file, leaving it rewound.
+
+    Args:
+        file (BinaryIO): The uploaded file.
+
+    Returns:
+        str: Hexadecimal SHA-256 of the content.
+    """
+    digest = hashlib.sha256()
+
+    file.seek(0)
+    for block in iter(lambda: file.read(1024 * 1024), b""):
+        digest.update(block)
+    file.seek(0)
+
+    return digest.hexdigest()
+
+
+def _acquire_ledger_run(session: Session, key: LedgerKey) -> str:
+    """
+    Register a new run of an upload, taking over a stale run if there is one.
+
+    A run is stale once its process has stopped, or after `Settings.IMPORT_LEDGER_TTL`
+    seconds for processes of other hosts.
+
+    Args:
+        session (Session): SQLAlchemy local database session.
+        key (LedgerKey): Identity of the upload.
+
+    Returns:
+        str: ID of the run.
+
+    Raises:
+        HTTPException: If the upload is already being imported.
+    """
+    run_id = uuid.uuid4().hex
+    owner = current_owner()
+
+    if create_ledger_run(session, key.fingerprint, key.template_id, run_id, owner):
+        return run_id
+
+    active = get_ledger_run(session, key.fingerprint, key.template_id)
+    expired = datetime.utcnow() - timedelta(seconds=Settings.IMPORT_LEDGER_TTL)
+    if active is not None and (
+        not is_owner_alive(active.owner) or active.started_at < expired
+    ):
+        delete_ledger_run(session, key.fingerprint, key.template_id, active.run_id)
+        if create_ledger_run(session, key.fingerprint, key.template_id, run_id, owner):
+            return run_id
+
+    raise HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail="This file is already being imported, retry once its import is done",
+    )
+
+
+def start_ledger_run(key: LedgerKey, resume: bool) -> tuple:
+    """
+    Prepare the ledger for a new run of an upload.
+
+    Only one run of an upload is active at a time, so a retry cannot process
+    the rows of a run still in progress; the run must be ended with
+    `finish_ledger_run`. Entries older than `Settings.IMPORT_LEDGER_TTL`
+    seconds are purged first. When resuming, the outcomes recorded by the
+    previous runs of the upload are returned. Otherwise they are discarded and
+    the upload is imported from scratch.
+
+    Args:
+        key (LedgerKey): Identity of the upload.
+        resume (bool): Skip the rows with a recorded outcome.
+
+    Returns:
+        Tuple[str, Dict[int, List[Tuple[bool, dict]]]]: ID of the run, and the
+        report entries of each row to skip, by row index.
+
+    Raises:
+        HTTPException: If the upload is already being imported.
+    """
+    session = create_local_connection()
+
+    try:
+        run_id = _acquire_ledger_run(session, key)
+
+        delete_ledger_entries_before(
+            session, datetime.utcnow() - timedelta(seconds=Settings.IMPORT_LEDGER_TTL)
+        )
+
+        if not resume:
+            delete_ledger_entries(session, key.fingerprint, key.template_id)
+            return run_id, {}
+
+        return run_id, {
+            entry.row_index: json.loads(entry.outcomes)
+            for entry in get_ledger_entries(session, key.fingerprint, key.template_id)
+        }
+
+    finally:
+        session.close()
+
+
+def finish_ledger_run(key: LedgerKey, run_id: str):
+    """
+    End a run started by `start_ledger_run`, so the upload can be imported again.
+
+    Args:
+        key (LedgerKey): Identity of the upload.
+        run_id (str): ID of the run.
+    """
+    session = create_local_connection()
+
+    try:
+        delete_ledger_run(session, key.fingerprint, key.template_id, run_id)
+    finally:
+        session.close()
+
+
+def release_stale_ledger_runs():
+    """
+    End the runs whose process has stopped.
+
+    Called at startup, so the runs recorded with this process' own identity are
+    also stale: they belong to a previous process that reused its PID.
+    """
+    owner = current_owner()
+    session = create_local_connection()
+
+    try:
+        for run in get_ledger_runs(session):
+            if run.owner == owner or not is_owner_alive(run.owner):
+                delete_ledger_run(session, run.fingerprint, run.template_id, run.run_id)
+    finally:
+        session.close()
+
+
+def record_completed_rows(key: LedgerKey, results: dict):
+    """
+    Record the outcomes of the processed rows of an upload.
+
+    Args:
+        key (LedgerKey): Identity of the upload.
+        results (dict): Map of the position of each row in the file to its report
+            entries, without the record or student data they echo.
+    """
+    session = create_local_connection()
+
+    try:
+        create_ledger_entries(
+            session,
+            key.fingerprint,
+            key.template_id,
+            {
+                row_index: json.dumps(jsonable_encoder(row_outcomes))
+                for row_index, row_outcomes in results.items()
+            },
+        )
+
+    finally:
+        session.close()
@@ -0,0 +1,422 @@
+import json
+import logging
+import os
+import time
+import uuid
+from collections import deque
+
+from fastapi import HTTPException, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import FileResponse, JSONResponse, StreamingResponse
+
+from database.database import create_connection
+from enums.import_job import ImportKinds
+from enums.import_report import ImportReportModes
+from services.import_ledger import (
+    LedgerKey,
+    finish_ledger_run,
+    record_completed_rows,
+    start_ledger_run,
+)
+from services.import_validation import iter_validated_chunks
+from settings import Settings
+from utils.batching import chunked
+from utils.metrics import IMPORT_ROWS, IMPORT_STAGE_SECONDS
+
+logger = logging.getLogger(__name__)
+
+student_id_resonse_key = "Student ID"
+room_id_resonse_key = "Room ID"
+message_error = "Error message"
+status_response_key = "Status"
+row_response_key = "Row"
+record_response_key = "Record"
+student_data_response_key = "Student Data"
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+def validation_failures(record: dict, errors: list) -> list:
+    """
+    Build the report entries for a record that did not pass validation.
+
+    Args:
+        record (dict): Record as read from the uploaded file.
+        errors (list): Errors reported by the validation of the record.
+
+    Returns:
+        List[Tuple[bool, dict]]: One failed entry per validation error.
+    """
+    return [
+        (
+            False,
+            {
+                record_response_key: record,
+                "Column Error": detail.get("loc"),
+                message_error: detail.get("msg"),
+                "Value entered": detail.get("input"),
+                status_response_key: "Failed",
+            },
+        )
+        for detail in errors
+    ]
+
+
+class UnexpectedFailure(list):
+    """
+    Report entries of a record that failed on an unexpected error, such as a
+    lost connection or a deadlock, instead of being rejected for its data.
+
+    They are reported as any other failure but left out of the import ledger,
+    so a resumed upload processes the record again.
+    """
+
+
+def iter_import_results(
+    process_chunk, validate, records, ledger_key: LedgerKey = None, resume: bool = False
+):
+    """
+    Run a bulk import pipeline over the records, one chunk at a time.
+
+    The chunks are validated by `iter_validated_chunks`, so the chunk processor
+    only writes rows that already passed validation. A single session is shared
+    by all the chunks and closed once the records are exhausted or the
+    iteration is abandoned.
+
+    With a ledger key, the outcomes of each chunk are recorded once it is
+    processed, except for an `UnexpectedFailure`. When resuming, the outcomes
+    recorded by previous runs are reported again, without the record or student
+    data they echoed, and are not counted again in the metrics; only the rows
+    without one are processed. Only one run of an upload is active at a time;
+    another run of the same upload raises a 409 HTTPException once iterated.
+
+    Args:
+        process_chunk (Callable): Chunk processor taking a session and a list of `ValidatedRecord`.
+        validate (Callable): Module-level function returning the validated schemas of a record.
+        records (Iterable[dict]): Records as read from the uploaded file.
+        ledger_key (LedgerKey): Identity of the upload in the import ledger, if it is recorded.
+        resume (bool): Skip the rows recorded by previous runs of the upload.
+
+    Returns:
+        Iterator[List[Tuple[bool, dict]]]: The report entries of each record, in order.
+    """
+    completed_rows = {}
+    run_id = None
+
+    if ledger_key is not None:
+        run_id, completed_rows = start_ledger_run(ledger_key, resume)
+
+    # Validation reads ahead, so the positions of the records handed to it are
+    # queued until their chunk is processed.
+    pending_indexes = deque()
+
+    def pending_records():
+        for index, record in enumerate(records):
+            if index not in completed_rows:
+                pending_indexes.append(index)
+                yield record
+
+    row_index = 0
+
+    try:
+        session = create_connection()
+
+        try:
+            for chunk in iter_validated_chunks(validate, pending_records()):
+                with IMPORT_STAGE_SECONDS.labels("write").time():
+                    results = process_chunk(session, chunk)
+                failed = sum(
+                    1 for entries in results if any(not ok for ok, _ in entries)
+                )
+                IMPORT_ROWS.labels("failed").inc(failed)
+                IMPORT_ROWS.labels("succeeded").inc(len(results) - failed)
+                indexes = [pending_indexes.popleft() for _ in results]
+                if ledger_key is not None:
+                    record_completed_rows(
+                        ledger_key,
+                        {
+                            index: [(ok, strip_entry(entry)) for ok, entry in entries]
+                            for index, entries in zip(indexes, results)
+                            if not isinstance(entries, UnexpectedFailure)
+                        },
+                    )
+                for index, entries in zip(indexes, results):
+                    while row_index < index:
+                        yield completed_rows[row_index]
+                        row_index += 1
+                    yield entries
+                    row_index += 1
+        finally:
+            session.close()
+
+        while row_index in completed_rows:
+            yield completed_rows[row_index]
+            row_index += 1
+    finally:
+        if run_id is not None:
+            finish_ledger_run(ledger_key, run_id)
+
+
+def strip_entry(entry: dict) -> dict:
+    """
+    Drop the record or student data echoed by a report entry.
+
+    Args:
+        entry (dict): Report entry of a record.
+
+    Returns:
+        dict: The status, IDs and error details of the entry.
+    """
+    return {
+        key: value
+        for key, value in entry.items()
+        if key not in (record_response_key, student_data_response_key)
+    }
+
+
+def compact_entry(row: int, entry: dict) -> dict:
+    """
+    Reference the row of a report entry by its number instead of echoing its data.
+
+    Args:
+        row (int): Number of the record in the upload, starting at 1.
+        entry (dict): Report entry of the record.
+
+    Returns:
+        dict: The entry with the row number and without the record or student data.
+    """
+    return {row_response_key: row, **strip_entry(entry)}
+
+
+def build_import_report(results, compact: bool = False) -> dict:
+    """
+    Split the results of a bulk import into the 207 report sections.
+
+    Args:
+        results (Iterable[List[Tuple[bool, dict]]]): Report entries of each record, flagged as successful or not.
+        compact (bool): Reference the rows by number, see `compact_entry`.
+
+    Returns:
+        dict: Successful and failed entries, in processing order.
+    """
+    successful_students = []
+    failed_students = []
+
+    for row, row_outcomes in enumerate(results, 1):
+        for successful, entry in row_outcomes:
+            if compact:
+                entry = compact_entry(row, entry)
+            if successful:
+                successful_students.append(entry)
+            else:
+                failed_students.append(entry)
+
+    return {
+        "Successful users": successful_students,
+        "Failed users": failed_students,
+    }
+
+
+def _report_line(row: int, successful: bool, entry: dict, compact: bool) -> str:
+    entry = compact_entry(row, entry) if compact else {row_response_key: row, **entry}
+    line = {status_response_key: "Successful" if successful else "Failed", **entry}
+
+    return json.dumps(line, default=jsonable_encoder)
+
+
+def _encode_report_lines(results, compact: bool):
+    row = 0
+
+    for batch in chunked(results, Settings.IMPORT_CHUNK_SIZE):
+        lines = []
+        for row_outcomes in batch:
+            row += 1
+            lines += [
+                _report_line(row, successful, entry, compact)
+                for successful, entry in row_outcomes
+            ]
+        yield ("\n".join(lines) + "\n").encode("utf-8")
+
+
+def iter_report_lines(results, compact: bool = False):
+    """
+    Encode the results of a bulk import as NDJSON while they are produced.
+
+    Every entry is a line with the row number and a `Status`, written once the
+    chunk of its row is processed. Since the response has already started, an
+    import failing midway ends with a line holding the error and an `Aborted`
+    status instead of an error response.
+
+    Args:
+        results (Iterable[List[Tuple[bool, dict]]]): Report entries of each record, flagged as successful or not.
+        compact (bool): Reference the rows by number only, see `compact_entry`.
+
+    Returns:
+        Iterator[bytes]: The report, one chunk of rows at a time.
+    """
+    try:
+        yield from _encode_report_lines(results, compact)
+        return
+    except HTTPException as e:
+        detail = e.detail
+    except Exception as e:
+        logger.exception("Import aborted while its report was streamed")
+        detail = e.args
+
+    line = {status_response_key: "Aborted", message_error: detail}
+    yield (json.dumps(line, default=jsonable_encoder) + "\n").encode("utf-8")
+
+
+def _report_path(report_id: str) -> str:
+    return os.path.join(Settings.IMPORT_REPORT_DIR, f"{report_id}.ndjson")
+
+
+def _purge_stored_reports():
+    expired = time.time() - Settings.IMPORT_REPORT_TTL
+
+    for entry in os.scandir(Settings.IMPORT_REPORT_DIR):
+        # Partial reports belong to imports still running.
+        if entry.name.endswith(".partial"):
+            continue
+        try:
+            if entry.is_file() and entry.stat().st_mtime < expired:
+                os.remove(entry.path)
+        except FileNotFoundError:
+            # Purged by a concurrent upload.
+            pass
+
+
+def store_import_report(
+    results, compact: bool = False, kind: ImportKinds = ImportKinds.ENROLLMENT
+) -> dict:
+    """
+    Write the results of a bulk import to a report file while they are produced.
+
+    The file holds the lines of `iter_report_lines` and is only made available
+    once complete; if the import fails, the error is raised and nothing is
+    stored. Reports older than `Settings.IMPORT_REPORT_TTL` seconds are purged
+    first, leaving the partial reports of running imports.
+
+    Args:
+        results (Iterable[List[Tuple[bool, dict]]]): Report entries of each record, flagged as successful or not.
+        compact (bool): Reference the rows by number only, see `compact_entry`.
+        kind (ImportKinds): Import pipeline, whose routes serve the report.
+
+    Returns:
+        dict: ID and download URL of the report, and the rows that succeeded and failed.
+    """
+    os.makedirs(Settings.IMPORT_REPORT_DIR, exist_ok=True)
+    _purge_stored_reports()
+
+    report_id = uuid.uuid4().hex
+    path = _report_path(report_id)
+    rows, failed = 0, 0
+
+    def counted(results):
+        nonlocal rows, failed
+        for row_outcomes in results:
+            rows += 1
+            failed += any(not successful for successful, _ in row_outcomes)
+            yield row_outcomes
+
+    partial_path = f"{path}.partial"
+
+    try:
+        with open(partial_path, "wb") as file:
+            for chunk in _encode_report_lines(counted(results), compact):
+                file.write(chunk)
+        os.replace(partial_path, path)
+    finally:
+        if os.path.exists(partial_path):
+            os.remove(partial_path)
+
+    return {
+        "Report ID": report_id,
+        "Report URL": f"{kind.url_prefix}/reports/{report_id}",
+        "Rows": rows,
+        "Successful rows": rows - failed,
+        "Failed rows": failed,
+    }
+
+
+class ImportReportResponse(StreamingResponse):
+    """
+    Streamed 207 report, sent without listening for the client to disconnect.
+
+    `StreamingResponse` reads the request messages to notice a disconnect, which
+    would take the body of `POST /enrollment/batch` from the parser while its
+    records are still being read. The import runs to the end either way, as it
+    does when the report is returned at once.
+    """
+
+    async def __call__(self, scope, receive, send):
+        await self.stream_response(send)
+
+        if self.background is not None:
+            await self.background()
+
+
+def import_report_response(
+    results,
+    report: ImportReportModes = ImportReportModes.JSON,
+    compact: bool = False,
+    kind: ImportKinds = ImportKinds.ENROLLMENT,
+):
+    """
+    Deliver the 207 report of a bulk import in the requested mode.
+
+    Args:
+        results (Iterable[List[Tuple[bool, dict]]]): Report entries of each record, flagged as successful or not.
+        report (ImportReportModes): A JSON report built once the import is done,
+            NDJSON streamed while it runs, or a stored NDJSON report to download later.
+        compact (bool): Reference the rows by number only, see `compact_entry`.
+        kind (ImportKinds): Import pipeline, whose routes serve a stored report.
+
+    Returns:
+        Response: The report, or the ID and URL of the stored report.
+    """
+    if report == ImportReportModes.NDJSON:
+        return ImportReportResponse(
+            iter_report_lines(results, compact),
+            status_code=status.HTTP_207_MULTI_STATUS,
+            media_type=NDJSON_MEDIA_TYPE,
+        )
+
+    if report == ImportReportModes.STORED:
+        content = store_import_report(results, compact, kind)
+    else:
+        content = build_import_report(results, compact)
+
+    return JSONResponse(status_code=status.HTTP_207_MULTI_STATUS, content=content)
+
+
+def get_stored_report(report_id: str) -> FileResponse:
+    """
+    Serve a report stored by `store_import_report`.
+
+    Args:
+        report_id (str): ID of the report.
+
+    Returns:
+        FileResponse: The NDJSON report.
+
+    Raises:
+        HTTPException: If the report does not exist or has expired.
+    """
+    try:
+        known_id = uuid.UUID(hex=report_id).hex == report_id
+    except ValueError:
+        known_id = False
+    path = _report_path(report_id)
+
+    if not known_id or not os.path.isfile(path):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Import report with ID: {report_id} not found",
+        )
+
+    return FileResponse(
+        path,
+        media_type=NDJSON_MEDIA_TYPE,
+        filename=f"import-report-{report_id}.ndjson",
+    )
@@ -0,0 +1,152 @@
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain, islice
+from multiprocessing import get_context
+from typing import NamedTuple, Optional
+
+from pydantic import ValidationError
+
+from settings import Settings
+from utils.batching import chunked
+from utils.metrics import IMPORT_STAGE_SECONDS, timed_iter
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+class ValidatedRecord(NamedTuple):
+    """
+    A record of a bulk upload along with the outcome of its validation.
+
+    Attributes:
+        record (dict): Record as read from the uploaded file.
+        payload (Optional[tuple]): Validated data of each schema, as dicts keyed by field name.
+        errors (Optional[list]): Validation errors, if the record is not valid.
+    """
+
+    record: dict
+    payload: Optional[tuple]
+    errors: Optional[list]
+
+
+def get_validation_executor() -> ProcessPoolExecutor:
+    """
+    Return the process pool that validates the bulk uploads, creating it on first use.
+
+    The workers are spawned rather than forked, so they do not inherit the
+    database connections or the locks held by other threads of the server.
+
+    Returns:
+        ProcessPoolExecutor: The shared process pool.
+    """
+    global _executor
+
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ProcessPoolExecutor(
+                    max_workers=Settings.VALIDATION_WORKERS,
+                    mp_context=get_context("spawn"),
+                )
+
+    return _executor
+
+
+def shutdown_validation_executor():
+    """
+    Stop the validation workers without waiting for pending chunks.
+    """
+    global _executor
+
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
+
+
+def validate_records(validate, records: list) -> list:
+    """
+    Validate a chunk of records, keeping the payload or the errors of each one.
+
+    The payloads are returned as plain dicts, since sending the models back from
+    a worker process costs about as much as validating them again.
+
+    Args:
+        validate (Callable): Module-level function returning the validated schemas of a record.
+        records (list): Records as read from the uploaded file.
+
+    Returns:
+        List[Tuple[Optional[tuple], Optional[list]]]: Payload and errors of each record, in order.
+    """
+    outcomes = []
+
+    for record in records:
+        try:
+            payload = tuple(model.model_dump() for model in validate(record))
+            outcomes.append((payload, None))
+        except ValidationError as e:
+            outcomes.append((None, e.errors(include_url=False, include_context=False)))
+
+    return outcomes
+
+
+def _validated_chunk(chunk: list, outcomes: list) -> list:
+    return [
+        ValidatedRecord(record, payload, errors)
+        for record, (payload, errors) in zip(chunk, outcomes)
+    ]
+
+
+def _validated_result(chunk: list, future) -> list:
+    with IMPORT_STAGE_SECONDS.labels("validate").time():
+        outcomes = future.result()
+
+    return _validated_chunk(chunk, outcomes)
+
+
+def iter_validated_chunks(validate, records):
+    """
+    Split the records in chunks of `Settings.IMPORT_CHUNK_SIZE` and validate them.
+
+    Chunks are validated in parallel by the process pool, at most two per worker
+    ahead of the consumer, and yielded in input order. Uploads that fit in a
+    single chunk, or `Settings.VALIDATION_WORKERS` below 2, are validated in the
+    calling thread. The time spent reading each chunk and validating it, or
+    waiting for a worker to validate it, is recorded in the metrics.
+
+    Args:
+        validate (Callable): Module-level function returning the validated schemas of a record.
+        records (Iterable[dict]): Records as read from the uploaded file.
+
+    Returns:
+        Iterator[List[ValidatedRecord]]: The validated chunks, in order.
+    """
+    chunks = timed_iter(
+        chunked(records, Settings.IMPORT_CHUNK_SIZE),
+        IMPORT_STAGE_SECONDS.labels("read"),
+    )
+    head = list(islice(chunks, 2))
+    chunks = chain(head, chunks)
+
+    if len(head) < 2 or Settings.VALIDATION_WORKERS < 2:
+        for chunk in chunks:
+            with IMPORT_STAGE_SECONDS.labels("validate").time():
+                outcomes = validate_records(validate, chunk)
+            yield _validated_chunk(chunk, outcomes)
+        return
+
+    executor = get_validation_executor()
+    pending = deque()
+
+    try:
+        for chunk in chunks:
+            pending.append((chunk, executor.submit(validate_records, validate, chunk)))
+            if len(pending) > 2 * Settings.VALIDATION_WORKERS:
+                yield _validated_result(*pending.popleft())
+
+        while pending:
+            yield _validated_result(*pending.popleft())
+    finally:
+        for _, future in pending:
+            future.cancel()
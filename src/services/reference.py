@@ -0,0 +1,181 @@
+import threading
+from typing import Optional
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy.orm import Session
+
+from crud.course import get_courses_by_ids
+from crud.group import get_groups_by_ids
+from crud.room import get_rooms_by_ids
+from crud.teacher import get_teachers_by_ids
+from settings import Settings
+from utils.cache import (
+    CacheBackend,
+    MemoryCacheBackend,
+    ReadThroughCache,
+    RedisCacheBackend,
+)
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_reference_cache_backend() -> CacheBackend:
+    """
+    Return the backend of the reference data cache, creating it on first use.
+
+    A Redis server is used when `Settings.REFERENCE_CACHE_URL` is set, so that the
+    invalidations of one process reach the others; otherwise each process keeps
+    its own entries in memory.
+
+    Returns:
+        CacheBackend: The shared backend.
+    """
+    global _backend
+
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                if Settings.REFERENCE_CACHE_URL:
+                    _backend = RedisCacheBackend(Settings.REFERENCE_CACHE_URL)
+                else:
+                    _backend = MemoryCacheBackend(Settings.REFERENCE_CACHE_SIZE)
+
+    return _backend
+
+
+def set_reference_cache_backend(backend: Optional[CacheBackend]):
+    """
+    Replace the backend of the reference data cache.
+
+    Args:
+        backend (Optional[CacheBackend]): The new backend, or None to build the
+            configured one again on next use.
+    """
+    global _backend
+
+    with _backend_lock:
+        _backend = backend
+
+
+def _snapshot(model) -> dict:
+    """
+    Copy the columns of a model, so it can be cached outside of its session.
+
+    The values are JSON-compatible, e.g. dates become ISO strings, so every
+    backend returns the same data.
+
+    Args:
+        model (Base): Instance of a SQLAlchemy model.
+
+    Returns:
+        dict: Map of column name to value.
+    """
+    return jsonable_encoder(
+        {column.key: getattr(model, column.key) for column in model.__table__.columns}
+    )
+
+
+def _loader(get_by_ids):
+    def load_many(db_session: Session, entity_ids: set) -> dict:
+        return {
+            model.id: _snapshot(model) for model in get_by_ids(db_session, entity_ids)
+        }
+
+    return load_many
+
+
+room_cache = ReadThroughCache(
+    "reference:room",
+    _loader(get_rooms_by_ids),
+    get_reference_cache_backend,
+    Settings.REFERENCE_CACHE_TTL,
+)
+group_cache = ReadThroughCache(
+    "reference:group",
+    _loader(get_groups_by_ids),
+    get_reference_cache_backend,
+    Settings.REFERENCE_CACHE_TTL,
+)
+course_cache = ReadThroughCache(
+    "reference:course",
+    _loader(get_courses_by_ids),
+    get_reference_cache_backend,
+    Settings.REFERENCE_CACHE_TTL,
+)
+teacher_cache = ReadThroughCache(
+    "reference:teacher",
+    _loader(get_teachers_by_ids),
+    get_reference_cache_backend,
+    Settings.REFERENCE_CACHE_TTL,
+)
+
+
+def find_rooms(db_session: Session, room_ids: set[int]) -> dict:
+    """
+    Look up several rooms, querying the database only for the ones not cached.
+
+    Args:
+        db_session (Session): SQLAlchemy database session.
+        room_ids (set[int]): IDs of the rooms being searched.
+
+    Returns:
+        dict: Map of room ID to its columns, or None if the room does not exist.
+    """
+    return room_cache.get_many(db_session, room_ids)
+
+
+def find_room(db_session: Session, room_id: int) -> Optional[dict]:
+    """
+    Look up a room, querying the database only if it is not cached.
+
+    Args:
+        db_session (Session): SQLAlchemy database session.
+        room_id (int): The ID of the room being searched.
+
+    Returns:
+        Optional[dict]: The columns of the room, or None if it does not exist.
+    """
+    return room_cache.get(db_session, room_id)
+
+
+def find_group(db_session: Session, group_id: int) -> Optional[dict]:
+    """
+    Look up a group, querying the database only if it is not cached.
+
+    Args:
+        db_session (Session): SQLAlchemy database session.
+        group_id (int): The ID of the group being searched.
+
+    Returns:
+        Optional[dict]: The columns of the group, or None if it does not exist.
+    """
+    return group_cache.get(db_session, group_id)
+
+
+def find_course(db_session: Session, course_id: int) -> Optional[dict]:
+    """
+    Look up a course, querying the database only if it is not cached.
+
+    Args:
+        db_session (Session): SQLAlchemy database session.
+        course_id (int): The ID of the course being searched.
+
+    Returns:
+        Optional[dict]: The columns of the course, or None if it does not exist.
+    """
+    return course_cache.get(db_session, course_id)
+
+
+def find_teacher(db_session: Session, teacher_id: int) -> Optional[dict]:
+    """
+    Look up a teacher, querying the database only if it is not cached.
+
+    Args:
+        db_session (Session): SQLAlchemy database session.
+        teacher_id (int): The ID of the teacher being searched.
+
+    Returns:
+        Optional[dict]: The columns of the teacher, or None if it does not exist.
+    """
+    return teacher_cache.get(db_session, teacher_id)
@@ -1,34 +1,78 @@
+from datetime import datetime
+from typing import Optional
+
 from fastapi import status
 from fastapi.encoders import jsonable_encoder
 from fastapi.responses import JSONResponse
+from database.async_database import create_async_connection
 from database.database import create_connection
 
 from schemas.room import CreateRoomSchema
 
-from crud.teacher import get_teacher_by_id
-from crud.group import get_group_by_id
-from crud.room import list_rooms_with_groups, post_room, verify_room_exists, delete_room
+from crud.room import (
+    list_rooms_with_groups_async,
+    post_room,
+    verify_room_exists,
+    delete_room,
+)
 from crud.enrollment import get_enrollment_by_room_id
+from services.reference import find_group, find_teacher, room_cache
+
+from settings import Settings
+from utils.pagination import page_headers, split_page
 
 
-def list_rooms_info():
+async def list_rooms_info(
+    cursor: Optional[int] = None,
+    limit: int = Settings.LIST_PAGE_SIZE,
+    group_id: Optional[int] = None,
+    course_id: Optional[int] = None,
+    teacher_id: Optional[int] = None,
+    starts_after: Optional[datetime] = None,
+    ends_before: Optional[datetime] = None,
+):
     """
-    List rooms with respectives groups.
+    List a page of rooms with respectives groups, without blocking the event loop.
+
+    Args:
+        cursor (int): ID of the last room of the previous page.
+        limit (int): Maximum number of rooms of the page.
+        group_id (int): Only rooms of this group.
+        course_id (int): Only rooms whose group belongs to this course.
+        teacher_id (int): Only rooms of this teacher.
+        starts_after (datetime): Only rooms whose group starts at or after this moment.
+        ends_before (datetime): Only rooms whose group ends at or before this moment.
 
     Returns:
-        List[GuardianModel]: List of room with respectives groups.
+        JSONResponse: List of rooms with respectives groups, with the cursor of
+        the next page in the `X-Next-Cursor` header.
     """
+    session = create_async_connection()
+
     try:
-        session = create_connection()
-        groups = list_rooms_with_groups(db_session=session)
+        groups = await list_rooms_with_groups_async(
+            db_session=session,
+            cursor=cursor,
+            limit=limit + 1,
+            group_id=group_id,
+            course_id=course_id,
+            teacher_id=teacher_id,
+            starts_after=starts_after,
+            ends_before=ends_before,
+        )
+        groups, next_cursor = split_page(groups, limit, lambda group: group[0].id)
         list_groups = []
         for group in groups:
             list_groups.append({"Room": group[0], "Group": group[1]})
 
-        return list_groups
+        return JSONResponse(
+            status_code=status.HTTP_200_OK,
+            content=jsonable_encoder(list_groups),
+            headers=page_headers(next_cursor),
+        )
 
     finally:
-        session.close()
+        await session.close()
 
 
 def create_room(room: CreateRoomSchema):
@@ -44,26 +88,27 @@ def create_room(room: CreateRoomSchema):
     """
     try:
         session = create_connection()
-        exists_group = get_group_by_id(db_session=session, group_id=room.group_id)
+        exists_group = find_group(db_session=session, group_id=room.group_id)
         if not exists_group:
             return JSONResponse(
                 content={"message": f"Group with ID: {room.group_id} not found"},
                 status_code=status.HTTP_404_NOT_FOUND,
             )
 
-        exists_teacher = get_teacher_by_id(
-            db_session=session, teacher_id=room.teacher_id
-        )
+        exists_teacher = find_teacher(db_session=session, teacher_id=room.teacher_id)
         if not exists_teacher:
             return JSONResponse(
                 content={"message": f"Teacher with ID: {room.teacher_id} not found"},
                 status_code=status.HTTP_404_NOT_FOUND,
             )
+        new_room = post_room(db_session=session, room=room)
+        room_cache.invalidate(new_room.id)
+
         return JSONResponse(
             status_code=status.HTTP_201_CREATED,
             content={
                 "message": "Data created successfully",
-                "data": jsonable_encoder(post_room(db_session=session, room=room)),
+                "data": jsonable_encoder(new_room),
             },
         )
 
@@ -106,6 +151,7 @@ def remove_room(room_id: int):
             )
 
         delete_room(db_session=session, room_id=room_id)
+        room_cache.invalidate(room_id)
 
         return JSONResponse(
             status_code=status.HTTP_200_OK,
@@ -1,135 +1,167 @@
+from functools import partial
+from typing import Optional
+
 from fastapi import HTTPException, UploadFile, status
 from fastapi.encoders import jsonable_encoder
-from fastapi.responses import JSONResponse
-from pydantic import ValidationError
+from fastapi.responses import JSONResponse, StreamingResponse
 from sqlalchemy.orm import Session
-import pandas as pd
 
 
+from crud.enrollment import enrollment_export_columns, iter_enrollment_export_rows
+from crud.guardian import get_guardians_by_ids, update_massive_guardians
 from crud.student import (
-    create_massive_student,
-    update_massive_student,
-    get_student_by_email,
-    get_student_by_id,
-    get_students_by_group_id,
-    get_students_by_room_id,
+    update_massive_students,
+    get_students_by_ids,
+    get_students_by_group_id_async,
+    get_students_by_room_id_async,
 )
+from database.async_database import create_async_connection
 from database.database import create_connection
+from enums.file_format import ExportFormats
+from enums.import_job import ImportKinds
+from enums.import_report import ImportReportModes
+from enums.student import StudentFields
+from enums.template import TypeTemplates
 from schemas.guardian import UpdateGuardianSchema
-from schemas.student import CreateMassiveStudentSchema, UpdateMassiveStudentSchema
-from services.guardian import update_guardian
+from schemas.student import UpdateMassiveStudentSchema
+from services.import_report import (
+    UnexpectedFailure,
+    import_report_response,
+    iter_import_results,
+    message_error,
+    status_response_key,
+    student_data_response_key,
+    student_id_resonse_key,
+    validation_failures,
+)
+from services.file_upload import extract_data_from_file
+from services.import_job import submit_import_job
+from services.import_ledger import LedgerKey, fingerprint_file
+from settings import Settings
+from utils.file_writer import iter_csv_chunks, iter_ndjson_chunks, iter_parquet_chunks
+from utils.pagination import page_headers, split_page
 
-student_id_resonse_key = "Student ID"
-room_id_resonse_key = "Room ID"
-message_error = "Error message"
-status_response_key = "Status"
+export_media_types = {
+    ExportFormats.CSV: "text/csv",
+    ExportFormats.NDJSON: "application/x-ndjson",
+    ExportFormats.PARQUET: "application/vnd.apache.parquet",
+}
 
 
-def extract_data_from_file(file: UploadFile):
+def parse_student_fields(fields: Optional[str]) -> Optional[list]:
     """
-    Extracts data from an Excel file uploaded through FastAPI's UploadFile.
+    Parse the comma separated `fields` projection of the roster endpoints.
 
     Args:
-        file (UploadFile): Excel file containing enrollment data.
+        fields (str): Comma separated student columns, e.g. "first_name,email".
 
     Returns:
-        List[Dict[str, Any]]: List of dictionaries representing records from the Excel file.
+        List[str]: The requested columns, or None to select all of them.
 
+    Raises:
+        HTTPException: If a column is not a student field.
     """
-    df_file_enrollment = pd.read_excel(file.file)
+    if not fields:
+        return None
 
-    file_enrollment = (
-        df_file_enrollment.astype(object)
-        .where(pd.notnull(df_file_enrollment), None)
-        .to_dict(orient="records")
-    )
+    requested = [field.strip() for field in fields.split(",") if field.strip()]
+    available = {field.value for field in StudentFields}
+    unknown = [field for field in requested if field not in available]
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown student fields: {', '.join(unknown)}",
+        )
 
-    return file_enrollment
+    return requested or None
 
 
-def create_student(
-    session: Session,
-    validated_student_data: CreateMassiveStudentSchema,
-    guardian_id: int,
+async def _list_roster(
+    get_students, fields: Optional[str], cursor: Optional[int], limit: int
 ):
     """
-    Creates or retrieves a student based on the provided data.
+    Retrieve a page of a student roster and build its response.
 
     Args:
-        session (Session): SQLAlchemy session.
-        validated_student_data (CreateMassiveStudentSchema): Validated student data.
-        guardian_id (int): Guardian ID.
+        get_students (Callable): Async roster query of `crud.student`, bound to its group or room.
+        fields (str): Comma separated student columns to be returned.
+        cursor (int): ID of the last student of the previous page.
+        limit (int): Maximum number of students of the page.
 
     Returns:
-        int: Student ID.
+        JSONResponse: The students of the page, with the cursor of the next page
+        in the `X-Next-Cursor` header.
     """
-    get_student = get_student_by_email(session, validated_student_data.email)
-    if not get_student:
-        validated_student_data.guardian_id = guardian_id
-        create_student = create_massive_student(
-            db_session=session, student=validated_student_data
-        )
-        return create_student.id
-    return get_student.id
-
-
-def update_student(
-    session: Session, validated_student_data: UpdateMassiveStudentSchema
-):
-    """
-    Creates or retrieves a student based on the provided data.
+    selected_fields = parse_student_fields(fields)
+    session = create_async_connection()
 
-    Args:
-        session (Session): SQLAlchemy session.
-        validated_student_data (UpdateMassiveStudentSchema): Validated student data.
-        guardian_id (int): Guardian ID.
+    try:
+        students = await get_students(
+            db_session=session, fields=selected_fields, cursor=cursor, limit=limit + 1
+        )
+        students, next_cursor = split_page(students, limit, lambda student: student.id)
 
-    Returns:
-        StudentModel: Student Model.
-    """
-    get_student = get_student_by_id(session, validated_student_data.id)
-    if get_student:
-        update_student = update_massive_student(
-            db_session=session,
-            updated_data=validated_student_data,
-            current_student=get_student,
+        return JSONResponse(
+            status_code=status.HTTP_200_OK,
+            content=[dict(student) for student in students],
+            headers=page_headers(next_cursor),
         )
-        return update_student
-    return get_student
+    finally:
+        await session.close()
 
 
-def obtain_students_by_group(group_id: int):
+async def obtain_students_by_group(
+    group_id: int,
+    fields: Optional[str] = None,
+    cursor: Optional[int] = None,
+    limit: int = Settings.LIST_PAGE_SIZE,
+):
     """
-    Retrieves a list of students based on the provided group ID.
+    Retrieves a page of the students enrolled in the provided group ID.
+
+    Each student is listed once, even if enrolled in several rooms of the group.
 
     Args:
         group_id (int): Group ID.
+        fields (str): Comma separated student columns to be returned; the ID is always included.
+        cursor (int): ID of the last student of the previous page.
+        limit (int): Maximum number of students of the page.
 
     Returns:
-        list: List of students.
+        JSONResponse: List of students.
     """
-    try:
-        session = create_connection()
-        return get_students_by_group_id(db_session=session, group_id=group_id)
-    finally:
-        session.close()
+    return await _list_roster(
+        partial(get_students_by_group_id_async, group_id=group_id),
+        fields=fields,
+        cursor=cursor,
+        limit=limit,
+    )
 
 
-def obtain_students_by_room(room_id: int):
+async def obtain_students_by_room(
+    room_id: int,
+    fields: Optional[str] = None,
+    cursor: Optional[int] = None,
+    limit: int = Settings.LIST_PAGE_SIZE,
+):
     """
-    Retrieves a list of students based on the provided Room ID.
+    Retrieves a page of the students enrolled in the provided Room ID.
 
     Args:
         room_id (int): Room ID.
+        fields (str): Comma separated student columns to be returned; the ID is always included.
+        cursor (int): ID of the last student of the previous page.
+        limit (int): Maximum number of students of the page.
 
     Returns:
-        list: List of students.
+        JSONResponse: List of students.
     """
-    try:
-        session = create_connection()
-        return get_students_by_room_id(db_session=session, room_id=room_id)
-    finally:
-        session.close()
+    return await _list_roster(
+        partial(get_students_by_room_id_async, room_id=room_id),
+        fields=fields,
+        cursor=cursor,
+        limit=limit,
+    )
 
 
 def validate_data_update(data_student):
@@ -152,93 +184,289 @@ def validate_data_update(data_student):
     )
 
 
-def update_data_students(file: UploadFile):
+def _update_rows(session: Session, rows: list):
     """
-    Update student and guardian data from an Excel file.
+    Apply the guardian and student changes of the given rows in bulk.
+
+    When several rows reference the same ID, the last one wins.
 
     Args:
-        file (UploadFile): The Excel file containing data to update.
+        session (Session): SQLAlchemy session.
+        rows (list): Tuples of row index and validated guardian and student payloads.
+    """
+    guardians = {guardian["id"]: guardian for _, guardian, _ in rows}
+    students = {student["id"]: student for _, _, student in rows}
+    update_massive_guardians(session, list(guardians.values()))
+    update_massive_students(session, list(students.values()))
+
+
+def _student_report_data(validated_student_data: dict) -> dict:
+    """
+    Encode a validated student payload with the column names of the upload file.
+
+    Args:
+        validated_student_data (dict): Validated student payload, keyed by field name.
 
     Returns:
-        JSONResponse: A JSON response containing information about successful and failed updates.
+        dict: The student data as reported for a failed row.
     """
-    if not file.filename.endswith(".xlsx"):
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="File extension not supported",
-        )
+    return jsonable_encoder(
+        UpdateMassiveStudentSchema.model_construct(**validated_student_data)
+    )
 
-    failed_students = []
-    successful_students = []
-
-    file_data_to_update = extract_data_from_file(file)
-
-    for data in file_data_to_update:
-        try:
-            (
-                validated_guardian_data,
-                validated_student_data,
-            ) = validate_data_update(data)
-        except ValidationError as e:
-            for error in e.errors():
-                failed_students.append(
-                    {
-                        "Record": data,
-                        "Column Error": error.get("loc"),
-                        "Error message": error.get("msg"),
-                        "Value entered": error.get("input"),
-                        "Status": "Failed",
-                    }
-                )
-            continue
 
-        try:
-            session = create_connection()
+def process_update_chunk(session: Session, records: list) -> list:
+    """
+    Apply a chunk of validated student/guardian updates with a fixed number of queries.
 
-            with session.begin():
-                guardian_updated = update_guardian(session, validated_guardian_data)
+    The referenced guardian and student IDs are checked with one query each and
+    the changes are written with `UPDATE ... FROM (VALUES ...)` statements. If
+    the bulk write fails, the rows are replayed one by one inside savepoints so
+    that each error is attributed to the row that caused it.
 
-                if guardian_updated is None:
-                    raise HTTPException(
-                        status_code=status.HTTP_404_NOT_FOUND,
-                        detail=f"Guardian with ID {validated_guardian_data.id} not found",
-                    )
+    Args:
+        session (Session): SQLAlchemy session.
+        records (list): Records of the uploaded file, as `ValidatedRecord`.
+
+    Returns:
+        List[List[Tuple[bool, dict]]]: Report entries of each record, in order.
+    """
+    results = [[] for _ in records]
+    validated_rows = []
 
-                student_updated = update_student(session, validated_student_data)
+    for index, data in enumerate(records):
+        if data.errors:
+            results[index] = validation_failures(data.record, data.errors)
+        else:
+            validated_rows.append((index, *data.payload))
 
-                if student_updated is None:
-                    raise HTTPException(
-                        status_code=status.HTTP_404_NOT_FOUND,
-                        detail=f"Student with ID {validated_student_data.id} not found",
-                    )
+    # Narrowed to the rows found in the database once they are checked, so that
+    # a failed transaction does not hide the rows rejected as not found.
+    rows_to_update = validated_rows
 
-                successful_students.append(
-                    {
-                        student_id_resonse_key: student_updated.id,
-                        "message": "Data Updated",
-                    }
+    try:
+        with session.begin():
+            guardian_ids = {
+                row.id
+                for row in get_guardians_by_ids(
+                    session, {guardian["id"] for _, guardian, _ in validated_rows}
                 )
-        except HTTPException as e:
-            failed_students.append(
-                {
-                    student_id_resonse_key: validated_student_data,
-                    message_error: e.detail,
-                    status_response_key: "Failed",
-                }
-            )
-        except Exception as e:
-            failed_students.append(
-                {
-                    "Student Data": jsonable_encoder(validated_student_data),
-                    message_error: e.args,
-                    status_response_key: "Failed",
-                }
+            }
+            student_ids = {
+                row.id
+                for row in get_students_by_ids(
+                    session, {student["id"] for _, _, student in validated_rows}
+                )
+            }
+
+            rows_to_update = []
+            for row in validated_rows:
+                index, validated_guardian_data, validated_student_data = row
+                if validated_guardian_data["id"] not in guardian_ids:
+                    detail = (
+                        f"Guardian with ID {validated_guardian_data['id']} not found"
+                    )
+                elif validated_student_data["id"] not in student_ids:
+                    detail = f"Student with ID {validated_student_data['id']} not found"
+                else:
+                    rows_to_update.append(row)
+                    continue
+
+                results[index] = [
+                    (
+                        False,
+                        {
+                            student_id_resonse_key: validated_student_data["id"],
+                            message_error: detail,
+                            status_response_key: "Failed",
+                        },
+                    )
+                ]
+
+            try:
+                with session.begin_nested():
+                    _update_rows(session, rows_to_update)
+            except Exception:
+                for row in rows_to_update:
+                    try:
+                        with session.begin_nested():
+                            _update_rows(session, [row])
+                    except Exception as e:
+                        results[row[0]] = UnexpectedFailure(
+                            [
+                                (
+                                    False,
+                                    {
+                                        student_data_response_key: _student_report_data(
+                                            row[2]
+                                        ),
+                                        message_error: e.args,
+                                        status_response_key: "Failed",
+                                    },
+                                )
+                            ]
+                        )
+    except Exception as e:
+        for index, _, validated_student_data in rows_to_update:
+            results[index] = UnexpectedFailure(
+                [
+                    (
+                        False,
+                        {
+                            student_data_response_key: _student_report_data(
+                                validated_student_data
+                            ),
+                            message_error: e.args,
+                            status_response_key: "Failed",
+                        },
+                    )
+                ]
             )
+    else:
+        for index, _, validated_student_data in rows_to_update:
+            if not results[index]:
+                results[index] = [
+                    (
+                        True,
+                        {
+                            student_id_resonse_key: validated_student_data["id"],
+                            "message": "Data Updated",
+                        },
+                    )
+                ]
+
+    return results
+
+
+def update_data_students(
+    file: UploadFile,
+    background: bool = False,
+    resume: bool = False,
+    report: ImportReportModes = ImportReportModes.JSON,
+    compact: bool = False,
+):
+    """
+    Update student and guardian data from an Excel, CSV or Parquet file.
+
+    The records are processed in chunks of `Settings.IMPORT_CHUNK_SIZE` rows, each
+    one validated by the process pool, then checked and written with a handful
+    of set-based statements.
+
+    Args:
+        file (UploadFile): The file containing data to update.
+        background (bool): Queue the file as an import job instead of processing it in the request.
+        resume (bool): Record the outcome of each row and skip the rows recorded by
+            a previous run of the same file. Background jobs always record them.
+        report (ImportReportModes): Return the report as JSON, stream it as NDJSON
+            or store it for download.
+        compact (bool): Reference the rows of the report by number instead of echoing them.
+
+    Returns:
+        Response: A response containing information about successful and failed updates,
+        or with the ID of the queued job.
+    """
+    if background:
+        return submit_import_job(
+            file=file,
+            kind=ImportKinds.STUDENT_UPDATE,
+            process_chunk=process_update_chunk,
+            validate=validate_data_update,
+            template_id=TypeTemplates.UPDATE_STUDENT_GUARDIAN.template_id,
+            resume=resume,
+        )
+
+    # Only resumable uploads pay for hashing the file and recording its rows.
+    ledger_key = None
+    if resume:
+        ledger_key = LedgerKey(
+            fingerprint_file(file.file),
+            TypeTemplates.UPDATE_STUDENT_GUARDIAN.template_id,
+        )
+    file_data_to_update = extract_data_from_file(
+        file, detach=report == ImportReportModes.NDJSON
+    )
+
+    return import_report_response(
+        iter_import_results(
+            process_update_chunk,
+            validate_data_update,
+            file_data_to_update,
+            ledger_key,
+            resume,
+        ),
+        report,
+        compact,
+        ImportKinds.STUDENT_UPDATE,
+    )
+
+
+def _iter_export_rows(group_id: Optional[int], room_id: Optional[int]):
+    """
+    Stream the rows of the roster export from a session owned by the iteration.
+
+    The session is closed once the rows are exhausted or the client disconnects.
+
+    Args:
+        group_id (int): Only enrollments in rooms of this group.
+        room_id (int): Only enrollments in this room.
 
-    return JSONResponse(
-        status_code=status.HTTP_207_MULTI_STATUS,
-        content={
-            "Successful users": successful_students,
-            "Failed users": failed_students,
+    Returns:
+        Iterator[RowMapping]: One row per enrollment.
+    """
+    session = create_connection()
+
+    try:
+        yield from iter_enrollment_export_rows(
+            db_session=session,
+            group_id=group_id,
+            room_id=room_id,
+            batch_size=Settings.EXPORT_BATCH_SIZE,
+        )
+    finally:
+        session.close()
+
+
+def export_students(
+    file_format: ExportFormats,
+    group_id: Optional[int] = None,
+    room_id: Optional[int] = None,
+) -> StreamingResponse:
+    """
+    Export the enrolled students with their guardians, one row per enrollment.
+
+    Rows are read from a server-side cursor and encoded in batches of
+    `Settings.EXPORT_BATCH_SIZE` while the response is sent, so memory use does
+    not depend on the size of the export.
+
+    Args:
+        file_format (ExportFormats): CSV, NDJSON or Parquet.
+        group_id (int): Only enrollments in rooms of this group.
+        room_id (int): Only enrollments in this room.
+
+    Returns:
+        StreamingResponse: The export file.
+    """
+    rows = _iter_export_rows(group_id=group_id, room_id=room_id)
+    columns = list(enrollment_export_columns)
+
+    if file_format == ExportFormats.PARQUET:
+        content = iter_parquet_chunks(
+            rows,
+            {
+                name: model_column.type.python_type
+                for name, model_column in enrollment_export_columns.items()
+            },
+            Settings.EXPORT_BATCH_SIZE,
+        )
+    elif file_format == ExportFormats.NDJSON:
+        content = iter_ndjson_chunks(rows, columns, Settings.EXPORT_BATCH_SIZE)
+    else:
+        content = iter_csv_chunks(rows, columns, Settings.EXPORT_BATCH_SIZE)
+
+    return StreamingResponse(
+        content,
+        media_type=export_media_types[file_format],
+        headers={
+            "Content-Disposition": f'attachment; filename="students.{file_format.value}"'
         },
     )
@@ -6,6 +6,7 @@ from schemas.teacher import CreateTeacherSchema
 
 from crud.teacher import get_teacher_by_email, post_teacher
 from database.database import create_connection
+from services.reference import teacher_cache
 
 
 def create_teacher(teacher: CreateTeacherSchema):
@@ -29,13 +30,14 @@ def create_teacher(teacher: CreateTeacherSchema):
                 },
                 status_code=status.HTTP_409_CONFLICT,
             )
+        new_teacher = post_teacher(db_session=session, teacher=teacher)
+        teacher_cache.invalidate(new_teacher.id)
+
         return JSONResponse(
             status_code=status.HTTP_201_CREATED,
             content={
                 "message": "Data created successfully",
-                "data": jsonable_encoder(
-                    post_teacher(db_session=session, teacher=teacher)
-                ),
+                "data": jsonable_encoder(new_teacher),
             },
         )
 
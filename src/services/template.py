@@ -1,8 +1,27 @@
+import hashlib
+import io
+import os
+import tempfile
+import threading
+from datetime import datetime
+from typing import Dict, NamedTuple, Optional
+from urllib.parse import quote
+
 import xlsxwriter
-from fastapi import HTTPException, status
-from fastapi.responses import FileResponse
+from fastapi import HTTPException, Response, status
+from fastapi.responses import FileResponse, JSONResponse
+from starlette.background import BackgroundTask
+
+from crud.student import iter_students_with_guardians
+from database.database import create_connection
 
 from enums.template import TypeTemplates
+from services.reference import find_group, find_room
+from settings import Settings
+
+XLSX_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+templates_by_id = {template.template_id: template for template in TypeTemplates}
 
 
 def list_available_templates() -> list:
@@ -27,43 +46,282 @@ def list_available_templates() -> list:
     return list_templates
 
 
-def generate_template(template_id: int) -> FileResponse:
+class TemplateFile(NamedTuple):
     """
-    Generate the necessary template for bulk data uploading.
+    Workbook of a template, generated once and served from memory.
 
-    Returns:
-        File: xlsx file with the required structure
+    Attributes:
+        content (bytes): The xlsx file.
+        etag (str): Quoted digest of the content, used to revalidate downloads.
+        file_name (str): Name offered to the client when downloading the file.
+    """
 
-    Raises:
+    content: bytes
+    etag: str
+    file_name: str
+
+
+# Workbooks already generated, by template ID.
+_template_files: Dict[int, TemplateFile] = {}
+_template_files_lock = threading.Lock()
+
+# Fixed creation date, so the same template always produces the same bytes and
+# ETag, whatever the process or the moment it was generated.
+TEMPLATE_CREATED_AT = datetime(2024, 1, 1)
+
+
+def find_template(template_id: int) -> TypeTemplates:
     """
+    Look up a template by its ID.
 
-    template_selected = None
+    Args:
+        template_id (int): The ID of the template.
 
-    for template in TypeTemplates:
-        if template.template_id == template_id:
-            template_selected = template
+    Returns:
+        TypeTemplates: The template with the given ID.
 
-    if template_selected is None:
+    Raises:
+        HTTPException: If there is no template with that ID.
+    """
+    template = templates_by_id.get(template_id)
+    if template is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Template with ID {template_id} not found",
         )
 
-    file_name = f"{template_selected.template_name}.xlsx"
+    return template
+
+
+def build_template_file(template: TypeTemplates) -> TemplateFile:
+    """
+    Write the workbook of a template in memory.
+
+    Args:
+        template (TypeTemplates): The template to be written.
 
-    workbook = xlsxwriter.Workbook(file_name)
+    Returns:
+        TemplateFile: The workbook with the template headers in its first row.
+    """
+    buffer = io.BytesIO()
+    workbook = xlsxwriter.Workbook(buffer, {"in_memory": True})
+    workbook.set_properties({"created": TEMPLATE_CREATED_AT})
     worksheet = workbook.add_worksheet()
 
     col_position = 0
 
-    for header in template_selected.headers:
+    for header in template.headers:
         worksheet.write(0, col_position, header)
         col_position += 1
 
     workbook.close()
+    content = buffer.getvalue()
+
+    return TemplateFile(
+        content=content,
+        etag=f'"{hashlib.sha256(content).hexdigest()[:32]}"',
+        file_name=f"{template.template_name}.xlsx",
+    )
+
+
+def get_template_file(template: TypeTemplates) -> TemplateFile:
+    """
+    Return the workbook of a template, generating it on first use.
+
+    Args:
+        template (TypeTemplates): The requested template.
+
+    Returns:
+        TemplateFile: The cached workbook.
+    """
+    template_file = _template_files.get(template.template_id)
+
+    if template_file is None:
+        with _template_files_lock:
+            template_file = _template_files.get(template.template_id)
+            if template_file is None:
+                template_file = build_template_file(template)
+                _template_files[template.template_id] = template_file
+
+    return template_file
+
+
+def warm_template_cache():
+    """
+    Generate the workbooks of every template, so no request pays for it.
+    """
+    for template in TypeTemplates:
+        get_template_file(template)
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Tell whether an `If-None-Match` request header matches the current ETag.
+
+    Args:
+        if_none_match (str): Value of the header, possibly a list of ETags.
+        etag (str): Current ETag of the resource.
+
+    Returns:
+        bool: True if the client copy is up to date.
+    """
+    if not if_none_match:
+        return False
+
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+
+    return "*" in candidates or any(
+        candidate.removeprefix("W/") == etag for candidate in candidates
+    )
+
+
+def generate_template(
+    template_id: int, if_none_match: Optional[str] = None
+) -> Response:
+    """
+    Serve the necessary template for bulk data uploading.
+
+    The workbook is generated once per process and served from memory. Clients
+    sending the ETag of their copy in `If-None-Match` get a 304 response without
+    a body.
+
+    Args:
+        template_id (int): The ID of the template.
+        if_none_match (str): ETags of the copies held by the client.
+
+    Returns:
+        Response: xlsx file with the required structure, or 304 if unchanged.
+
+    Raises:
+        HTTPException: If there is no template with that ID.
+    """
+    template_file = get_template_file(find_template(template_id))
+    headers = {
+        "ETag": template_file.etag,
+        "Cache-Control": f"public, max-age={Settings.TEMPLATE_CACHE_MAX_AGE}",
+    }
+
+    if _etag_matches(if_none_match, template_file.etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    quoted_file_name = quote(template_file.file_name)
+    if quoted_file_name != template_file.file_name:
+        headers[
+            "Content-Disposition"
+        ] = f"attachment; filename*=utf-8''{quoted_file_name}"
+    else:
+        headers[
+            "Content-Disposition"
+        ] = f'attachment; filename="{template_file.file_name}"'
+
+    return Response(
+        content=template_file.content,
+        media_type=XLSX_MEDIA_TYPE,
+        headers=headers,
+    )
+
+
+def _write_prefilled_update_template(path: str, students) -> int:
+    """
+    Write the update template filled with the given students to a file.
+
+    The workbook is written in constant memory mode: each row is flushed to disk
+    as soon as the next one starts, so memory use does not depend on the number
+    of students.
+
+    Args:
+        path (str): Path of the xlsx file to be written.
+        students (Iterable[Mapping]): Rows keyed by template header.
+
+    Returns:
+        int: Number of students written.
+    """
+    headers = TypeTemplates.UPDATE_STUDENT_GUARDIAN.headers
+    workbook = xlsxwriter.Workbook(
+        path, {"constant_memory": True, "tmpdir": tempfile.gettempdir()}
+    )
+    worksheet = workbook.add_worksheet()
+    worksheet.write_row(0, 0, headers)
+
+    written = 0
+    for written, student in enumerate(students, start=1):
+        worksheet.write_row(written, 0, [student[header] for header in headers])
+
+    workbook.close()
+
+    return written
+
+
+def export_update_template(
+    group_id: Optional[int] = None, room_id: Optional[int] = None
+):
+    """
+    Export the update template filled with the students of a group or room.
+
+    The students and their guardians are read from a server-side cursor and
+    written to a temporary workbook, which is streamed to the client in chunks
+    and removed once sent.
+
+    Args:
+        group_id (int): Export the students enrolled in any room of this group.
+        room_id (int): Export the students enrolled in this room.
+
+    Returns:
+        Union[FileResponse, JSONResponse]: The xlsx file, or a 404 response if the
+        group or room does not exist.
+
+    Raises:
+        HTTPException: If not exactly one of group_id and room_id is given.
+    """
+    if (group_id is None) == (room_id is None):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Provide either group_id or room_id",
+        )
+
+    session = create_connection()
+
+    try:
+        if group_id is not None:
+            scope = f"Group {group_id}"
+            if not find_group(db_session=session, group_id=group_id):
+                return JSONResponse(
+                    content={"message": f"Group with ID: {group_id} not found"},
+                    status_code=status.HTTP_404_NOT_FOUND,
+                )
+        else:
+            scope = f"Room {room_id}"
+            if not find_room(db_session=session, room_id=room_id):
+                return JSONResponse(
+                    content={"message": f"Room with ID: {room_id} not found"},
+                    status_code=status.HTTP_404_NOT_FOUND,
+                )
+
+        with tempfile.NamedTemporaryFile(delete=False, suffix=".xlsx") as spooled:
+            path = spooled.name
+
+        try:
+            _write_prefilled_update_template(
+                path,
+                iter_students_with_guardians(
+                    db_session=session,
+                    group_id=group_id,
+                    room_id=room_id,
+                    batch_size=Settings.IMPORT_CHUNK_SIZE,
+                ),
+            )
+        except Exception:
+            os.remove(path)
+            raise
+
+    finally:
+        session.close()
+
+    template_name = TypeTemplates.UPDATE_STUDENT_GUARDIAN.template_name
 
     return FileResponse(
-        file_name,
-        filename=file_name,
-        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        path,
+        filename=f"{template_name} - {scope}.xlsx",
+        media_type=XLSX_MEDIA_TYPE,
+        background=BackgroundTask(os.remove, path),
     )
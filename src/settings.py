@@ -9,7 +9,7 @@ class Settings:
     """
     This class holds the configuration settings for the application.
     It includes the database connection details such as host, port, database name,
-    username, and password.
+    username, and password, as well as the connection pool configuration.
 
     Attributes:
         HOST_DB (str): The host address of the database server.
@@ -17,6 +17,27 @@ class Settings:
         DB_NAME (str): The name of the database.
         USERNAME_DB (str): The username for accessing the database.
         USERPASSWORD_DB (str): The password for accessing the database.
+        DB_POOL_SIZE (int): Number of connections kept open in the pool.
+        DB_MAX_OVERFLOW (int): Connections allowed above the pool size under load.
+        DB_POOL_PRE_PING (bool): Test connections for liveness before handing them out.
+        DB_POOL_RECYCLE (int): Seconds after which a pooled connection is replaced.
+        DB_POOL_TIMEOUT (int): Seconds to wait for a free connection before failing.
+        IMPORT_CHUNK_SIZE (int): Rows of a bulk upload written and committed together.
+        IMPORT_JOB_WORKERS (int): Threads processing background import jobs.
+        VALIDATION_WORKERS (int): Processes validating the rows of bulk uploads; below 2 they are validated inline.
+        LOCAL_DB_PATH (str): SQLite file holding process-local state such as import jobs.
+        IMPORT_LEDGER_TTL (int): Seconds the row outcomes of an upload are kept to resume it.
+        IMPORT_REPORT_DIR (str): Directory holding the stored reports of bulk uploads.
+        IMPORT_REPORT_TTL (int): Seconds a stored report is kept for download.
+        LIST_PAGE_SIZE (int): Default number of items per page of the listing endpoints.
+        LIST_MAX_PAGE_SIZE (int): Largest page size a client may request.
+        EXPORT_BATCH_SIZE (int): Rows fetched and encoded together by the roster export.
+        TEMPLATE_CACHE_MAX_AGE (int): Seconds clients may reuse a downloaded template before revalidating it.
+        REFERENCE_CACHE_TTL (int): Seconds rooms, groups, courses and teachers are cached.
+        REFERENCE_CACHE_SIZE (int): Entries kept by the in-memory reference cache of each process.
+        REFERENCE_CACHE_URL (str): Redis URL of a reference cache shared between processes; empty to keep it in memory.
+        SQL_PROFILE (bool): Profile the SQL of every request, not only of those sending `X-SQL-Profile: 1`.
+        SQL_PROFILE_REPEAT_THRESHOLD (int): Executions of a statement shape in one request from which it is flagged as N+1.
     """
 
     HOST_DB = os.getenv("HOST_DB")
@@ -24,3 +45,30 @@ class Settings:
     DB_NAME = os.getenv("DB_NAME")
     USERNAME_DB = os.getenv("USERNAME_DB")
     USERPASSWORD_DB = os.getenv("USERPASSWORD_DB")
+
+    DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+    DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+    DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+    DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+    DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", "30"))
+
+    IMPORT_CHUNK_SIZE = int(os.getenv("IMPORT_CHUNK_SIZE", "1000"))
+    IMPORT_JOB_WORKERS = int(os.getenv("IMPORT_JOB_WORKERS", "2"))
+    VALIDATION_WORKERS = int(os.getenv("VALIDATION_WORKERS", str(os.cpu_count() or 1)))
+    LOCAL_DB_PATH = os.getenv("LOCAL_DB_PATH", "local_state.db")
+    IMPORT_LEDGER_TTL = int(os.getenv("IMPORT_LEDGER_TTL", "86400"))
+    IMPORT_REPORT_DIR = os.getenv("IMPORT_REPORT_DIR", "import_reports")
+    IMPORT_REPORT_TTL = int(os.getenv("IMPORT_REPORT_TTL", "86400"))
+
+    LIST_PAGE_SIZE = int(os.getenv("LIST_PAGE_SIZE", "100"))
+    LIST_MAX_PAGE_SIZE = int(os.getenv("LIST_MAX_PAGE_SIZE", "1000"))
+    EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "1000"))
+
+    TEMPLATE_CACHE_MAX_AGE = int(os.getenv("TEMPLATE_CACHE_MAX_AGE", "3600"))
+
+    REFERENCE_CACHE_TTL = int(os.getenv("REFERENCE_CACHE_TTL", "300"))
+    REFERENCE_CACHE_SIZE = int(os.getenv("REFERENCE_CACHE_SIZE", "1024"))
+    REFERENCE_CACHE_URL = os.getenv("REFERENCE_CACHE_URL", "")
+
+    SQL_PROFILE = os.getenv("SQL_PROFILE", "false").lower() == "true"
+    SQL_PROFILE_REPEAT_THRESHOLD = int(os.getenv("SQL_PROFILE_REPEAT_THRESHOLD", "10"))
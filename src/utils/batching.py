@@ -0,0 +1,23 @@
+from itertools import islice
+from typing import Iterable, Iterator, List, TypeVar
+
+T = TypeVar("T")
+
+
+def chunked(iterable: Iterable[T], size: int) -> Iterator[List[T]]:
+    """
+    Split an iterable into consecutive lists of at most `size` items.
+
+    Args:
+        iterable (Iterable): Items to be grouped.
+        size (int): Maximum number of items per chunk.
+
+    Returns:
+        Iterator[List]: Chunks in the original order.
+    """
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
@@ -0,0 +1,230 @@
+import json
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Callable, Hashable, Iterable
+
+
+class CacheBackend(ABC):
+    """
+    Storage of cached entries.
+
+    The in-memory backend keeps the entries of each process; other backends may
+    share them between processes.
+    """
+
+    @abstractmethod
+    def get_many(self, keys: list) -> dict:
+        """
+        Return the cached value of each key present and not expired.
+
+        Args:
+            keys (list): Keys to be looked up.
+
+        Returns:
+            dict: Map of key to cached value, for the keys found.
+        """
+
+    @abstractmethod
+    def set_many(self, entries: dict, ttl: int):
+        """
+        Store several entries.
+
+        Args:
+            entries (dict): Map of key to value.
+            ttl (int): Seconds the entries are kept.
+        """
+
+    @abstractmethod
+    def delete_many(self, keys: list):
+        """
+        Remove several entries, if present.
+
+        Args:
+            keys (list): Keys to be removed.
+        """
+
+
+class MemoryCacheBackend(CacheBackend):
+    """
+    Per-process cache that drops the least recently used entries beyond `max_entries`.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_many(self, keys: list) -> dict:
+        now = time.monotonic()
+        found = {}
+
+        with self._lock:
+            for key in keys:
+                entry = self._entries.get(key)
+                if entry is None:
+                    continue
+                expires_at, value = entry
+                if expires_at <= now:
+                    del self._entries[key]
+                    continue
+                self._entries.move_to_end(key)
+                found[key] = value
+
+        return found
+
+    def set_many(self, entries: dict, ttl: int):
+        expires_at = time.monotonic() + ttl
+
+        with self._lock:
+            for key, value in entries.items():
+                self._entries[key] = (expires_at, value)
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete_many(self, keys: list):
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+
+class RedisCacheBackend(CacheBackend):
+    """
+    Cache shared by every process connected to the same Redis server.
+
+    Keys are stored as strings and values as JSON, so only JSON-compatible
+    values can be cached. Needs the optional `redis` package.
+    """
+
+    def __init__(self, url: str):
+        """
+        Connect to the Redis server.
+
+        Args:
+            url (str): URL of the server.
+
+        Raises:
+            RuntimeError: If the `redis` package is not installed.
+            redis.RedisError: If the server cannot be reached.
+        """
+        try:
+            import redis
+        except ImportError as e:
+            raise RuntimeError(
+                "The Redis cache backend needs the redis package: pip install redis"
+            ) from e
+
+        self._client = redis.Redis.from_url(url)
+        self._client.ping()
+
+    def get_many(self, keys: list) -> dict:
+        values = self._client.mget([str(key) for key in keys])
+
+        return {
+            key: json.loads(value)
+            for key, value in zip(keys, values)
+            if value is not None
+        }
+
+    def set_many(self, entries: dict, ttl: int):
+        with self._client.pipeline(transaction=False) as pipeline:
+            for key, value in entries.items():
+                pipeline.set(str(key), json.dumps(value), ex=ttl)
+            pipeline.execute()
+
+    def delete_many(self, keys: list):
+        if keys:
+            self._client.delete(*[str(key) for key in keys])
+
+
+class ReadThroughCache:
+    """
+    Cache in front of a lookup by IDs.
+
+    Only IDs that exist are cached, so a record created by another process is
+    found at once; a record deleted by another process may be returned until its
+    entry expires, unless the backend is shared.
+
+    Attributes:
+        namespace (str): Prefix of the keys, unique per cached lookup.
+        load_many (Callable): Function taking a session and a set of IDs and
+            returning a map of ID to value for the IDs that exist.
+        get_backend (Callable): Function returning the backend in use, so it can be replaced.
+        ttl (int): Seconds entries are kept.
+    """
+
+    def __init__(
+        self,
+        namespace: str,
+        load_many: Callable,
+        get_backend: Callable[[], CacheBackend],
+        ttl: int,
+    ):
+        self.namespace = namespace
+        self.load_many = load_many
+        self.get_backend = get_backend
+        self.ttl = ttl
+
+    def _key(self, entity_id: Hashable) -> str:
+        return f"{self.namespace}:{entity_id}"
+
+    def get_many(self, db_session, entity_ids: Iterable) -> dict:
+        """
+        Return the value of each ID, loading only the ones that are not cached.
+
+        Args:
+            db_session (Session): SQLAlchemy database session, used on cache misses.
+            entity_ids (Iterable): IDs to be looked up.
+
+        Returns:
+            dict: Map of every requested ID to its value, or None if it does not exist.
+        """
+        entity_ids = set(entity_ids)
+        backend = self.get_backend()
+        cached = backend.get_many([self._key(entity_id) for entity_id in entity_ids])
+        values = {
+            entity_id: cached[self._key(entity_id)]
+            for entity_id in entity_ids
+            if self._key(entity_id) in cached
+        }
+
+        missing = entity_ids - values.keys()
+        if missing:
+            loaded = self.load_many(db_session, missing)
+            if loaded:
+                backend.set_many(
+                    {
+                        self._key(entity_id): value
+                        for entity_id, value in loaded.items()
+                    },
+                    self.ttl,
+                )
+            values.update(loaded)
+
+        return {entity_id: values.get(entity_id) for entity_id in entity_ids}
+
+    def get(self, db_session, entity_id: Hashable):
+        """
+        Return the value of an ID, or None if it does not exist.
+
+        Args:
+            db_session (Session): SQLAlchemy database session, used on a cache miss.
+            entity_id (Hashable): ID to be looked up.
+
+        Returns:
+            Any: The cached or loaded value.
+        """
+        return self.get_many(db_session, [entity_id])[entity_id]
+
+    def invalidate(self, *entity_ids: Hashable):
+        """
+        Drop the cached values of the given IDs, so they are loaded again on next use.
+
+        Args:
+            entity_ids (Hashable): IDs whose data changed.
+        """
+        self.get_backend().delete_many(
+            [self._key(entity_id) for entity_id in entity_ids]
+        )
@@ -0,0 +1,330 @@
+import codecs
+import csv
+import io
+import json
+import math
+import re
+from itertools import chain
+from typing import BinaryIO, Iterable, Iterator, Optional
+
+from openpyxl import load_workbook
+
+from enums.file_format import FileFormats
+
+XLSX_SIGNATURE = b"PK\x03\x04"
+PARQUET_SIGNATURE = b"PAR1"
+SNIFF_SIZE = 4096
+PARQUET_BATCH_SIZE = 1000
+JSON_WHITESPACE = re.compile(r"[ \t\n\r]*")
+# Literal, number or string escape that may continue in the next chunk.
+JSON_PARTIAL_TOKEN = re.compile(
+    r"-?[0-9]*(\.[0-9]*)?([eE][+-]?[0-9]*)?|t(r(ue?)?)?|f(a(l(se?)?)?)?|n(u(ll?)?)?"
+    r"|\\?u[0-9a-fA-F]{0,4}|\\"
+)
+JSON_RECORD_MAX_SIZE = 1024 * 1024
+
+
+def clean_cell_value(value):
+    """
+    Normalize a spreadsheet cell value the way the upload pipelines expect it.
+
+    Empty and NaN cells become None and whole-number floats become integers,
+    matching what pandas used to produce.
+
+    Args:
+        value (Any): Raw cell value.
+
+    Returns:
+        Any: Normalized value.
+    """
+    if isinstance(value, float):
+        if math.isnan(value):
+            return None
+        if value.is_integer():
+            return int(value)
+    return value
+
+
+def iter_xlsx_records(file: BinaryIO) -> Iterator[dict]:
+    """
+    Lazily read the first sheet of an Excel workbook as header-mapped records.
+
+    The workbook is opened in read-only mode, so rows are parsed from the file
+    as they are consumed and memory use does not depend on the sheet size.
+    Blank rows are skipped.
+
+    Args:
+        file (BinaryIO): Seekable binary file with the workbook.
+
+    Returns:
+        Iterator[Dict[str, Any]]: One dictionary per row, keyed by the header row.
+    """
+    workbook = load_workbook(file, read_only=True, data_only=True)
+
+    try:
+        rows = workbook.worksheets[0].iter_rows(values_only=True)
+        headers = next(rows, None) or ()
+        columns = [
+            (position, header)
+            for position, header in enumerate(headers)
+            if header is not None
+        ]
+
+        for row in rows:
+            values = [clean_cell_value(value) for value in row]
+            if all(value is None for value in values):
+                continue
+            values += [None] * (len(headers) - len(values))
+
+            yield {header: values[position] for position, header in columns}
+    finally:
+        workbook.close()
+
+
+def detect_file_format(file: BinaryIO) -> Optional[FileFormats]:
+    """
+    Identify the format of an uploaded file from its content.
+
+    Workbooks and Parquet files are recognized by their signature; anything
+    else that decodes as UTF-8 text is treated as CSV. The file position is
+    restored before returning.
+
+    Args:
+        file (BinaryIO): Seekable binary file.
+
+    Returns:
+        FileFormats: The detected format, or None if it is not supported.
+    """
+    position = file.tell()
+    sample = file.read(SNIFF_SIZE)
+    file.seek(position)
+
+    if sample.startswith(XLSX_SIGNATURE):
+        return FileFormats.XLSX
+    if sample.startswith(PARQUET_SIGNATURE):
+        return FileFormats.PARQUET
+    if not sample or b"\x00" in sample:
+        return None
+
+    try:
+        # The sample may end in the middle of a multi-byte character.
+        sample.decode("utf-8-sig")
+    except UnicodeDecodeError as e:
+        if e.start < len(sample) - 3:
+            return None
+
+    return FileFormats.CSV
+
+
+def iter_csv_records(file: BinaryIO) -> Iterator[dict]:
+    """
+    Lazily read a UTF-8 CSV file as header-mapped records.
+
+    The delimiter (comma, semicolon or tab) is detected from the first lines.
+    Empty cells become None and blank rows are skipped.
+
+    Args:
+        file (BinaryIO): Binary file with the CSV content.
+
+    Returns:
+        Iterator[Dict[str, Any]]: One dictionary per row, keyed by the header row.
+    """
+    text = io.TextIOWrapper(file, encoding="utf-8-sig", newline="")
+
+    try:
+        sample = text.read(SNIFF_SIZE)
+        text.seek(0)
+        try:
+            dialect = csv.Sniffer().sniff(sample, delimiters=",;\t")
+        except csv.Error:
+            dialect = csv.excel
+
+        for row in csv.DictReader(text, dialect=dialect):
+            record = {
+                header: value if value != "" else None
+                for header, value in row.items()
+                if header is not None
+            }
+            if all(value is None for value in record.values()):
+                continue
+
+            yield record
+    finally:
+        # Leave the underlying upload open for its owner.
+        text.detach()
+
+
+def iter_parquet_records(file: BinaryIO) -> Iterator[dict]:
+    """
+    Lazily read a Parquet file as records, one record batch at a time.
+
+    Args:
+        file (BinaryIO): Seekable binary file with the Parquet content.
+
+    Returns:
+        Iterator[Dict[str, Any]]: One dictionary per row, keyed by column name.
+    """
+    import pyarrow.parquet as pq
+
+    parquet_file = pq.ParquetFile(file)
+
+    for batch in parquet_file.iter_batches(batch_size=PARQUET_BATCH_SIZE):
+        for row in batch.to_pylist():
+            yield {header: clean_cell_value(value) for header, value in row.items()}
+
+
+def _iter_text(chunks: Iterable[bytes]) -> Iterator[str]:
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+
+    for chunk in chunks:
+        text = decoder.decode(chunk)
+        if text:
+            yield text
+
+    text = decoder.decode(b"", final=True)
+    if text:
+        yield text
+
+
+def _json_record(value, position: str) -> dict:
+    if not isinstance(value, dict):
+        raise ValueError(f"{position} is not a JSON object")
+
+    return value
+
+
+def _iter_ndjson(texts: Iterator[str]) -> Iterator[dict]:
+    pending = ""
+    line_number = 0
+
+    for text in chain(texts, ["\n"]):
+        lines = (pending + text).split("\n")
+        pending = lines.pop()
+
+        for line in lines:
+            line_number += 1
+            if not line.strip():
+                continue
+            try:
+                value = json.loads(line)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"Line {line_number}: {e.msg}") from e
+
+            yield _json_record(value, f"Line {line_number}")
+
+
+def _is_truncated(buffer: str, error: json.JSONDecodeError) -> bool:
+    # The decoder stopped at the end of the buffer, or in a token reaching it.
+    if error.msg.startswith("Unterminated string"):
+        return True
+
+    return JSON_PARTIAL_TOKEN.fullmatch(buffer, error.pos) is not None
+
+
+def _iter_json_array(texts: Iterator[str]) -> Iterator[dict]:
+    decoder = json.JSONDecoder()
+    buffer, position = "", 0
+
+    def read_more(size: int = 1) -> bool:
+        nonlocal buffer, position
+        read = []
+        while size > 0:
+            text = next(texts, None)
+            if text is None:
+                break
+            read.append(text)
+            size -= len(text)
+        if not read:
+            return False
+        buffer, position = buffer[position:] + "".join(read), 0
+        return True
+
+    def next_char() -> str:
+        nonlocal position
+        while True:
+            position = JSON_WHITESPACE.match(buffer, position).end()
+            if position < len(buffer):
+                return buffer[position]
+            if not read_more():
+                return ""
+
+    # The body is known to start with the opening bracket.
+    next_char()
+    position += 1
+    record_number = 0
+
+    if next_char() == "]":
+        position += 1
+    else:
+        while True:
+            record_number += 1
+            next_char()
+            # A record split between chunks fails to decode until the rest arrives.
+            # As much as is pending is read before retrying, so a long record is
+            # decoded a logarithmic number of times.
+            while True:
+                try:
+                    value, position = decoder.raw_decode(buffer, position)
+                    break
+                except json.JSONDecodeError as e:
+                    pending = len(buffer) - position
+                    if not _is_truncated(buffer, e) or not read_more(pending):
+                        raise ValueError(f"Record {record_number}: {e.msg}") from e
+                    if pending > JSON_RECORD_MAX_SIZE:
+                        raise ValueError(
+                            f"Record {record_number} is longer than "
+                            f"{JSON_RECORD_MAX_SIZE} characters"
+                        ) from e
+
+            yield _json_record(value, f"Record {record_number}")
+
+            separator = next_char()
+            position += 1
+            if separator == "]":
+                break
+            if separator != ",":
+                raise ValueError(f"Expecting ',' or ']' after record {record_number}")
+
+    if next_char():
+        raise ValueError("Extra data after the JSON array")
+
+
+def iter_json_records(chunks: Iterable[bytes]) -> Iterator[dict]:
+    """
+    Incrementally parse a JSON array of records, or NDJSON with one record per line.
+
+    The content is decoded and parsed as the chunks arrive, so only the records
+    being parsed are held in memory. Content starting with `[` is read as a JSON
+    array, anything else as NDJSON, where blank lines are skipped.
+
+    Args:
+        chunks (Iterable[bytes]): UTF-8 content, in chunks of any size.
+
+    Returns:
+        Iterator[Dict[str, Any]]: One dictionary per record.
+
+    Raises:
+        ValueError: If the content is not valid UTF-8 or JSON, a record is not an
+            object, or a record of an array is longer than `JSON_RECORD_MAX_SIZE`.
+    """
+    texts = _iter_text(chunks)
+    head = ""
+
+    for text in texts:
+        head += text
+        if head.strip():
+            break
+
+    texts = chain([head], texts)
+
+    if head.lstrip().startswith("["):
+        yield from _iter_json_array(texts)
+    else:
+        yield from _iter_ndjson(texts)
+
+
+readers_by_format = {
+    FileFormats.XLSX: iter_xlsx_records,
+    FileFormats.CSV: iter_csv_records,
+    FileFormats.PARQUET: iter_parquet_records,
+}
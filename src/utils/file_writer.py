@@ -0,0 +1,127 @@
+import csv
+import io
+import json
+from typing import Dict, Iterable, Iterator, List
+
+from fastapi.encoders import jsonable_encoder
+
+from utils.batching import chunked
+
+
+def iter_csv_chunks(
+    rows: Iterable[dict], columns: List[str], batch_size: int
+) -> Iterator[bytes]:
+    """
+    Encode records as UTF-8 CSV, one chunk of rows at a time.
+
+    Args:
+        rows (Iterable[dict]): Records keyed by column name.
+        columns (List[str]): Columns to be written, in order; also the header row.
+        batch_size (int): Rows encoded per chunk.
+
+    Returns:
+        Iterator[bytes]: The header followed by the encoded chunks.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+
+    for batch in chunked(rows, batch_size):
+        writer.writerows([row[column] for column in columns] for row in batch)
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+def iter_ndjson_chunks(
+    rows: Iterable[dict], columns: List[str], batch_size: int
+) -> Iterator[bytes]:
+    """
+    Encode records as newline-delimited JSON, one chunk of rows at a time.
+
+    Args:
+        rows (Iterable[dict]): Records keyed by column name.
+        columns (List[str]): Keys to be written, in order.
+        batch_size (int): Rows encoded per chunk.
+
+    Returns:
+        Iterator[bytes]: The encoded chunks, one JSON object per line.
+    """
+    for batch in chunked(rows, batch_size):
+        lines = [
+            json.dumps(
+                {column: row[column] for column in columns}, default=jsonable_encoder
+            )
+            for row in batch
+        ]
+        yield ("\n".join(lines) + "\n").encode("utf-8")
+
+
+class _ChunkSink(io.RawIOBase):
+    """
+    Write-only file collecting what pyarrow writes until it is drained.
+    """
+
+    def __init__(self):
+        self.chunks = []
+        self.position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def drain(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def iter_parquet_chunks(
+    rows: Iterable[dict], column_types: Dict[str, type], batch_size: int
+) -> Iterator[bytes]:
+    """
+    Encode records as a Parquet file, writing one row group per chunk of rows.
+
+    Each row group is sent as soon as it is written; the file footer comes last.
+
+    Args:
+        rows (Iterable[dict]): Records keyed by column name.
+        column_types (Dict[str, type]): Python type (int or str) of each column, in order.
+        batch_size (int): Rows per row group.
+
+    Returns:
+        Iterator[bytes]: The bytes of the Parquet file, in order.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    arrow_types = {int: pa.int64(), str: pa.string()}
+    schema = pa.schema(
+        [
+            (column, arrow_types[python_type])
+            for column, python_type in column_types.items()
+        ]
+    )
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, schema)
+
+    try:
+        for batch in chunked(rows, batch_size):
+            writer.write_table(
+                pa.Table.from_pylist([dict(row) for row in batch], schema=schema)
+            )
+            yield sink.drain()
+    finally:
+        writer.close()
+
+    yield sink.drain()
@@ -0,0 +1,208 @@
+import re
+import time
+from contextvars import ContextVar
+from typing import Iterable, Iterator, Optional, TypeVar
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    Counter,
+    Histogram,
+    generate_latest,
+)
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.responses import Response
+
+T = TypeVar("T")
+
+STATEMENT_OPERATIONS = {"SELECT", "INSERT", "UPDATE", "DELETE", "WITH"}
+STATEMENT_KEYWORD = re.compile(r"\s*(\w+)")
+
+REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds",
+    "Time to serve a request, until its last body chunk is sent.",
+    ["router", "route", "method", "status"],
+)
+REQUEST_DB_STATEMENTS = Histogram(
+    "http_request_db_statements",
+    "SQL statements executed while serving a request.",
+    ["router"],
+    buckets=(0, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 5000),
+)
+REQUEST_DB_SECONDS = Histogram(
+    "http_request_db_seconds",
+    "Time spent executing SQL statements while serving a request.",
+    ["router"],
+)
+DB_STATEMENT_SECONDS = Histogram(
+    "db_statement_duration_seconds",
+    "Time to execute a SQL statement, by its leading keyword.",
+    ["operation"],
+)
+DB_POOL_CHECKOUT_SECONDS = Histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time waited for a connection of the pool, including opening a new one.",
+    ["engine"],
+)
+IMPORT_STAGE_SECONDS = Histogram(
+    "import_stage_duration_seconds",
+    "Time a bulk import spent on a chunk: reading the file, waiting for its "
+    "validation or writing it to the database.",
+    ["stage"],
+)
+IMPORT_ROWS = Counter(
+    "import_rows",
+    "Rows processed by the bulk imports.",
+    ["outcome"],
+)
+
+
+class QueryStats:
+    """
+    SQL statements executed on behalf of the current request.
+
+    Attributes:
+        statements (int): Number of statements executed.
+        seconds (float): Time spent executing them.
+    """
+
+    __slots__ = ("statements", "seconds")
+
+    def __init__(self):
+        self.statements = 0
+        self.seconds = 0.0
+
+
+# Copied into the threadpool and the async engine's greenlets, so the statements
+# of sync and async endpoints are added to the stats of their request.
+_request_queries: ContextVar[Optional[QueryStats]] = ContextVar(
+    "request_queries", default=None
+)
+
+
+def _statement_operation(statement: str) -> str:
+    match = STATEMENT_KEYWORD.match(statement)
+    keyword = match.group(1).upper() if match else None
+
+    return keyword if keyword in STATEMENT_OPERATIONS else "OTHER"
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_start"].pop()
+    DB_STATEMENT_SECONDS.labels(_statement_operation(statement)).observe(elapsed)
+
+    stats = _request_queries.get()
+    if stats is not None:
+        stats.statements += 1
+        stats.seconds += elapsed
+
+
+def _handle_error(exception_context):
+    if exception_context.connection is None:
+        return
+
+    starts = exception_context.connection.info.get("query_start")
+    if starts:
+        starts.pop()
+
+
+def instrument_engine(engine: Engine):
+    """
+    Record the duration of every statement executed by the engine.
+
+    Args:
+        engine (Engine): Sync engine, or the `sync_engine` of an async one.
+    """
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+
+
+def timed_iter(iterable: Iterable[T], histogram) -> Iterator[T]:
+    """
+    Yield the items of an iterable, recording how long each one took to produce.
+
+    Args:
+        iterable (Iterable): Items to be yielded, usually produced lazily.
+        histogram (Histogram): Histogram, with its labels set, observing each wait.
+
+    Returns:
+        Iterator: The same items, in order.
+    """
+    iterator = iter(iterable)
+
+    while True:
+        start = time.perf_counter()
+        try:
+            item = next(iterator)
+        except StopIteration:
+            return
+        histogram.observe(time.perf_counter() - start)
+        yield item
+
+
+def _route_labels(scope: dict) -> tuple:
+    route = scope.get("route")
+    if route is None:
+        return "unmatched", "unmatched"
+
+    return route.path.split("/")[1] or "root", route.path
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording the latency and the SQL statements of each request.
+
+    Requests are labelled by router (the first segment of the route path) and by
+    route template, so the labels stay bounded whatever the path parameters.
+    Streaming responses are measured until their last chunk is sent.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats()
+        token = _request_queries.set(stats)
+        # Unhandled exceptions are turned into responses by an outer middleware.
+        status_code = 500
+        start = time.perf_counter()
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - start
+            _request_queries.reset(token)
+            router, route = _route_labels(scope)
+            REQUEST_SECONDS.labels(
+                router, route, scope["method"], str(status_code)
+            ).observe(elapsed)
+            REQUEST_DB_STATEMENTS.labels(router).observe(stats.statements)
+            REQUEST_DB_SECONDS.labels(router).observe(stats.seconds)
+
+
+def metrics_response() -> Response:
+    """
+    Render the metrics of this process in the Prometheus text format.
+
+    Returns:
+        Response: The metrics, with the exposition content type.
+    """
+    # The content type already names its charset, so it is not set as media type.
+    return Response(
+        content=generate_latest(), headers={"Content-Type": CONTENT_TYPE_LATEST}
+    )
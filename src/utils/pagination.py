@@ -0,0 +1,45 @@
+from typing import Callable, List, Optional, Sequence, Tuple, TypeVar
+
+T = TypeVar("T")
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def split_page(
+    rows: Sequence[T], limit: int, get_id: Callable[[T], int]
+) -> Tuple[List[T], Optional[int]]:
+    """
+    Split the rows of a keyset query into the page and the cursor of the next one.
+
+    The query is expected to fetch `limit + 1` rows ordered by ID, so the extra
+    row tells whether there is a following page without a COUNT query.
+
+    Args:
+        rows (Sequence): Rows fetched, ordered by ID.
+        limit (int): Maximum number of rows of the page.
+        get_id (Callable): Returns the ID of a row.
+
+    Returns:
+        Tuple[list, Optional[int]]: The rows of the page, and the ID to be sent as
+        cursor for the next page, or None if this is the last one.
+    """
+    page = list(rows[:limit])
+    next_cursor = get_id(page[-1]) if len(rows) > limit and page else None
+
+    return page, next_cursor
+
+
+def page_headers(next_cursor: Optional[int]) -> dict:
+    """
+    Build the response headers announcing the cursor of the next page.
+
+    Args:
+        next_cursor (Optional[int]): Cursor returned by `split_page`.
+
+    Returns:
+        dict: The `X-Next-Cursor` header, or no header on the last page.
+    """
+    if next_cursor is None:
+        return {}
+
+    return {NEXT_CURSOR_HEADER: str(next_cursor)}
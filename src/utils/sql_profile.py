@@ -0,0 +1,273 @@
+import logging
+import re
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = "x-sql-profile"
+
+_LITERAL = re.compile(r"'(?:[^']|'')*'|%\(\w+\)s|\$\d+|\b\d+\b")
+_LIST = re.compile(r"\?(?:\s*,\s*\?)+")
+_ROWS = re.compile(r"(\(\?(?:, \.\.\.)?\))(?:\s*,\s*\(\?(?:, \.\.\.)?\))+")
+_SPACES = re.compile(r"\s+")
+
+
+def statement_shape(statement: str) -> str:
+    """
+    Reduce a SQL statement to its shape, so that runs with other values match.
+
+    Parameters and literals become `?`, and lists of them (IN lists, multi-row
+    VALUES) are collapsed, so batches of any size share a shape.
+
+    Args:
+        statement (str): SQL statement as sent to the driver.
+
+    Returns:
+        str: The normalized statement.
+    """
+    shape = _LITERAL.sub("?", statement)
+    shape = _LIST.sub("?, ...", shape)
+    shape = _ROWS.sub(r"\1, ...", shape)
+
+    return _SPACES.sub(" ", shape).strip()
+
+
+class ShapeTotals:
+    """
+    Executions of one statement shape.
+
+    Attributes:
+        count (int): Number of executions.
+        seconds (float): Time spent executing them.
+        rows (int): Rows returned or affected, over the executions reporting it.
+        unknown_rows (int): Executions whose driver did not report a row count.
+    """
+
+    __slots__ = ("count", "seconds", "rows", "unknown_rows")
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.rows = 0
+        self.unknown_rows = 0
+
+    @property
+    def per_row(self) -> bool:
+        """
+        Whether the executions returned or affected at most one row each on average.
+        """
+        return not self.unknown_rows and self.rows <= self.count
+
+
+class SqlProfile:
+    """
+    Statements executed while a profile is active, grouped by shape.
+
+    Attributes:
+        shapes (dict): Map of statement shape to its `ShapeTotals`.
+    """
+
+    def __init__(self):
+        self.shapes = {}
+
+    def record(self, statement: str, elapsed: float, rowcount: int):
+        shape = statement_shape(statement)
+        totals = self.shapes.get(shape)
+        if totals is None:
+            totals = self.shapes[shape] = ShapeTotals()
+        totals.count += 1
+        totals.seconds += elapsed
+        if rowcount >= 0:
+            totals.rows += rowcount
+        else:
+            totals.unknown_rows += 1
+
+    @property
+    def statements(self) -> int:
+        return sum(totals.count for totals in self.shapes.values())
+
+    @property
+    def seconds(self) -> float:
+        return sum(totals.seconds for totals in self.shapes.values())
+
+    def n_plus_one(self, threshold: int) -> list:
+        """
+        List the shapes that look like an N+1 query pattern, most frequent first.
+
+        A shape is flagged when it ran at least `threshold` times and its
+        executions returned or affected at most one row each on average: a
+        lookup or write issued once per row instead of once per batch. Batched
+        statements repeated once per chunk are not flagged, and neither are
+        statements without a row count, such as savepoints.
+
+        Args:
+            threshold (int): Executions from which a shape may be flagged.
+
+        Returns:
+            List[Tuple[str, ShapeTotals]]: The flagged shapes and their totals.
+        """
+        return sorted(
+            (
+                (shape, totals)
+                for shape, totals in self.shapes.items()
+                if totals.count >= threshold and totals.per_row
+            ),
+            key=lambda item: item[1].count,
+            reverse=True,
+        )
+
+    def summary(self, threshold: int) -> dict:
+        """
+        Summarize the profile.
+
+        Args:
+            threshold (int): Executions from which a shape may be flagged as N+1.
+
+        Returns:
+            dict: Statement count, total seconds, every shape by time spent and
+            the shapes flagged as N+1.
+        """
+
+        def describe(shape: str, totals: ShapeTotals) -> dict:
+            return {
+                "shape": shape,
+                "count": totals.count,
+                "seconds": round(totals.seconds, 6),
+                "rows": totals.rows,
+            }
+
+        shapes = sorted(
+            self.shapes.items(), key=lambda item: item[1].seconds, reverse=True
+        )
+
+        return {
+            "statements": self.statements,
+            "seconds": round(self.seconds, 6),
+            "shapes": [describe(shape, totals) for shape, totals in shapes],
+            "n_plus_one": [
+                describe(shape, totals) for shape, totals in self.n_plus_one(threshold)
+            ],
+        }
+
+
+_active_profile: ContextVar[Optional[SqlProfile]] = ContextVar(
+    "active_sql_profile", default=None
+)
+
+
+@contextmanager
+def profile_sql() -> Iterator[SqlProfile]:
+    """
+    Record the statements executed in the current context, including the ones
+    run in the threadpool on its behalf, until the block exits.
+
+    Returns:
+        Iterator[SqlProfile]: The profile being recorded.
+    """
+    profile = SqlProfile()
+    token = _active_profile.set(profile)
+
+    try:
+        yield profile
+    finally:
+        _active_profile.reset(token)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _active_profile.get() is not None:
+        conn.info.setdefault("profile_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    profile = _active_profile.get()
+    if profile is not None:
+        elapsed = time.perf_counter() - conn.info["profile_start"].pop()
+        profile.record(statement, elapsed, cursor.rowcount)
+
+
+def _handle_error(exception_context):
+    if exception_context.connection is None:
+        return
+
+    starts = exception_context.connection.info.get("profile_start")
+    if starts:
+        starts.pop()
+
+
+def profile_engine(engine: Engine):
+    """
+    Let the statements of the engine be recorded by active profiles.
+
+    The listeners do nothing unless a profile is active.
+
+    Args:
+        engine (Engine): Sync engine, or the `sync_engine` of an async one.
+    """
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+
+
+class SqlProfileMiddleware:
+    """
+    ASGI middleware profiling the SQL of requests that ask for it.
+
+    Requests are profiled when they carry an `X-SQL-Profile: 1` header, or all
+    of them when `always` is set. The response gets `X-SQL-Statements`,
+    `X-SQL-Time-Ms` and `X-SQL-N-Plus-One` headers counting what ran before it
+    started, and the full summary is logged once the response is sent, as a
+    warning when a shape is flagged as N+1.
+    """
+
+    def __init__(self, app, always: bool = False, repeat_threshold: int = 10):
+        self.app = app
+        self.always = always
+        self.repeat_threshold = repeat_threshold
+
+    def _requested(self, scope: dict) -> bool:
+        if self.always:
+            return True
+
+        for name, value in scope["headers"]:
+            if name.decode("latin-1").lower() == PROFILE_HEADER:
+                return value.decode("latin-1").lower() in ("1", "true", "yes")
+
+        return False
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self._requested(scope):
+            await self.app(scope, receive, send)
+            return
+
+        with profile_sql() as profile:
+
+            async def send_with_profile(message):
+                if message["type"] == "http.response.start":
+                    flagged = len(profile.n_plus_one(self.repeat_threshold))
+                    headers = list(message.get("headers", []))
+                    headers += [
+                        (b"x-sql-statements", str(profile.statements).encode()),
+                        (b"x-sql-time-ms", f"{profile.seconds * 1000:.3f}".encode()),
+                        (b"x-sql-n-plus-one", str(flagged).encode()),
+                    ]
+                    message = {**message, "headers": headers}
+                await send(message)
+
+            await self.app(scope, receive, send_with_profile)
+
+        summary = profile.summary(self.repeat_threshold)
+        log = logger.warning if summary["n_plus_one"] else logger.info
+        log(
+            "SQL profile of %s %s: %s statements in %.1f ms, N+1 shapes: %s",
+            scope["method"],
+            scope["path"],
+            summary["statements"],
+            summary["seconds"] * 1000,
+            summary["n_plus_one"],
+        )
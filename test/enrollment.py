@@ -1,3 +1,5 @@
+import hashlib
+import json
 import sys
 import unittest
 from fastapi.testclient import TestClient
@@ -5,6 +7,14 @@ from fastapi.testclient import TestClient
 sys.path.insert(0, "../src")
 
 from main import app
+from services.enrollment import validate_data
+from services.import_ledger import (
+    LedgerKey,
+    finish_ledger_run,
+    record_completed_rows,
+    start_ledger_run,
+)
+from services.import_report import UnexpectedFailure, iter_import_results
 
 client = TestClient(app)
 
@@ -104,3 +114,314 @@ class TestEnrollment(unittest.TestCase):
         self.assertEqual(
             failed_users[3]["Error message"], "Input should be a valid string"
         )
+
+    def test_row_failing_on_write_does_not_roll_back_chunk(self):
+        """
+        Test case:
+            A chunk where one student's last name exceeds the column length.
+        Expected state:
+            Only that row fails; the other row of the chunk is enrolled.
+        """
+        header = "Student Frist name,Student Last Name,Student Email,Guardian First Name,Guardian Last Name,Guardian Email,Guardian Identification Type (ID),Guardian Identification Number,Guardian Country (Id),Room ID"
+        content = "\n".join(
+            [
+                header,
+                "Marta,Rios,marta.savepoint@gmail.com,Elena,Rios,elena.savepoint@gmail.com,1,910,1,1",
+                f"Hugo,{'x' * 150},hugo.savepoint@gmail.com,Elena,Rios,elena.savepoint@gmail.com,1,910,1,1",
+            ]
+        )
+
+        response = client.post(
+            "/enrollment/students",
+            files={"file": ("savepoint.csv", content.encode(), "text/csv")},
+        )
+
+        self.assertEqual(response.status_code, 207)
+
+        successful_users = response.json()["Successful users"]
+        failed_users = response.json()["Failed users"]
+        self.assertEqual(len(successful_users), 1)
+        self.assertEqual(len(failed_users), 1)
+        self.assertEqual(
+            failed_users[0]["Student Data"]["Student Email"], "hugo.savepoint@gmail.com"
+        )
+
+    def test_dry_run_does_not_write(self):
+        """
+        Test case:
+            A file with a new student is checked with a dry run before being imported.
+        Expected state:
+            The dry run reports the student to be created, and the import that
+            follows still enrolls it.
+        """
+        header = "Student Frist name,Student Last Name,Student Email,Guardian First Name,Guardian Last Name,Guardian Email,Guardian Identification Type (ID),Guardian Identification Number,Guardian Country (Id),Room ID"
+        content = "\n".join(
+            [
+                header,
+                "Lucia,Vega,lucia.dryrun@gmail.com,Rosa,Vega,rosa.dryrun@gmail.com,1,920,1,1",
+            ]
+        ).encode()
+
+        response = client.post(
+            "/enrollment/students",
+            params={"dry_run": True},
+            files={"file": ("dry_run.csv", content, "text/csv")},
+        )
+
+        self.assertEqual(response.status_code, 207)
+        self.assertEqual(len(response.json()["Successful users"]), 1)
+        self.assertEqual(response.json()["Summary"]["Students to create"], 1)
+        self.assertEqual(response.json()["Summary"]["Guardians to create"], 1)
+
+        response = client.post(
+            "/enrollment/students",
+            files={"file": ("dry_run.csv", content, "text/csv")},
+        )
+
+        self.assertEqual(response.status_code, 207)
+        self.assertEqual(len(response.json()["Successful users"]), 1)
+
+    def test_resume_reports_recorded_rows(self):
+        """
+        Test case:
+            A file that was imported with `resume` is submitted again with `resume`.
+        Expected state:
+            The recorded outcomes, without the records, are reported instead of
+            "already enrolled" errors.
+        """
+        header = "Student Frist name,Student Last Name,Student Email,Guardian First Name,Guardian Last Name,Guardian Email,Guardian Identification Type (ID),Guardian Identification Number,Guardian Country (Id),Room ID"
+        content = "\n".join(
+            [
+                header,
+                "Tomas,Paz,tomas.resume@gmail.com,Irene,Paz,irene.resume@gmail.com,1,930,1,1",
+            ]
+        ).encode()
+
+        first = client.post(
+            "/enrollment/students",
+            params={"resume": True, "compact": True},
+            files={"file": ("resume.csv", content, "text/csv")},
+        )
+        resumed = client.post(
+            "/enrollment/students",
+            params={"resume": True, "compact": True},
+            files={"file": ("resume.csv", content, "text/csv")},
+        )
+
+        self.assertEqual(resumed.status_code, 207)
+        self.assertEqual(resumed.json(), first.json())
+        self.assertEqual(len(resumed.json()["Successful users"]), 1)
+
+    def test_upload_being_imported_is_rejected(self):
+        """
+        Test case:
+            A file is submitted while a run of the same file is still active.
+        Expected state:
+            The upload is rejected with a 409 until the active run ends.
+        """
+        header = "Student Frist name,Student Last Name,Student Email,Guardian First Name,Guardian Last Name,Guardian Email,Guardian Identification Type (ID),Guardian Identification Number,Guardian Country (Id),Room ID"
+        content = "\n".join(
+            [
+                header,
+                "Lucia,Paz,lucia.lease@gmail.com,Irene,Paz,irene.lease@gmail.com,1,931,1,1",
+            ]
+        ).encode()
+        key = LedgerKey(hashlib.sha256(content).hexdigest(), 1)
+
+        run_id, _ = start_ledger_run(key, resume=False)
+        try:
+            rejected = client.post(
+                "/enrollment/students",
+                params={"resume": True},
+                files={"file": ("lease.csv", content, "text/csv")},
+            )
+        finally:
+            finish_ledger_run(key, run_id)
+        accepted = client.post(
+            "/enrollment/students",
+            params={"resume": True},
+            files={"file": ("lease.csv", content, "text/csv")},
+        )
+
+        self.assertEqual(rejected.status_code, 409)
+        self.assertEqual(accepted.status_code, 207)
+        self.assertEqual(len(accepted.json()["Successful users"]), 1)
+
+    def test_resume_processes_only_unrecorded_rows(self):
+        """
+        Test case:
+            A file is resumed while only its first and last rows have a recorded outcome.
+        Expected state:
+            The middle row is imported and reported between the recorded outcomes.
+        """
+        header = "Student Frist name,Student Last Name,Student Email,Guardian First Name,Guardian Last Name,Guardian Email,Guardian Identification Type (ID),Guardian Identification Number,Guardian Country (Id),Room ID"
+        content = "\n".join(
+            [
+                header,
+                "Ana,Paz,ana.gap@gmail.com,Irene,Paz,irene.gap@gmail.com,1,932,1,1",
+                "Leo,Paz,leo.gap@gmail.com,Irene,Paz,irene.gap@gmail.com,1,932,1,1",
+                "Eva,Paz,eva.gap@gmail.com,Irene,Paz,irene.gap@gmail.com,1,932,1,1",
+            ]
+        ).encode()
+        key = LedgerKey(hashlib.sha256(content).hexdigest(), 1)
+        recorded = {"Student ID": 0, "Room ID": 1, "Status": "Successful"}
+
+        run_id, _ = start_ledger_run(key, resume=False)
+        try:
+            record_completed_rows(key, {0: [(True, recorded)], 2: [(True, recorded)]})
+        finally:
+            finish_ledger_run(key, run_id)
+        response = client.post(
+            "/enrollment/students",
+            params={"resume": True, "compact": True},
+            files={"file": ("gap.csv", content, "text/csv")},
+        )
+
+        successful = response.json()["Successful users"]
+        self.assertEqual(response.status_code, 207)
+        self.assertEqual([entry["Row"] for entry in successful], [1, 2, 3])
+        self.assertEqual(successful[0], {"Row": 1, **recorded})
+        self.assertNotEqual(successful[1]["Student ID"], 0)
+        self.assertEqual(successful[2], {"Row": 3, **recorded})
+
+    def test_unexpected_failures_are_not_recorded(self):
+        """
+        Test case:
+            Every row of a recorded upload fails on an unexpected error.
+        Expected state:
+            The failures are reported but not recorded, so a resumed run processes the rows again.
+        """
+        key = LedgerKey(hashlib.sha256(b"unexpected failures").hexdigest(), 1)
+        failure = {"Error message": ["connection lost"], "Status": "Failed"}
+
+        def process_chunk(session, records):
+            return [UnexpectedFailure([(False, failure)]) for _ in records]
+
+        results = list(
+            iter_import_results(process_chunk, validate_data, [{}, {}], key, False)
+        )
+        run_id, completed_rows = start_ledger_run(key, resume=True)
+        finish_ledger_run(key, run_id)
+
+        self.assertEqual(results, [[(False, failure)], [(False, failure)]])
+        self.assertEqual(completed_rows, {})
+
+    def test_import_runs_no_per_row_queries(self):
+        """
+        Test case:
+            A file with twelve students is imported with SQL profiling requested.
+        Expected state:
+            The statements are reported and none of them is flagged as N+1.
+        """
+        header = "Student Frist name,Student Last Name,Student Email,Guardian First Name,Guardian Last Name,Guardian Email,Guardian Identification Type (ID),Guardian Identification Number,Guardian Country (Id),Room ID"
+        rows = [
+            f"Ana,Soto,ana{index}.profile@gmail.com,Raul,Soto,raul{index}.profile@gmail.com,1,94{index},1,1"
+            for index in range(12)
+        ]
+        content = "\n".join([header, *rows]).encode()
+
+        response = client.post(
+            "/enrollment/students",
+            headers={"X-SQL-Profile": "1"},
+            files={"file": ("profile.csv", content, "text/csv")},
+        )
+
+        self.assertEqual(response.status_code, 207)
+        self.assertEqual(len(response.json()["Successful users"]), 12)
+        self.assertGreater(int(response.headers["X-SQL-Statements"]), 0)
+        self.assertEqual(response.headers["X-SQL-N-Plus-One"], "0")
+
+    def test_create_enrollment_from_ndjson_body(self):
+        """
+        Test case:
+            Two records are sent as NDJSON, one of them with a numeric last name.
+        Expected state:
+            The same 207 report as a file upload: one enrollment and one validation error.
+        """
+        record = {
+            "Student Frist name": "Elena",
+            "Student Last Name": "Ruiz",
+            "Student Email": "elena.batch@gmail.com",
+            "Guardian First Name": "Pablo",
+            "Guardian Last Name": "Ruiz",
+            "Guardian Email": "pablo.batch@gmail.com",
+            "Guardian Identification Type (ID)": 1,
+            "Guardian Identification Number": 950,
+            "Guardian Country (Id)": 1,
+            "Room ID": 1,
+        }
+        invalid_record = {
+            **record,
+            "Student Last Name": 12345,
+            "Student Email": "mario.batch@gmail.com",
+        }
+
+        response = client.post(
+            "/enrollment/batch",
+            headers={"Content-Type": "application/x-ndjson"},
+            content="\n".join(json.dumps(row) for row in [record, invalid_record]),
+        )
+
+        self.assertEqual(response.status_code, 207)
+        self.assertEqual(len(response.json()["Successful users"]), 1)
+        self.assertEqual(
+            response.json()["Failed users"][0]["Column Error"], ["Student Last Name"]
+        )
+
+    def test_stream_compact_report_as_ndjson(self):
+        """
+        Test case:
+            A file with an invalid row is imported asking for a compact NDJSON report.
+        Expected state:
+            One line per entry, referencing the invalid row by number instead of echoing it.
+        """
+        header = "Student Frist name,Student Last Name,Student Email,Guardian First Name,Guardian Last Name,Guardian Email,Guardian Identification Type (ID),Guardian Identification Number,Guardian Country (Id),Room ID"
+        content = "\n".join(
+            [
+                header,
+                "Irene,Mora,irene.stream@gmail.com,Luis,Mora,luis.stream@gmail.com,1,960,1,1",
+                "Hugo,Mora,hugo.stream@gmail.com,Luis,Mora,luis.stream@gmail.com,1,960,1,first",
+            ]
+        ).encode()
+
+        response = client.post(
+            "/enrollment/students",
+            params={"report": "ndjson", "compact": True},
+            files={"file": ("stream.csv", content, "text/csv")},
+        )
+
+        self.assertEqual(response.status_code, 207)
+        self.assertEqual(response.headers["Content-Type"], "application/x-ndjson")
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        self.assertEqual([line["Row"] for line in lines], [1, 2])
+        self.assertEqual([line["Status"] for line in lines], ["Successful", "Failed"])
+        self.assertNotIn("Record", lines[1])
+
+    def test_stored_report_can_be_downloaded(self):
+        """
+        Test case:
+            A file is imported asking for the report to be stored.
+        Expected state:
+            The response counts the rows, and the report is downloaded as NDJSON.
+        """
+        header = "Student Frist name,Student Last Name,Student Email,Guardian First Name,Guardian Last Name,Guardian Email,Guardian Identification Type (ID),Guardian Identification Number,Guardian Country (Id),Room ID"
+        content = "\n".join(
+            [
+                header,
+                "Sara,Gil,sara.stored@gmail.com,Omar,Gil,omar.stored@gmail.com,1,970,1,1",
+            ]
+        ).encode()
+
+        response = client.post(
+            "/enrollment/students",
+            params={"report": "stored"},
+            files={"file": ("stored.csv", content, "text/csv")},
+        )
+
+        self.assertEqual(response.status_code, 207)
+        self.assertEqual(response.json()["Successful rows"], 1)
+
+        report = client.get(response.json()["Report URL"])
+
+        self.assertEqual(report.status_code, 200)
+        self.assertEqual(json.loads(report.text)["Status"], "Successful")
@@ -0,0 +1,84 @@
+import io
+import json
+import sys
+import unittest
+
+sys.path.insert(0, "../src")
+
+from utils.file_reader import iter_json_records
+
+
+def split(content: str, size: int) -> list:
+    stream = io.BytesIO(content.encode())
+    return list(iter(lambda: stream.read(size), b""))
+
+
+class CountedChunks:
+    def __init__(self, chunks: list):
+        self.chunks = chunks
+        self.read = 0
+
+    def __iter__(self):
+        for chunk in self.chunks:
+            self.read += 1
+            yield chunk
+
+
+class TestJsonRecords(unittest.TestCase):
+    def test_array_split_at_any_boundary(self):
+        """
+        Test case:
+            A JSON array with strings, escapes, numbers and literals is received in chunks of every size.
+        Expected state:
+            The same records are parsed whatever the chunk boundaries.
+        """
+        content = ' [ {"name": "Ana María 😀", "quote": "\\"a\\\\b\\u00e9\\ud83d\\ude00", "id": -12.5e+3},\n {"active": true, "deleted": false, "room": null} ] '
+
+        for size in range(1, len(content.encode()) + 1):
+            self.assertEqual(
+                list(iter_json_records(split(content, size))), json.loads(content)
+            )
+
+    def test_malformed_record_fails_without_reading_the_rest(self):
+        """
+        Test case:
+            The second record of a long JSON array is malformed.
+        Expected state:
+            The error names the record and is raised before the rest of the body is read.
+        """
+        records = ", ".join(f'{{"id": {index}}}' for index in range(1000))
+        chunks = CountedChunks(
+            split(f'[{{"id": 1}}, {{"id": 2 "name": "Ana"}}, {records}]', 4)
+        )
+
+        with self.assertRaisesRegex(ValueError, "Record 2: Expecting ',' delimiter"):
+            list(iter_json_records(chunks))
+        self.assertLess(chunks.read, 10)
+
+    def test_trailing_data_is_rejected(self):
+        """
+        Test case:
+            A JSON array is followed by more content.
+        Expected state:
+            The records are parsed and then the extra data is reported.
+        """
+        records = iter_json_records(split('[{"id": 1}] {"id": 2}', 3))
+
+        self.assertEqual(next(records), {"id": 1})
+        with self.assertRaisesRegex(ValueError, "Extra data after the JSON array"):
+            next(records)
+
+    def test_ndjson_skips_blank_lines(self):
+        """
+        Test case:
+            NDJSON records separated by blank and whitespace-only lines, without a final newline.
+        Expected state:
+            One record per non-blank line.
+        """
+        content = '\n{"id": 1}\n\n  \n{"id": 2}\r\n{"id": 3}'
+
+        for size in (1, 3, len(content)):
+            self.assertEqual(
+                list(iter_json_records(split(content, size))),
+                [{"id": 1}, {"id": 2}, {"id": 3}],
+            )
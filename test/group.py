@@ -78,4 +78,30 @@ class TestGroup(unittest.TestCase):
 
         self.assertEqual(request.status_code, 201)
         response = request.json()
-        self.assertEqual(response["message"], "Data created successfully")
\ No newline at end of file
+        self.assertEqual(response["message"], "Data created successfully")
+
+    def test_list_group_paginated(self):
+        """
+        Test case:
+            List groups one at a time, following the cursor of each page.
+        Expected state:
+            Each page holds one group, the next page starts after it and the last page has no cursor.
+        """
+        response = client.get("/group/list", params={"limit": 1})
+
+        self.assertEqual(response.status_code, 200)
+        first_page = response.json()
+        self.assertEqual(len(first_page), 1)
+        cursor = response.headers["X-Next-Cursor"]
+        self.assertEqual(cursor, str(first_page[0]["Group"]["id"]))
+
+        response = client.get("/group/list", params={"limit": 1, "cursor": cursor})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertGreater(response.json()[0]["Group"]["id"], int(cursor))
+
+        last_group_id = client.get("/group/list").json()[-1]["Group"]["id"]
+        response = client.get("/group/list", params={"cursor": last_group_id})
+
+        self.assertEqual(response.json(), [])
+        self.assertNotIn("X-Next-Cursor", response.headers)
@@ -62,4 +62,57 @@ class TestRoom(unittest.TestCase):
 
         self.assertEqual(request.status_code, 404)
         response = request.json()
-        self.assertEqual(response["message"], f"Teacher with ID: {data_to_create['teacher_id']} not found")
\ No newline at end of file
+        self.assertEqual(response["message"], f"Teacher with ID: {data_to_create['teacher_id']} not found")
+
+    def test_list_room_filtered_by_group(self):
+        """
+        Test case:
+            List the rooms of a single group.
+        Expected state:
+            Only rooms attached to the requested group are displayed.
+        """
+        group_id = 1
+        response = client.get("/room/list", params={"group_id": group_id})
+
+        self.assertEqual(response.status_code, 200)
+        rooms = response.json()
+        self.assertTrue(rooms)
+        for room in rooms:
+            self.assertEqual(room["Room"]["group_id"], group_id)
+            self.assertEqual(room["Group"]["id"], group_id)
+
+    def test_deleted_room_is_not_served_from_cache(self):
+        """
+        Test case:
+            Look up a room, delete it and look it up again.
+        Expected state:
+            The room is found while it exists and not found once deleted.
+        """
+        data_to_create = {"name": "Room D5", "group_id": 1, "teacher_id": 1}
+        room_id = client.post("/room/create", json=data_to_create).json()["data"]["id"]
+
+        request = client.get("/template/update/prefilled", params={"room_id": room_id})
+        self.assertEqual(request.status_code, 200)
+
+        request = client.delete(f"/room/delete/{room_id}")
+        self.assertEqual(request.status_code, 200)
+
+        request = client.get("/template/update/prefilled", params={"room_id": room_id})
+        self.assertEqual(request.status_code, 404)
+        self.assertEqual(
+            request.json()["message"], f"Room with ID: {room_id} not found"
+        )
+
+    def test_metrics_record_room_requests(self):
+        """
+        Test case:
+            List rooms and read the metrics endpoint.
+        Expected state:
+            The latency and SQL statements of the listing are reported under the room router.
+        """
+        client.get("/room/list")
+        response = client.get("/metrics")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('route="/room/list",router="room",status="200"', response.text)
+        self.assertIn('http_request_db_statements_count{router="room"}', response.text)
@@ -1,4 +1,5 @@
 import sys
+import time
 import unittest
 from fastapi.testclient import TestClient
 
@@ -48,3 +49,95 @@ class TestStudent(unittest.TestCase):
                 user_search = user["email"]
 
         self.assertEqual(user_search, student_email_to_verify)
+
+    def test_show_student_by_group_projected(self):
+        """
+        Test case:
+            List students by group, requesting only their emails.
+        Expected state:
+            Each student is listed once, with only its ID and email.
+        """
+
+        group_id = 2
+        response = client.get(f"/student/group/{group_id}", params={"fields": "email"})
+
+        self.assertEqual(response.status_code, 200)
+        students = response.json()
+        self.assertTrue(students)
+        for student in students:
+            self.assertEqual(set(student), {"id", "email"})
+
+        student_ids = [student["id"] for student in students]
+        self.assertEqual(len(student_ids), len(set(student_ids)))
+
+    def test_show_student_by_group_unknown_field(self):
+        """
+        Test case:
+            List students by group, requesting a column that does not exist.
+        Expected state:
+            The request is rejected, naming the unknown column.
+        """
+
+        response = client.get("/student/group/2", params={"fields": "email,password"})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()["message"], "Unknown student fields: password")
+
+    def test_export_students_by_group_csv(self):
+        """
+        Test case:
+            Export the enrollments of a group as CSV.
+        Expected state:
+            A CSV file with a header row and one row per enrollment of the group, including the student email.
+        """
+
+        group_id = 2
+        student_email_to_verify = "diana@gmail.com"
+        response = client.get(
+            "/student/export", params={"format": "csv", "group_id": group_id}
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.headers["content-type"].startswith("text/csv"))
+        lines = response.text.splitlines()
+        self.assertTrue(
+            lines[0].startswith("enrollment_id,room_id,room_name,group_id,student_id")
+        )
+        self.assertTrue(any(student_email_to_verify in line for line in lines[1:]))
+
+    def test_update_job_is_served_under_student(self):
+        """
+        Test case:
+            A student update file is processed as a background job.
+        Expected state:
+            The job and its report are served under /student, not under /enrollment.
+        """
+        header = "Student ID,Student Frist name,Student Last Name,Student Email,Guardian ID,Guardian First Name,Guardian Last Name,Guardian Email,Guardian Identification Type (ID),Guardian Identification Number,Guardian Country (Id)"
+        content = "\n".join(
+            [
+                header,
+                "999999,Ana,Soto,ana.job@gmail.com,999999,Raul,Soto,raul.job@gmail.com,1,950,1",
+            ]
+        ).encode()
+
+        accepted = client.put(
+            "/student/update/massive",
+            params={"background": True},
+            files={"file": ("update.csv", content, "text/csv")},
+        )
+        self.assertEqual(accepted.status_code, 202)
+        job_id = accepted.json()["data"]["job_id"]
+        self.assertEqual(
+            accepted.json()["data"]["status_url"], f"/student/jobs/{job_id}"
+        )
+
+        for _ in range(50):
+            job = client.get(f"/student/jobs/{job_id}").json()
+            if job["status"] == "completed":
+                break
+            time.sleep(0.1)
+
+        self.assertEqual(job["status"], "completed")
+        self.assertTrue(job["report"]["Report URL"].startswith("/student/reports/"))
+        self.assertEqual(client.get(job["report"]["Report URL"]).status_code, 200)
+        self.assertEqual(client.get(f"/enrollment/jobs/{job_id}").status_code, 404)
@@ -0,0 +1,45 @@
+import sys
+import unittest
+from fastapi.testclient import TestClient
+
+sys.path.insert(0, "../src")
+
+from main import app
+
+client = TestClient(app)
+
+
+class TestTemplate(unittest.TestCase):
+    def test_download_template_revalidated(self):
+        """
+        Test case:
+            Download the enrollment template, then request it again with the ETag received.
+        Expected state:
+            The first download returns the workbook with its ETag, the second one answers 304 without a body.
+        """
+        response = client.get("/template/template/1")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.content)
+        etag = response.headers["ETag"]
+
+        response = client.get("/template/template/1", headers={"If-None-Match": etag})
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b"")
+        self.assertEqual(response.headers["ETag"], etag)
+
+    def test_download_template_not_found(self):
+        """
+        Test case:
+            Download a template that does not exist.
+        Expected state:
+            Display message alerting the template was not found.
+        """
+        template_id = 99
+        response = client.get(f"/template/template/{template_id}")
+
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(
+            response.json()["message"], f"Template with ID {template_id} not found"
+        )